@@ -0,0 +1,228 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""Construction time and memory of a large arguments tree.
+
+The same tree is built with the slotted argument classes and with a copy of
+the former dict-based model, so both numbers come from a single run.
+
+Usage: python benchmarks/arguments.py [COMMANDS] [ARGUMENTS_PER_COMMAND]
+"""
+
+import sys
+import timeit
+import tracemalloc
+import typing as t
+
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import InputOption
+from mediapills.console.arguments import InputParameter
+from mediapills.console.arguments import VALUE_IS_ARRAY
+from mediapills.console.arguments import VALUE_OPTIONAL
+from mediapills.console.arguments import VALUE_REQUIRED
+
+
+class LegacyArgument:
+    """Dict-based argument as it was before the slotted classes."""
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Class constructor."""
+        self._options = [*args]
+        self._description = ""
+        self.__construct(**kwargs)
+
+    def __construct(self, description: str = "") -> None:
+        """Class strict constructor."""
+        self._description = description
+
+    @property
+    def options(self) -> t.List[str]:
+        """Options names getter."""
+        return self._options
+
+    @property
+    def description(self) -> str:
+        """Argument description getter."""
+        return self._description
+
+
+class LegacyOption(LegacyArgument):
+    """Dict-based input option."""
+
+
+class LegacyParameter(LegacyArgument):
+    """Dict-based input parameter with validating property setters."""
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Class constructor."""
+        super().__init__(*args, description=kwargs.get("description", ""))
+        self._mode: int = VALUE_OPTIONAL
+        self._default: t.Any = None
+        self._completer: t.Optional[str] = None
+        self.__construct(**kwargs)
+
+    def __construct(
+        self,
+        mode: int = VALUE_OPTIONAL,
+        default: t.Any = None,
+        description: str = "",
+        completer: t.Optional[str] = None,
+    ) -> None:
+        """Class strict constructor."""
+        self.mode = mode
+        self.default = default
+        self.completer = completer
+
+    @property
+    def mode(self) -> int:
+        """Argument mode getter."""
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: int) -> None:
+        """Argument mode setter."""
+        if mode > 7 or mode < 1:
+            raise ValueError(mode)
+
+        if mode & VALUE_OPTIONAL and mode & VALUE_REQUIRED:
+            raise ValueError(mode)
+
+        self._mode = mode
+
+    @property
+    def default(self) -> t.Any:
+        """Argument default value getter."""
+        return self._default
+
+    @default.setter
+    def default(self, default: t.Any = None) -> None:
+        """Argument default value setter."""
+        if self.mode & VALUE_REQUIRED > 0 and default is not None:
+            raise ValueError(default)
+
+        if self.mode & VALUE_IS_ARRAY > 0:
+            if default is None:
+                default = []
+            elif not isinstance(default, list):
+                raise ValueError(default)
+        elif default is None:
+            pass
+        elif not isinstance(default, (str, int)) or isinstance(default, bool):
+            raise ValueError(default)
+
+        self._default = default
+
+    @property
+    def completer(self) -> t.Optional[str]:
+        """Argument values provider getter."""
+        return self._completer
+
+    @completer.setter
+    def completer(self, completer: t.Optional[str]) -> None:
+        """Argument values provider setter."""
+        self._completer = completer
+
+
+class LegacyCommand(LegacyArgument):
+    """Dict-based input command."""
+
+    def __init__(
+        self,
+        *args: t.Any,
+        arguments: t.Optional[t.List[t.Any]] = None,
+        description: str = "",
+        handler: t.Optional[t.Callable[..., t.Any]] = None
+    ) -> None:
+        """Class constructor."""
+        super().__init__(*args, description=description)
+        self._arguments = arguments or []
+        self._handler = handler
+
+
+"""Classes used to build the tree: (command, option, parameter)."""
+TModel = t.Tuple[t.Callable[..., t.Any], t.Callable[..., t.Any], t.Callable[..., t.Any]]
+
+"""Models compared by the benchmark, in print order."""
+MODELS: t.Dict[str, TModel] = {
+    "legacy": (LegacyCommand, LegacyOption, LegacyParameter),
+    "slotted": (InputCommand, InputOption, InputParameter),
+}
+
+
+def build(
+    commands: int, arguments: int, model: TModel = MODELS["slotted"]
+) -> t.List[t.Any]:
+    """Build commands tree similar to the generated CLIs one."""
+    command, option, parameter = model
+    return [
+        command(
+            "command-{c}".format(c=c),
+            description="Command {c} description.".format(c=c),
+            arguments=[
+                *(
+                    option(
+                        "-o{a}".format(a=a),
+                        "--option-{a}".format(a=a),
+                        description="Option description.",
+                    )
+                    for a in range(arguments // 2)
+                ),
+                *(
+                    parameter(
+                        "--parameter-{a}".format(a=a),
+                        default="value",
+                        description="Parameter description.",
+                    )
+                    for a in range(arguments - arguments // 2)
+                ),
+            ],
+        )
+        for c in range(commands)
+    ]
+
+
+def measure(commands: int, arguments: int, model: TModel) -> t.Tuple[float, int]:
+    """Return construction seconds and retained bytes of one tree."""
+    tracemalloc.start()
+    tree = build(commands, arguments, model)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+
+    runs = 10
+    seconds = timeit.timeit(lambda: build(commands, arguments, model), number=runs)
+    return seconds / runs, memory
+
+
+def main(commands: int = 100, arguments: int = 50) -> None:
+    """Print construction time and retained memory of every model."""
+    total = commands * (arguments + 1)
+
+    print("arguments:    {total}".format(total=total))
+    for name, model in MODELS.items():
+        seconds, memory = measure(commands, arguments, model)
+        print("{name}:".format(name=name))
+        print("  construction: {ms:.2f} ms".format(ms=seconds * 1000))
+        print("  memory:       {kb:.1f} KiB".format(kb=memory / 1024))
+        print("  per argument: {b:.0f} B".format(b=memory / total))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -54,4 +54,4 @@ def print_me2(  # dead: disable
         """CLI command print message in STDOUT."""
         stdout.write("Command message goes here ...")
 
-    app.run()
+    app.main()
@@ -33,4 +33,4 @@ def print_me(  # dead: disable
         """CLI command print message in STDOUT."""
         stdout.write("Application message goes here ...")
 
-    app.run()
+    app.main()
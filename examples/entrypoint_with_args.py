@@ -50,4 +50,4 @@ def print_me(stdin: ConsoleInput, stdout: ConsoleOutput) -> None:  # dead: disab
 
         stdout.writeln("Application message goes here ...")
 
-    app.run()
+    app.main()
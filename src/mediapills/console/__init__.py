@@ -18,29 +18,85 @@
 # LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import contextlib
+import os
+import shlex
+import sys
+import time
 import typing as t
-from types import MethodType
 
+from mediapills.console.abc.features import BaseFeature
 from mediapills.console.abc.inputs import BaseInput
 from mediapills.console.abc.outputs import BaseConsoleOutput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import BROKEN_PIPE
+from mediapills.console.abc.outputs import BUSY
 from mediapills.console.abc.outputs import FAILURE
 from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.abc.outputs import TIMEOUT
 from mediapills.console.applications import ApplicationWithArguments
+from mediapills.console.applications import BUILTIN_EXIT_ARGUMENTS
 from mediapills.console.arguments import InputCommand
 from mediapills.console.arguments import InputOption
 from mediapills.console.arguments import InputParameter
 from mediapills.console.arguments import TInputCommands
 from mediapills.console.arguments import TInputOptions
 from mediapills.console.arguments import TInputParameters
+from mediapills.console.deadlines import CancelToken
+from mediapills.console.deadlines import ERR_MSG_TIMEOUT
+from mediapills.console.deadlines import settle
+from mediapills.console.deadlines import Watchdog
+from mediapills.console.exceptions import ConsoleBusyException
+from mediapills.console.exceptions import ConsoleException
+from mediapills.console.exceptions import ConsoleTimeoutException
 from mediapills.console.exceptions import ConsoleUnrecognizedArgumentsException
+from mediapills.console.executors import cpu_jobs
+from mediapills.console.executors import EXECUTOR_PROCESS
+from mediapills.console.executors import fan_out
+from mediapills.console.features import LoggingFeature
+from mediapills.console.features import MetricsFeature
+from mediapills.console.features import TFeatures
+from mediapills.console.features import TimeoutFeature
+from mediapills.console.features import TracingFeature
 from mediapills.console.inputs import ConsoleInput
+from mediapills.console.outputs import CountingOutput
+from mediapills.console.outputs import RecordingOutput
+from mediapills.console.pagers import paged
 from mediapills.console.parsers import InputArgumentsParser
+from mediapills.console.pipelines import call
+from mediapills.console.pipelines import compose
+from mediapills.console.pipelines import is_records
+from mediapills.console.slots import ERR_MSG_SLOT_POLICY
+from mediapills.console.slots import SLOT_POLICIES
+from mediapills.console.slots import SLOT_POLICY_WAIT
+from mediapills.console.slots import Slots
+from mediapills.console.traces import NOOP_SPAN
+from mediapills.console.traces import Tracer
+from mediapills.console.traces import TRACE_FORMAT_CHROME
+from mediapills.console.traces import TSpan
 
+if t.TYPE_CHECKING:  # pragma: no cover
+    from mediapills.console.caches import ResultsCache
+    from mediapills.console.indexes import HashIndex
+    from mediapills.console.logs import LogBridge
+    from mediapills.console.metrics import Metrics
 
 __all__ = ["option", "parameter", "Application"]
 
 TCallable = t.Callable[..., t.Any]
 
+TFeature = t.TypeVar("TFeature", bound=BaseFeature)
+
+SHELL_EXIT_WORDS = ("exit", "quit")
+
+
+def exit_code(code: t.Any) -> int:
+    """Convert handler result or SystemExit code to a process exit status."""
+    if code is None:
+        return SUCCESS
+
+    return code if isinstance(code, int) else FAILURE
+
 
 def option(*args: t.Any, **kwargs: t.Any) -> InputOption:
     """Object InputOption builder."""
@@ -63,8 +119,32 @@ def __init__(
         version: str = "",
         show_help: bool = False,
         show_version: bool = False,
+        show_completion: bool = False,
+        name: str = "",
+        features: TFeatures = (),
     ):
-        """Class constructor."""
+        """Class constructor.
+
+        Modes and integrations such as batch, shell, metrics or tracing are
+        opt-in features, e.g. features=[BatchFeature(), MetricsFeature()].
+        """
+        self._name = name
+        self._features = [*features]
+        self._timeouts: t.Dict[str, float] = {}
+        self._limits: t.Dict[str, t.Tuple[int, str]] = {}
+        self._log_bridge: t.Optional["LogBridge"] = None
+        self._metrics_registry: t.Optional["Metrics"] = None
+        self._metrics_server: t.Any = None
+        self._command = ""
+        self.metrics_dir: t.Optional[str] = None
+        self._tracer: t.Optional[Tracer] = None
+        self.trace_path: t.Optional[str] = None
+        self.trace_format = TRACE_FORMAT_CHROME
+        self._jobs = 1
+        self._timings: t.Dict[str, float] = {}
+        self._cached: t.Dict[str, t.Tuple[t.Sequence[str], t.Sequence[str]]] = {}
+        self._results_cache: t.Optional["ResultsCache"] = None
+        self._hash_index: t.Optional["HashIndex"] = None
         super().__init__(
             stdout=stdout,
             stderr=stderr,
@@ -72,60 +152,742 @@ def __init__(
             version=version,
             show_version=show_version,
             show_help=show_help,
+            show_completion=show_completion,
         )
         self._options: TInputOptions = self.default_options
-        self._parameters: TInputParameters = []
+        self._parameters: TInputParameters = self.default_parameters
         self._commands: TInputCommands = []
         self._parser: t.Optional[InputArgumentsParser] = None
         self._entrypoint: t.Optional[TCallable] = None
 
+        for feature in self._features:  # Add feature commands
+            self._commands.extend(feature.commands(self))
+
+    @property
+    def features(self) -> t.List[BaseFeature]:
+        """Enabled features getter."""
+        return self._features
+
+    def feature(self, cls: t.Type[TFeature]) -> t.Optional[TFeature]:
+        """Return enabled feature of a class, None if it is not enabled."""
+        for feature in self._features:
+            if isinstance(feature, cls):
+                return feature
+
+        return None
+
     @property
     def parser(self) -> InputArgumentsParser:
         """Application input parser."""
         if self._parser is None:
             self._parser = InputArgumentsParser(
-                arguments=[*self.parameters, *self.options, *self.commands]
+                arguments=[*self.parameters, *self.options, *self.commands],
+                description=self.description,
+                eager=BUILTIN_EXIT_ARGUMENTS,
             )
         return self._parser
 
-    def run(self) -> None:
-        """Run the current application command."""
-        stdin = ConsoleInput(parser=self.parser)
+    def load_spec(self, path: str) -> None:
+        """Load options, parameters and commands from a declarative spec file.
+
+        JSON, TOML and YAML documents are supported, as well as the compact form
+        made by "python -m mediapills.console.specs SOURCE" which loads fastest.
+        """
+        from mediapills.console import specs
+
+        _, description, entries = specs.load(path)
+
+        for argument in specs.build(entries):
+            if isinstance(argument, InputCommand):
+                self.commands.append(argument)
+            elif isinstance(argument, InputParameter):
+                self.parameters.append(argument)
+            else:
+                self.options.append(argument)  # type: ignore
+
+        self.description = self.description or description
+        self._parser = None
+
+    def load_plugins(self, group: t.Optional[str] = None, cache: bool = True) -> None:
+        """Add commands third party packages register under entry points group.
+
+        Discovered commands are cached until installed packages change, plugin
+        modules are imported only when their command is dispatched.
+        """
+        from mediapills.console import plugins
+
+        commands = plugins.discover(group or plugins.PLUGINS_GROUP, cache=cache)
+        self.commands.extend(commands)  # type: ignore
+        self._parser = None
+
+    @property
+    def results_cache(self) -> "ResultsCache":
+        """Cached commands results storage getter."""
+        if self._results_cache is None:
+            from mediapills.console.caches import ResultsCache
+
+            self._results_cache = ResultsCache()
+        return self._results_cache
+
+    @results_cache.setter
+    def results_cache(self, results_cache: "ResultsCache") -> None:
+        """Cached commands results storage setter."""
+        self._results_cache = results_cache
+
+    @property
+    def hash_index(self) -> "HashIndex":
+        """Input files content hash index getter (handlers taking app use it)."""
+        if self._hash_index is None:
+            from mediapills.console.indexes import HashIndex
+
+            self._hash_index = HashIndex()
+        return self._hash_index
+
+    @hash_index.setter
+    def hash_index(self, hash_index: "HashIndex") -> None:
+        """Input files content hash index setter."""
+        self._hash_index = hash_index
+
+    @property
+    def log_bridge(self) -> "LogBridge":
+        """Bridge writing logging records to stderr, levels following verbosity."""
+        if self._log_bridge is None:
+            from mediapills.console.logs import LogBridge
+
+            self._log_bridge = LogBridge(self.stderr)
+        return self._log_bridge
+
+    @property
+    def prog(self) -> str:
+        """Application name namespacing its instance slots, metrics and traces.
+
+        Defaults to the script name, or to the package name if the application
+        runs as "python -m package".
+        """
+        if self._name:
+            return self._name
+
+        prog = os.path.basename(sys.argv[0])
+        if prog == "__main__.py":
+            prog = os.path.basename(os.path.dirname(os.path.abspath(sys.argv[0])))
+
+        return prog or "console"
+
+    @property
+    def metrics(self) -> "Metrics":
+        """Per-command run metrics (recorded only if enabled in constructor)."""
+        if self._metrics_registry is None:
+            from mediapills.console.metrics import Metrics
+
+            self._metrics_registry = Metrics(prog=self.prog)
+        return self._metrics_registry
+
+    @property
+    def tracer(self) -> Tracer:
+        """Spans of the last run (collected only if enabled in constructor)."""
+        if self._tracer is None:
+            self._tracer = Tracer()
+        return self._tracer
+
+    def span(self, name: str, **attributes: t.Any) -> TSpan:
+        """Return span to open with a "with" statement, a no-op if tracing is off."""
+        if self.feature(TracingFeature) is None:
+            return NOOP_SPAN
+
+        return self.tracer.span(name, **attributes)
+
+    def sync_logging(self) -> None:
+        """Set logging level matching current output verbosity."""
+        if self.feature(LoggingFeature) is not None:
+            self.log_bridge.install(self.stdout.verbosity)
+
+    @property
+    def default_options(self) -> TInputOptions:
+        """Default and features options getter."""
+        options = super().default_options
+
+        for feature in self._features:
+            options.extend(feature.options)
+
+        return options
+
+    @property
+    def default_parameters(self) -> TInputParameters:
+        """Default and features parameters getter."""
+        parameters = super().default_parameters
+
+        for feature in self._features:
+            parameters.extend(feature.parameters)
+
+        return parameters
+
+    @property
+    def jobs(self) -> int:
+        """Number of parallel workers getter."""
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, jobs: int) -> None:
+        """Number of parallel workers setter."""
+        self._jobs = cpu_jobs(jobs)
+
+    @property
+    def timings(self) -> t.Dict[str, float]:
+        """Seconds spent in each phase of the last run."""
+        return self._timings
+
+    @contextlib.contextmanager
+    def timed(self, phase: str) -> t.Iterator[None]:
+        """Add time spent in the block to the phase timing, trace it as a span."""
+        started = time.perf_counter()
+        try:
+            with self.span(phase):
+                yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._timings[phase] = self._timings.get(phase, 0.0) + elapsed
+
+    def main(self, argv: t.Optional[t.List[str]] = None) -> "t.NoReturn":
+        """Run the current application command and exit the process."""
+        sys.exit(self.run(argv))
+
+    def run(self, argv: t.Optional[t.List[str]] = None) -> int:
+        """Run the current application command, return exit code."""
+        self._timings = {}
+        for feature in self._features:
+            feature.start(self)
+        self.sync_logging()
+
+        code = FAILURE
+
+        try:
+            with self.timed("total"):
+                code = self.invoke(ConsoleInput(parser=self.parser, argv=argv))
+        except SystemExit as e:  # Raised by the built-in parser or a handler
+            code = self.system_exit(e.code)
+        except BrokenPipeError:  # Reader is gone, e.g. "app dump | head"
+            code = self.close_pipe()
+        finally:
+            with self.timed("flush"):
+                code = self.flush(code)
+            for feature in self._features:  # Export and release after output
+                feature.finish(self)
+
+        return code
+
+    def flush(self, code: int = SUCCESS) -> int:
+        """Flush logs and outputs, return BROKEN_PIPE if a pipe was closed, else code."""
+        flushes: t.List[t.Tuple[t.Callable[[], None], BaseOutput]] = [
+            (self.stdout.flush, self.stdout),
+            (self.stderr.flush, self.stderr),
+        ]
+        if self._log_bridge is not None:
+            flushes.insert(0, (self._log_bridge.flush, self.stderr))
+
+        for flush, output in flushes:
+            try:
+                flush()
+            except BrokenPipeError:
+                code = self.close_pipe(output)
+
+        return code
+
+    def system_exit(self, code: t.Any) -> int:
+        """Return SystemExit code as exit status, writing a message code to stderr."""
+        if code is not None and not isinstance(code, int):  # sys.exit("message")
+            self.stderr.write(str(code))
+
+        return exit_code(code)
+
+    def close_pipe(self, output: t.Optional[BaseOutput] = None) -> int:
+        """Point closed output (stdout by default) to devnull, return BROKEN_PIPE.
+
+        Output left in buffers is then discarded at exit instead of failing
+        with a traceback in the interpreter shutdown.
+        """
+        stream = getattr(output or self.stdout, "stream", sys.stdout)
 
         try:
-            stdin.validate()
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            try:
+                os.dup2(devnull, stream.fileno())
+            finally:
+                os.close(devnull)
+        except (AttributeError, OSError, ValueError):  # Not a file descriptor
+            pass
+
+        return BROKEN_PIPE
+
+    def invoke(self, stdin: BaseInput, help_on_error: bool = True) -> int:
+        """Validate input, apply default options and execute, return exit code."""
+        if self.feature(MetricsFeature) is not None:
+            return self.measure(stdin, help_on_error=help_on_error)
+
+        return self.process(stdin, help_on_error=help_on_error)
+
+    def measure(self, stdin: BaseInput, help_on_error: bool = True) -> int:
+        """Process input recording duration, exit code, output bytes and parse time."""
+        parse = self._timings.get("parse", 0.0)
+        wait = self._timings.get("wait", 0.0)
+        stdout, code = self.stdout, FAILURE
+        self.stdout = counter = CountingOutput(stdout)
+        started = time.perf_counter()
+
+        try:
+            code = self.process(stdin, help_on_error=help_on_error)
+        except SystemExit as e:
+            code = exit_code(e.code)
+            raise
+        except BrokenPipeError:
+            code = BROKEN_PIPE
+            raise
+        finally:
+            self.stdout = stdout
+            command, self._command = self._command, ""
+            self.metrics.record(
+                command=command,
+                code=code,
+                seconds=time.perf_counter() - started,
+                parse=self._timings.get("parse", 0.0) - parse,
+                written=counter.written,
+                wait=self._timings.get("wait", 0.0) - wait,
+            )
+
+        return code
+
+    def process(self, stdin: BaseInput, help_on_error: bool = True) -> int:
+        """Validate input, apply default options and execute, return exit code."""
+        try:
+            with self.timed("parse"):
+                stdin.validate()
         except ConsoleUnrecognizedArgumentsException as e:
             self.stderr.write("unrecognized arguments: {msg}".format(msg=str(e)))
-            self.show_help(FAILURE)
+            return self.show_help(FAILURE) if help_on_error else FAILURE
+
+        with self.timed("options"):
+            code = self.apply_options(stdin=stdin)
+
+        if code is not None:
+            return code
 
-        self.apply_options(stdin=stdin)
+        with self.timed("execute"):
+            return self.execute(stdin=stdin)
 
+    def execute(self, stdin: BaseInput) -> int:
+        """Execute command, entrypoint or help for validated input."""
         if len(self.commands):
-            self.do_dispatch(stdin=stdin)
+            return self.do_dispatch(stdin=stdin)
         elif self._entrypoint is not None:
-            self.do_entrypoint(stdin=stdin)
+            return self.do_entrypoint(stdin=stdin)
         elif self._show_help:
-            self.show_help()
+            return self.show_help()
+        else:
+            return SUCCESS  # Nothing to run
+
+    def apply_options(self, stdin: BaseInput) -> t.Optional[int]:
+        """Set default and features options, run a feature mode if requested."""
+        code = super().apply_options(stdin)
+        self.sync_logging()
+
+        if code is not None:
+            return code
+
+        for feature in self._features:  # Apply every feature before any mode runs
+            code = feature.configure(self, stdin)
+            if code is not None:
+                return code
+
+        for feature in self._features:
+            code = feature.dispatch(self, stdin)
+            if code is not None:
+                return code
+
+        return None
+
+    def serve_metrics(self, port: int) -> None:
+        """Serve run metrics on a local port until the process exits."""
+        if self._metrics_server is None:
+            self._metrics_server = self.metrics.serve(port)
+
+    def export_metrics(self, directory: str) -> None:
+        """Write run metrics to a textfile collector directory."""
+        try:
+            self.metrics.write_textfile(directory)
+        except OSError as e:
+            self.stderr.write("could not write metrics: {e}".format(e=e))
+            self.stderr.flush()
+
+    def export_trace(self, path: str) -> None:
+        """Write spans of the last run to a trace file."""
+        try:
+            self.tracer.write(path, self.trace_format, service=self.prog)
+        except OSError as e:
+            self.stderr.write("could not write trace: {e}".format(e=e))
+            self.stderr.flush()
+
+    def run_batch(self, source: str, fail_fast: bool = False) -> int:
+        """Run command lines from a file ('-' for stdin), return aggregated code."""
+        if source == "-":
+            return self.aggregate(self.run_lines(sys.stdin, fail_fast=fail_fast))
+
+        with open(source, encoding="utf-8") as fh:
+            return self.aggregate(self.run_lines(fh, fail_fast=fail_fast))
+
+    def run_shell(self) -> int:
+        """Run command lines typed interactively, return aggregated code."""
+        try:  # Enable line editing and history where available
+            import readline  # noqa: F401
+        except ImportError:  # pragma: no cover
+            pass
+
+        prompt = "{prog}> ".format(prog=self.prog)
+
+        def lines() -> t.Iterator[str]:
+            while True:
+                try:
+                    line = input(prompt if sys.stdin.isatty() else "")
+                except EOFError:
+                    return
+                except KeyboardInterrupt:  # Drop the typed line, end it on stdout
+                    self.stdout.write("")
+                    continue
+
+                if line.strip() in SHELL_EXIT_WORDS:
+                    return
+
+                yield line
+
+        return self.aggregate(self.run_lines(lines()))
+
+    def run_lines(self, lines: t.Iterable[str], fail_fast: bool = False) -> t.List[int]:
+        """Run each command line through the same parser, return exit codes."""
+        codes = []
+
+        for line in lines:
+            try:
+                argv = shlex.split(line, comments=True)
+            except ValueError as e:
+                self.stderr.write(str(e))
+                codes.append(FAILURE)
+            else:
+                if not argv:
+                    continue  # Blank line or comment
+
+                codes.append(self.run_line(argv))
+
+            if fail_fast and codes[-1] != SUCCESS:
+                break
+
+        return codes
+
+    def run_line(self, argv: t.List[str]) -> int:
+        """Run a single command line, return its exit code."""
+        stdin = ConsoleInput(parser=self.parser, argv=argv)
+        verbosity = self.stdout.verbosity
+
+        try:
+            return self.invoke(stdin, help_on_error=False)
+        except SystemExit as e:
+            return self.system_exit(e.code)
+        finally:
+            self.stdout.verbosity = verbosity
+            self.sync_logging()
+
+    def aggregate(self, codes: t.List[int]) -> int:
+        """Return the first failed exit code of a batch, SUCCESS otherwise."""
+        failed = [code for code in codes if code != SUCCESS]
+
+        if failed:
+            self.stderr.write(
+                "{failed} of {total} command lines failed.".format(
+                    failed=len(failed), total=len(codes)
+                )
+            )
+            return failed[0]
+
+        return SUCCESS
+
+    def fan_out(
+        self,
+        func: TCallable,
+        items: t.Iterable[t.Any],
+        ordered: bool = True,
+        executor: str = EXECUTOR_PROCESS,
+        chunksize: int = 1,
+    ) -> None:
+        """Run func over items on --jobs workers and write results to stdout.
+
+        Results are written by the calling thread only, so lines never interleave.
+        A result can be a message, a list of messages or None for no output.
+        """
+        for result in fan_out(
+            func,
+            items,
+            jobs=self.jobs,
+            ordered=ordered,
+            executor=executor,
+            chunksize=chunksize,
+        ):
+            if result is None:
+                continue
+
+            for msg in [result] if isinstance(result, str) else result:
+                self.stdout.write(msg)
+
+    def find_command(self, name: t.Any) -> t.Optional[InputCommand]:
+        """Return command registered under name or alias, None if not found."""
+        for command in self.commands:
+            if name in command.options:
+                return command
+
+        return None
+
+    def load_handler(self, command: InputCommand) -> TCallable:
+        """Return command handler, importing lazily registered handler module."""
+        with self.timed("import:{name}".format(name=command.options[0])):
+            return command.resolve()
+
+    def drain(
+        self,
+        result: t.Any,
+        stdout: t.Optional[BaseOutput] = None,
+        cancel: t.Optional[CancelToken] = None,
+    ) -> int:
+        """Write records returned by a handler to stdout, return exit code.
+
+        If the output pipe is closed the producer is stopped right away: its
+        token is cancelled and a generator is closed (so are upstream stages).
+        """
+        if not is_records(result):
+            return exit_code(result)
+
+        output = stdout or self.stdout
+        try:
+            for record in result:
+                if cancel is not None:
+                    cancel.raise_if_cancelled()
+                output.write(record if isinstance(record, str) else str(record))
+        except BrokenPipeError:
+            if cancel is not None:
+                cancel.cancel()
+            if callable(getattr(result, "close", None)):
+                result.close()
+            raise
+
+        return SUCCESS
+
+    def timeout_for(
+        self, stdin: BaseInput, command: t.Optional[str] = None, spent: float = 0.0
+    ) -> t.Optional[float]:
+        """Return --timeout value or command default timeout, None if unbounded.
+
+        Seconds already spent (e.g. waiting for an instance slot) are taken off.
+        """
+        if self.feature(TimeoutFeature) is not None and stdin.has_arg("timeout"):
+            timeout: t.Optional[float] = float(str(stdin.get_arg("timeout")))
         else:
-            pass  # Nothing to run
+            timeout = self._timeouts.get(command) if command is not None else None
+
+        return max(timeout - spent, 0.0) if timeout is not None else None
+
+    def call_handler(
+        self,
+        handler: TCallable,
+        stdin: BaseInput,
+        stdout: BaseOutput,
+        timeout: t.Optional[float] = None,
+    ) -> int:
+        """Call handler and write its records, return exit code.
+
+        With a timeout the handler is asked to stop through the "cancel" token
+        (or its task is cancelled if async), after a grace period the process
+        exits with TIMEOUT code.
+        """
+        if timeout is None:
+            result = call(handler, stdin=stdin, stdout=stdout, app=self)
+            return self.drain(settle(result), stdout=stdout)
+
+        token, code = CancelToken(timeout), TIMEOUT
+
+        try:
+            with Watchdog(timeout, token, expire=lambda: self.expire(timeout)):
+                result = call(handler, stdin=stdin, stdout=stdout, app=self, cancel=token)
+                result = settle(result, timeout=token.remaining)
+                code = self.drain(result, stdout=stdout, cancel=token)
+        except ConsoleTimeoutException:
+            token.cancel()
+
+        if token.cancelled:  # Handler raised or returned once asked to stop
+            self.report_timeout(timeout)
+            return TIMEOUT
+
+        return code
+
+    def report_timeout(self, timeout: float) -> None:
+        """Write timeout error with the timings record of the run so far."""
+        self._timings["timeout"] = timeout
+        self.stderr.write(
+            "{msg} Timings: {timings}".format(
+                msg=ERR_MSG_TIMEOUT.format(timeout=timeout),
+                timings=" ".join(
+                    "{phase}={seconds:.3f}s".format(phase=phase, seconds=seconds)
+                    for phase, seconds in self._timings.items()
+                ),
+            )
+        )
 
-    def do_dispatch(self, stdin: BaseInput) -> None:  # dead: disable
+    def expire(self, timeout: float) -> None:
+        """Exit the process if a handler ignores cancellation, flushing outputs."""
+        try:
+            self.report_timeout(timeout)
+            self.flush()
+        finally:
+            os._exit(TIMEOUT)
+
+    def do_dispatch(self, stdin: BaseInput) -> int:  # dead: disable
         """Dispatch commands."""
-        self.show_help()
-        # raise NotImplementedError()
+        command = self.find_command(stdin.get_arg("command"))
+
+        if command is None:
+            return self.show_help()
+
+        self._command = command.options[0]
+        if command.options[0] in self._limits:
+            return self.do_limited(command, stdin=stdin)
+
+        return self.do_command(command, stdin=stdin)
+
+    def do_limited(self, command: InputCommand, stdin: BaseInput) -> int:
+        """Run command in a free instance slot, following its busy policy.
+
+        Waiting for a slot counts against the command timeout, BUSY is returned
+        if no slot was freed within it.
+        """
+        size, policy = self._limits[command.options[0]]
+        slots = Slots(
+            "{prog}.{name}".format(prog=self.prog, name=command.options[0]), size=size
+        )
+        timeout = self.timeout_for(stdin, command=command.options[0])
+
+        try:
+            with self.timed("wait"):
+                slot = slots.acquire(policy, timeout=timeout)
+        except ConsoleBusyException as e:
+            self.stderr.write(str(e))
+            return BUSY
+        except OSError as e:
+            self.stderr.write("could not take instance slot: {e}".format(e=e))
+            return FAILURE
+
+        if slot is None:  # Skipped, another instance does the work
+            return SUCCESS
+
+        with slot:
+            return self.do_command(command, stdin=stdin, spent=slot.waited)
+
+    def do_command(
+        self, command: InputCommand, stdin: BaseInput, spent: float = 0.0
+    ) -> int:
+        """Run command handler, replay its cached results if enabled."""
+        if command.options[0] in self._cached and not stdin.has_arg("no_cache"):
+            return self.do_cached(command, stdin=stdin, spent=spent)
+
+        handler = self.load_handler(command)
+        timeout = self.timeout_for(stdin, command=command.options[0], spent=spent)
+        return self.call_handler(handler, stdin, self.stdout, timeout=timeout)
+
+    def do_cached(
+        self, command: InputCommand, stdin: BaseInput, spent: float = 0.0
+    ) -> int:
+        """Replay cached command output and exit code, run and store on a miss.
+
+        Results are keyed by application name, version and command too, so apps
+        sharing the cache directory never replay each other results.
+        """
+        from mediapills.console.caches import cache_key
+
+        env, files = self._cached[command.options[0]]
+        args = {k: v for k, v in stdin.get_args().items() if k != "no_cache"}
+        key = cache_key(
+            {**args, "": [self.prog, self.version, command.options[0]]},
+            env=env,
+            files=files,
+            digest=self.hash_index.digest,
+        )
+
+        result = self.results_cache.get(key)
+        if result is not None:
+            messages, code = result
+            for msg, newline, options in messages:
+                self.stdout.write(msg, newline=newline, options=options)
+            return code
+
+        handler = self.load_handler(command)
+        stdout = self.stdout
+        self.stdout = recorder = RecordingOutput(stdout)
+
+        try:
+            timeout = self.timeout_for(stdin, command=command.options[0], spent=spent)
+            code = self.call_handler(handler, stdin, recorder, timeout=timeout)
+        finally:
+            self.stdout = stdout
+
+        if code != TIMEOUT:
+            self.results_cache.put(key, (recorder.messages, code))
+        return code
 
-    def do_entrypoint(self, stdin: BaseInput) -> None:
+    def do_pipe(self, stdin: BaseInput, stdout: BaseOutput) -> int:
+        """Run pipe command stages in-process, return last stage exit code.
+
+        Handlers taking "records" argument receive the previous stage records,
+        handlers returning an iterable produce records for the next stage.
+        """
+        stages = []
+
+        for line in stdin.get_arg("stages") or []:  # type: ignore
+            stage = ConsoleInput(parser=self.parser, argv=shlex.split(line))
+            try:
+                stage.validate()
+            except ConsoleUnrecognizedArgumentsException as e:
+                self.stderr.write("unrecognized arguments: {msg}".format(msg=str(e)))
+                return FAILURE
+
+            command = self.find_command(stage.get_arg("command"))
+            if command is None or command.handler == self.do_pipe:
+                self.stderr.write("invalid pipeline stage: {line}".format(line=line))
+                return FAILURE
+
+            stages.append((line, self.load_handler(command), stage))
+
+        try:
+            result = compose(
+                stages, stdout=stdout, threaded=stdin.has_arg("threaded"), app=self
+            )
+        except ConsoleException as e:
+            self.stderr.write(str(e))
+            return FAILURE
+
+        return self.drain(result)
+
+    def do_entrypoint(self, stdin: BaseInput) -> int:
         """Run entrypoint."""
         if callable(self._entrypoint):
-            code = self._entrypoint(stdin=stdin, stdout=self.stdout)
-            exit(code)
+            timeout = self.timeout_for(stdin)
+            return self.call_handler(
+                self._entrypoint, stdin, self.stdout, timeout=timeout
+            )
         else:
             raise RuntimeError("Entrypoint is not callable.")
 
-    def show_help(self, code: int = SUCCESS) -> None:
-        """Show application help"""
-        self.stdout.write(self.parser.help())
-        exit(code)
+    def show_help(self, code: int = SUCCESS) -> int:
+        """Show application help, paged if longer than the terminal."""
+        text = self.parser.help()
+
+        with paged(self.stdout):
+            self.stdout.write(text)
+
+        self.stdout.flush()
+        return code
 
     def entrypoint(
         self, *args: t.List[t.Any], **kwargs: t.Dict[t.Any, t.Any]
@@ -158,15 +920,69 @@ def decorator(func: TCallable) -> TCallable:
 
         return decorator
 
-    def command(self, *args: t.Any, **kwargs: t.Any) -> TCallable:
-        """Decorate a view function to register command in application."""
+    def command(
+        self,
+        *args: t.Any,
+        handler: t.Optional[str] = None,
+        cache: bool = False,
+        cache_env: t.Sequence[str] = (),
+        cache_files: t.Sequence[str] = (),
+        timeout: t.Optional[float] = None,
+        max_instances: t.Optional[int] = None,
+        on_busy: str = SLOT_POLICY_WAIT,
+        **kwargs: t.Any
+    ) -> TCallable:
+        """Decorate a view function to register command in application.
+
+        A handler given as "package.module:function" registers the command right
+        away, its module is imported only when the command is dispatched.
+
+        Results of a cached command are replayed while its arguments, cache_env
+        variables and content of cache_files arguments paths are unchanged.
+        A timeout in seconds bounds the command run unless --timeout is given.
+
+        At most max_instances copies of the command run at once across processes.
+        Another copy waits for a free slot, exits with SUCCESS or exits with BUSY
+        code when on_busy is "wait", "skip" or "fail". The wait counts against
+        the command timeout.
+        """
+        if cache:
+            self.cache(args[0], env=cache_env, files=cache_files)
+
+        if timeout is not None:
+            self._timeouts[args[0]] = timeout
+
+        if max_instances is not None:
+            if on_busy not in SLOT_POLICIES:
+                raise ValueError(
+                    ERR_MSG_SLOT_POLICY.format(
+                        policy=on_busy, policies=", ".join(SLOT_POLICIES)
+                    )
+                )
+            self._limits[args[0]] = (max_instances, on_busy)
 
         def decorator(func: TCallable) -> TCallable:
             # TODO raise error if already defined
             command = InputCommand(*args, **kwargs)
-            command.execute = MethodType(func, command)  # type: ignore
+            command.handler = func
             self.commands.append(command)
 
             return func
 
+        if handler is not None:
+            self.commands.append(InputCommand(*args, handler=handler, **kwargs))
+            return lambda func: func
+
         return decorator
+
+    def cache(
+        self, name: str, env: t.Sequence[str] = (), files: t.Sequence[str] = ()
+    ) -> None:
+        """Cache results of a command, add --no-cache option to bypass them."""
+        if not self._cached:
+            self.options.append(
+                InputOption("--no-cache", description="bypass commands results cache.")
+            )
+            self._parser = None
+
+        self._cached[name] = (tuple(env), tuple(files))
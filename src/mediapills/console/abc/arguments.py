@@ -21,31 +21,30 @@
 import abc
 from typing import Any
 from typing import List
+from typing import Sequence
+from typing import Tuple
 
 
 class BaseArgument(metaclass=abc.ABCMeta):
     """Argument Abstraction."""
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        """Class constructor."""
-        self._options = [*args]
-        self._description = ""
-        self.__construct(**kwargs)
+    __slots__ = ("_options", "_description")
 
-    def __construct(self, description: str = "") -> None:
-        """Class strict constructor."""
+    def __init__(self, *args: Any, description: str = "") -> None:
+        """Class constructor."""
+        self._options: Tuple[str, ...] = args
         self._description = description
 
     @property
-    def options(self) -> List[str]:
+    def options(self) -> Tuple[str, ...]:
         """Options names getter."""
         return self._options
 
     @options.setter
-    def options(self, options: List[str]) -> None:  # pragma: no cover
+    def options(self, options: Sequence[str]) -> None:  # pragma: no cover
         """Options names setter."""
         # TODO: Add argument name validator IEEE Std 1003.1-2017
-        self._options = options
+        self._options = tuple(options)
 
     @property
     def description(self) -> str:
@@ -0,0 +1,68 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import abc
+import typing as t
+
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.arguments import TInputCommands
+from mediapills.console.arguments import TInputOptions
+from mediapills.console.arguments import TInputParameters
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from mediapills.console import Application
+
+
+class BaseFeature(metaclass=abc.ABCMeta):
+    """Abstract Base Class for opt-in application features.
+
+    A feature adds its arguments to the application and hooks into the run:
+    every hook is a no-op by default, so a feature overrides only what it uses.
+    """
+
+    @property
+    def options(self) -> TInputOptions:
+        """Options added to the application."""
+        return []
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Parameters added to the application."""
+        return []
+
+    def commands(self, app: "Application") -> TInputCommands:
+        """Return commands added to the application."""
+        return []
+
+    def start(self, app: "Application") -> None:
+        """Prepare the application before each run."""
+        pass
+
+    def configure(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Apply feature arguments, return exit code to stop the run on error."""
+        return None
+
+    def dispatch(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Run feature mode instead of a command if requested, return exit code."""
+        return None
+
+    def finish(self, app: "Application") -> None:
+        """Export or release feature resources after each run."""
+        pass
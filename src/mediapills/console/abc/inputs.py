@@ -20,9 +20,12 @@
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 import abc
 from typing import Dict
+from typing import Iterator
 from typing import Optional
 from typing import Union
 
+from mediapills.console import streams
+
 
 class BaseInput(metaclass=abc.ABCMeta):
     """Abstract Base Class for all Input classes."""
@@ -64,4 +67,23 @@ def validate(self) -> None:
 class BaseConsoleInput(BaseInput, metaclass=abc.ABCMeta):
     """Abstract Base Class for all Console Input classes."""
 
-    pass
+    def source(self) -> Optional[str]:
+        """Return path given with --input parameter, None for standard input.
+
+        The parameter is added by Application(features=[InputFeature()]).
+        """
+        path = self.get_arg("input")
+
+        return None if path is None else str(path)
+
+    def chunks(self, size: int = streams.CHUNK_SIZE) -> Iterator[memoryview]:
+        """Iterate input chunks, views are valid until the next chunk."""
+        return streams.chunks(self.source(), size)
+
+    def records(self, separator: bytes = b"\n") -> Iterator[bytes]:
+        """Iterate input records split by separator."""
+        return streams.records(self.source(), separator)
+
+    def lines(self, encoding: str = "utf-8") -> Iterator[str]:
+        """Iterate decoded input lines."""
+        return streams.lines(self.source(), encoding)
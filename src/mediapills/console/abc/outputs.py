@@ -19,6 +19,8 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 import abc
+import contextlib
+from typing import Iterator
 
 VERBOSITY_QUIET = 2 ** 3
 VERBOSITY_NORMAL = 2 ** 4
@@ -40,6 +42,15 @@
 """Misuse of shell builtins (according to Bash documentation)."""
 INVALID = 2  # dead: disable
 
+"""Temporary failure, e.g. command instances limit reached (sysexits.h)."""
+BUSY = 75
+
+"""Command timed out (as reported by coreutils timeout)."""
+TIMEOUT = 124
+
+"""Output pipe was closed by the reader (128 + SIGPIPE, as reported by shells)."""
+BROKEN_PIPE = 141
+
 
 class BaseOutput(metaclass=abc.ABCMeta):
     """Abstract Base Class for all Output classes."""
@@ -54,6 +65,15 @@ def writeln(self, msg: str, options: int = 0) -> None:
         """Write a message to the output and adds a newline at the end."""
         raise NotImplementedError()
 
+    def flush(self) -> None:
+        """Wait until all written messages reach the output."""
+        pass
+
+    @contextlib.contextmanager
+    def paged(self) -> Iterator[None]:
+        """Show messages written in the block through a pager if supported."""
+        yield
+
 
 class BaseVerboseAwareOutput(BaseOutput, metaclass=abc.ABCMeta):
     """Verbose aware base output."""
@@ -19,9 +19,17 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 import abc
+import functools
 import typing as t
+from argparse import _SubParsersAction
+from argparse import Action
+from argparse import ArgumentError
 from argparse import ArgumentParser
 
+from mediapills.console.suggestions import BKTree
+from mediapills.console.suggestions import explain
+from mediapills.console.suggestions import suggest
+
 TParserResult = t.Tuple[t.Dict[str, str], t.List[str]]
 
 
@@ -38,16 +46,117 @@ def help(self) -> str:
         """Print a help message, including the program usage and registered arguments."""
         raise NotImplementedError
 
+    def scan(self, argv: t.List[str]) -> t.Optional[t.Dict[str, t.Any]]:
+        """Return parsing result without building the parser, None if not possible."""
+        return None
+
+    def suggest(self, token: str) -> t.List[str]:
+        """Return registered names similar to an unrecognized token."""
+        return []
+
 
 class ConsoleArgumentParser(ArgumentParser):
     """Custom Class for parsing command line strings into Python objects."""
 
+    def __init__(
+        self,
+        *args: t.Any,
+        populate: t.Optional[t.Callable[["ConsoleArgumentParser"], t.Any]] = None,
+        **kwargs: t.Any
+    ) -> None:
+        """Class constructor."""
+        super().__init__(*args, **kwargs)
+        self._populate = populate
+
+    def populate(self) -> None:
+        """Add arguments deferred until the parser is used for the first time."""
+        if self._populate is not None:
+            populate, self._populate = self._populate, None
+            populate(self)
+
+    def parse_known_args(  # type: ignore
+        self, args: t.Optional[t.Sequence[str]] = None, namespace: t.Any = None
+    ) -> t.Tuple[t.Any, t.List[str]]:
+        """Parse known arguments, adding deferred arguments first."""
+        self.populate()
+        return super().parse_known_args(args, namespace)
+
+    def format_usage(self) -> str:
+        """Return usage, adding deferred arguments first."""
+        self.populate()
+        return super().format_usage()
+
+    def format_help(self) -> str:
+        """Return help, adding deferred arguments first."""
+        self.populate()
+        return super().format_help()
+
     def exit(  # type: ignore
         self, status: int = 0, message: t.Optional[str] = None
     ) -> None:
         """Exit from parsing execution."""
         super().exit(status=status, message=message)
 
+    def _check_value(self, action: Action, value: t.Any) -> None:
+        """Check value is a valid choice, suggest similar command names if not."""
+        try:
+            super()._check_value(action, value)
+        except ArgumentError as e:
+            if not isinstance(action, LazySubParsersAction):
+                raise
+            raise ArgumentError(action, explain(e.message, action.suggest(value)))
+
     def error(self, message: str) -> None:  # type: ignore
         """Print a usage message incorporating the message to stderr and exits."""
         super().error(message=message)
+
+
+class SubParsersMap(dict):  # type: ignore
+    """Command name to sub parser mapping building sub parsers on first lookup."""
+
+    def __getitem__(self, name: str) -> ArgumentParser:
+        """Return sub parser by command name or alias."""
+        parser = super().__getitem__(name)
+
+        if isinstance(parser, functools.partial):
+            factory, parser = parser, parser()
+            for key, value in [*self.items()]:
+                if value is factory:  # the command name and its aliases
+                    self[key] = parser
+
+        return parser  # type: ignore
+
+
+class LazySubParsersAction(_SubParsersAction):  # type: ignore
+    """Sub commands action creating only the sub parser of a selected command."""
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Class constructor."""
+        super().__init__(*args, **kwargs)
+        self._name_parser_map = self.choices = SubParsersMap()
+        self._names: t.Optional[BKTree] = None
+
+    def add_parser(self, name: str, **kwargs: t.Any) -> None:
+        """Register sub parser to be created when its command is selected."""
+        if kwargs.get("prog") is None:
+            kwargs["prog"] = "{prefix} {name}".format(
+                prefix=self._prog_prefix, name=name
+            )
+
+        aliases = kwargs.pop("aliases", ())
+
+        if "help" in kwargs:
+            self._choices_actions.append(
+                self._ChoicesPseudoAction(name, aliases, kwargs.pop("help"))
+            )
+
+        factory = functools.partial(self._parser_class, **kwargs)  # type: ignore
+        for key in (name, *aliases):
+            self._name_parser_map[key] = factory
+
+    def suggest(self, name: str) -> t.List[str]:
+        """Return command names similar to an unknown one (index built on first use)."""
+        if self._names is None:
+            self._names = BKTree(self._name_parser_map)
+
+        return suggest(name, self._names)
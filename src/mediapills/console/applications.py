@@ -25,12 +25,17 @@
 
 from mediapills.console.abc.inputs import BaseInput
 from mediapills.console.abc.outputs import BaseConsoleOutput
+from mediapills.console.abc.outputs import FAILURE
 from mediapills.console.abc.outputs import SUCCESS
 from mediapills.console.arguments import InputOption
+from mediapills.console.arguments import InputParameter
 from mediapills.console.arguments import TInputCommands
 from mediapills.console.arguments import TInputOptions
 from mediapills.console.arguments import TInputParameters
 
+"""Built-in arguments showing information and ending the run (e.g. --help)."""
+BUILTIN_EXIT_ARGUMENTS = ("help", "version", "completion")
+
 
 class BaseApplication(metaclass=abc.ABCMeta):
     """Interface  for the container a collection of commands."""
@@ -93,8 +98,8 @@ def version(self, version: str) -> None:
         self._version = version
 
     @abc.abstractmethod
-    def run(self) -> None:
-        """Run the current application."""
+    def run(self) -> int:
+        """Run the current application, return exit code."""
         raise NotImplementedError()
 
     @property
@@ -118,20 +123,22 @@ def default_options(self) -> TInputOptions:
 
         return options
 
-    def apply_options(self, stdin: BaseInput) -> None:
-        """Set default options."""
+    def apply_options(self, stdin: BaseInput) -> Optional[int]:
+        """Set default options, return exit code if an option ends the run."""
         if stdin.has_arg("help"):
-            self.show_help()
+            return self.show_help()
 
         if stdin.has_arg("version"):
-            self.show_version()
+            return self.show_version()
+
+        return None
 
     @abc.abstractmethod
-    def show_help(self) -> None:
-        """Show application version."""
+    def show_help(self, code: int = SUCCESS) -> int:
+        """Show application help."""
         raise NotImplementedError()
 
-    def show_version(self) -> None:
+    def show_version(self) -> int:
         """Show application version."""
         sys_version = ".".join(
             (
@@ -151,7 +158,8 @@ def show_version(self) -> None:
         )
 
         self.stdout.write(ver)
-        exit(SUCCESS)
+        self.stdout.flush()
+        return SUCCESS
 
 
 class VerboseAwareApplication(BaseApplication, metaclass=abc.ABCMeta):
@@ -191,15 +199,18 @@ def default_options(self) -> TInputOptions:
 
         return options
 
-    def apply_options(self, stdin: BaseInput) -> None:
+    def apply_options(self, stdin: BaseInput) -> Optional[int]:
         """Set output verbosity level."""
-        super().apply_options(stdin)
+        code = super().apply_options(stdin)
+
+        if code is not None:
+            return code
 
         if stdin.has_arg("quiet"):
             self.stdout.set_quiet()
 
         if not stdin.has_arg("v"):
-            return
+            return None
         elif stdin.get_arg("v") == 1:
             self.stdout.set_verbose()
         elif stdin.get_arg("v") == 2:
@@ -207,6 +218,8 @@ def apply_options(self, stdin: BaseInput) -> None:
         else:
             self.stdout.set_debug()
 
+        return None
+
 
 class ApplicationWithArguments(VerboseAwareApplication, metaclass=abc.ABCMeta):
     """Abstract Base Application with arguments."""
@@ -219,6 +232,7 @@ def __init__(
         version: str = "",
         show_help: bool = False,
         show_version: bool = False,
+        show_completion: bool = False,
     ):
         """Class constructor."""
         super().__init__(
@@ -229,10 +243,51 @@ def __init__(
             show_version=show_version,
             show_help=show_help,
         )
+        self._show_completion = show_completion
         self._options: TInputOptions = self.default_options
-        self._parameters: TInputParameters = []
+        self._parameters: TInputParameters = self.default_parameters
         self._commands: TInputCommands = []
 
+    @property
+    def default_parameters(self) -> TInputParameters:
+        """Default parameters getter."""
+        parameters = []
+
+        if self._show_completion:  # Add shell completion script parameter
+            parameters.append(
+                InputParameter(
+                    "--completion",
+                    description="show shell completion script (bash, zsh or fish).",
+                )
+            )
+
+        return parameters
+
+    def apply_options(self, stdin: BaseInput) -> Optional[int]:
+        """Set default options."""
+        code = super().apply_options(stdin)
+
+        if code is None and stdin.has_arg("completion"):
+            return self.show_completion(str(stdin.get_arg("completion")))
+
+        return code
+
+    def show_completion(self, shell: str) -> int:
+        """Show static shell completion script."""
+        from mediapills.console import completion
+
+        try:
+            script = completion.generate(
+                [*self.parameters, *self.options, *self.commands], shell=shell
+            )
+        except ValueError as e:
+            self.stderr.write(str(e))
+            return FAILURE
+
+        self.stdout.write(script.rstrip("\n"))
+        self.stdout.flush()
+        return SUCCESS
+
     @property
     def options(self) -> TInputOptions:
         """Application options getter."""
@@ -19,6 +19,7 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 from typing import Any
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Union
@@ -27,6 +28,7 @@
 from mediapills.console.abc.arguments import TBaseArguments
 from mediapills.console.abc.inputs import BaseInput
 from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.loaders import import_string
 
 DefaultValue = Optional[Union[str, int, List[Union[str, int]]]]
 
@@ -55,31 +57,69 @@
 ERR_MSG_DEFAULT_VALUE_TYPE = "A default value should be 'int' or 'str' type."
 
 
+def mode_error(mode: int) -> Optional[str]:
+    """Return error message for an invalid argument mode, None if it is valid."""
+    if mode > 7 or mode < 1:
+        return ERR_MSG_INVALID_MODE.format(mode=mode)
+
+    if mode & VALUE_OPTIONAL and mode & VALUE_REQUIRED:
+        return ERR_MSG_MODE_CONSTRAINT
+
+    return None
+
+
+"""Argument modes validated once, so a mode check is a set lookup."""
+VALID_MODES = frozenset(mode for mode in range(8) if mode_error(mode) is None)
+
+
+def default_error(mode: int, default: DefaultValue) -> Optional[str]:
+    """Return error message for an invalid default value, None if it is valid."""
+    if default is None:
+        return None
+
+    if mode & VALUE_REQUIRED:
+        return ERR_MSG_DEFAULT_ASSIGNMENT
+
+    if mode & VALUE_IS_ARRAY:
+        return None if isinstance(default, list) else ERR_MSG_DEFAULT_ARRAY_VALUE
+
+    if not isinstance(default, (str, int)) or isinstance(default, bool):
+        return ERR_MSG_DEFAULT_VALUE_TYPE
+
+    return None
+
+
 class InputOption(BaseArgument):  # type: ignore
     """Input Argument Option implementation."""
 
-    pass
+    __slots__ = ()
 
 
 class InputParameter(BaseArgument):  # type: ignore
     """Input Argument Parameter implementation."""
 
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        """Class constructor."""
-        super().__init__(*args, description=kwargs.get("description", ""))
-        self._mode = VALUE_OPTIONAL
-        self._default: DefaultValue = None
-        self.__construct(**kwargs)
+    __slots__ = ("_mode", "_default", "_completer")
 
-    def __construct(
+    def __init__(
         self,
+        *args: Any,
         mode: int = VALUE_OPTIONAL,
         default: DefaultValue = None,
-        description: str = "",  # dead: disable
+        description: str = "",
+        completer: Optional[str] = None
     ) -> None:
-        """Class strict constructor."""
-        self.mode = mode
-        self.default = default
+        """Class constructor."""
+        if mode not in VALID_MODES:
+            raise ValueError(mode_error(mode))
+
+        if default is not None and default_error(mode, default) is not None:
+            raise ValueError(default_error(mode, default))
+
+        self._options = args
+        self._description = description
+        self._mode = mode
+        self._default = default
+        self._completer = completer
 
     @property
     def mode(self) -> int:
@@ -89,11 +129,8 @@ def mode(self) -> int:
     @mode.setter
     def mode(self, mode: int) -> None:
         """Argument mode setter."""
-        if mode > 7 or mode < 1:
-            raise ValueError(ERR_MSG_INVALID_MODE.format(mode=mode))
-
-        if mode & VALUE_OPTIONAL and mode & VALUE_REQUIRED:
-            raise ValueError(ERR_MSG_MODE_CONSTRAINT)
+        if mode not in VALID_MODES:
+            raise ValueError(mode_error(mode))
 
         self._mode = mode
 
@@ -117,47 +154,91 @@ def default(self) -> DefaultValue:
     @default.setter
     def default(self, default: DefaultValue = None) -> None:
         """Argument default value setter."""
-        if self.mode & VALUE_REQUIRED > 0 and default is not None:
-            raise ValueError(ERR_MSG_DEFAULT_ASSIGNMENT)
-
-        if self.is_array():
-            if default is None:
-                self._default = []
-            elif not isinstance(default, list):
-                raise ValueError(ERR_MSG_DEFAULT_ARRAY_VALUE)
-        elif default is None:
-            pass
-        elif not isinstance(default, (str, int)) or isinstance(default, bool):
-            raise ValueError(ERR_MSG_DEFAULT_VALUE_TYPE)
+        error = default_error(self._mode, default)
+        if error is not None:
+            raise ValueError(error)
 
         self._default = default
 
+    @property
+    def completer(self) -> Optional[str]:
+        """Argument values provider getter."""
+        return self._completer
+
+    @completer.setter
+    def completer(self, completer: Optional[str]) -> None:
+        """Argument values provider setter ("package.module:function" path)."""
+        self._completer = completer
+
 
 TInputOptions = List[InputOption]
 TInputParameters = List[InputParameter]
 
+"""Arguments list or callable building it when first needed."""
+TLazyArguments = Union[TBaseArguments, Callable[[], TBaseArguments]]
+
+"""Handler callable or its "package.module:function" import path."""
+THandler = Union[Callable[..., Any], str]
+
 
 class InputCommand(BaseArgument):  # type: ignore
     """Interface for all console commands."""
 
+    __slots__ = ("_arguments", "_handler")
+
     def __init__(
         self,
         *args: Any,
-        arguments: Optional[TBaseArguments] = None,
-        description: str = ""
+        arguments: Optional[TLazyArguments] = None,
+        description: str = "",
+        handler: Optional[THandler] = None
     ) -> None:
         """Class constructor."""
-        super().__init__(*args, description=description)
+        self._options = args
+        self._description = description
         self._arguments = arguments or []
+        self._handler = handler
 
     @property
     def arguments(self) -> TBaseArguments:
-        """Command arguments getter."""
+        """Command arguments getter (built on first access if given as callable)."""
+        if callable(self._arguments):
+            self._arguments = self._arguments()
+
         return self._arguments
 
+    @property
+    def handler(self) -> Optional[THandler]:
+        """Command handler getter."""
+        return self._handler
+
+    @handler.setter
+    def handler(self, handler: Optional[THandler]) -> None:
+        """Command handler setter (callable or "package.module:function" path)."""
+        self._handler = handler
+
+    def resolve(self) -> Callable[..., Any]:
+        """Return handler callable, importing it on first use if given as path.
+
+        A command without handler runs its own execute method, if overridden.
+        """
+        if self._handler is None:
+            if type(self).execute is InputCommand.execute:
+                raise NotImplementedError()
+            return self.execute
+
+        if isinstance(self._handler, str):
+            handler = import_string(self._handler)
+            # Path can also point to a command object (e.g. plugin entry point)
+            self._handler = (
+                handler.resolve() if isinstance(handler, InputCommand) else handler
+            )
+
+        return self._handler
+
     def execute(self, stdin: BaseInput, stdout: BaseOutput) -> int:  # dead: disable
         """Execute the current command."""
-        raise NotImplementedError()
+        return self.resolve()(stdin=stdin, stdout=stdout)  # type: ignore
 
 
 TInputCommands = List[InputCommand]
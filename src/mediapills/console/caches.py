@@ -0,0 +1,163 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import hashlib
+import json
+import os
+import tempfile
+import typing as t
+
+"""Results cache size limit in bytes, least recently used results are evicted."""
+RESULTS_CACHE_SIZE = 64 << 20
+
+"""Bytes read at once while hashing input files."""
+HASH_CHUNK_SIZE = 1 << 20
+
+RESULT_EXTENSION = ".result"
+
+"""Written messages (message, newline, options) and exit code of a command."""
+TResult = t.Tuple[t.List[t.Tuple[str, bool, int]], int]
+
+
+def cache_dir() -> str:
+    """Return directory the commands results are cached in."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(root, "mediapills-console", "results")
+
+
+def file_digest(path: str) -> t.Optional[str]:
+    """Return file content hash, None if the file can not be read."""
+    digest = hashlib.sha256()
+
+    try:
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+
+    return digest.hexdigest()
+
+
+def cache_key(
+    args: t.Dict[str, t.Any],
+    env: t.Sequence[str] = (),
+    files: t.Sequence[str] = (),
+    digest: t.Callable[[str], t.Optional[str]] = file_digest,
+) -> str:
+    """Return cache key of parsed arguments, environment variables and files.
+
+    Files are names of arguments holding a path (or a list of paths), their
+    content digest is part of the key so an edited input file invalidates it.
+    """
+    digests = {}
+
+    for name in files:
+        value = args.get(name)
+        for path in value if isinstance(value, list) else [value]:
+            if path is not None:
+                digests[str(path)] = digest(str(path))
+
+    document = json.dumps(
+        [args, {name: os.environ.get(name) for name in env}, digests],
+        sort_keys=True,
+        default=str,
+    )
+
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+class ResultsCache:
+    """Commands results stored in a local directory with size bounded LRU."""
+
+    def __init__(
+        self, directory: t.Optional[str] = None, max_size: int = RESULTS_CACHE_SIZE
+    ):
+        """Class constructor."""
+        self._directory = directory or cache_dir()
+        self._max_size = max_size
+
+    @property
+    def directory(self) -> str:
+        """Cache directory getter."""
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        """Cache size limit in bytes getter."""
+        return self._max_size
+
+    def path(self, key: str) -> str:
+        """Return path of a result file."""
+        return os.path.join(self.directory, key + RESULT_EXTENSION)
+
+    def get(self, key: str) -> t.Optional[TResult]:
+        """Return cached result, None if missing, unreadable or malformed."""
+        path = self.path(key)
+
+        try:
+            with open(path, encoding="utf-8") as fh:
+                messages, code = json.load(fh)
+            result = (
+                [(str(msg), bool(newline), int(opts)) for msg, newline, opts in messages],
+                int(code),
+            )
+            os.utime(path)  # Mark as recently used
+        except (OSError, TypeError, ValueError):  # ValueError for invalid JSON too
+            return None
+
+        return result
+
+    def put(self, key: str, result: TResult) -> None:
+        """Store result and evict least recently used ones over the size limit."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(result, fh)
+            os.replace(tmp, self.path(key))
+        except OSError:  # pragma: no cover
+            return  # Caching is best effort
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used results until cache fits the size limit."""
+        entries = []
+        total = 0
+
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(RESULT_EXTENSION):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                return
+            try:
+                os.remove(path)
+            except OSError:  # Removed by a concurrent run
+                pass
+            total -= size
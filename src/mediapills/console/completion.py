@@ -0,0 +1,384 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import hashlib
+import importlib
+import os
+import re
+import shlex
+import sys
+import tempfile
+import time
+import typing as t
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from mediapills.console.abc.arguments import BaseArgument
+
+# This module is also executed as a plain script by the generated completion
+# scripts, so it must not import anything from the package at module level.
+
+SHELLS = ("bash", "zsh", "fish")
+
+"""Seconds a dynamic values provider result is reused between TAB presses."""
+COMPLETION_CACHE_TTL = 60
+
+ERR_MSG_UNSUPPORTED_SHELL = 'Shell "{shell}" is not supported, use one of: {shells}.'
+
+ERR_MSG_INVALID_PROVIDER = 'Values provider "{path}" is not a valid import path.'
+
+
+class Scope:
+    """Arguments available after a command word (or at the top level)."""
+
+    def __init__(self, name: str = "") -> None:
+        """Class constructor."""
+        self.name = name
+        self.flags: t.List[t.Tuple[t.List[str], str]] = []
+        self.values: t.List[t.Tuple[t.List[str], t.Optional[str], str]] = []
+        self.positionals: t.List[str] = []
+        self.commands: t.List[t.Tuple[str, str]] = []
+
+    @property
+    def words(self) -> t.List[str]:
+        """Static words completed in this scope."""
+        words = [opt for opts, _ in self.flags for opt in opts]
+        words.extend(opt for opts, _, _ in self.values for opt in opts)
+        words.extend(name for name, _ in self.commands)
+
+        return words
+
+
+def collect(arguments: t.Sequence["BaseArgument"], name: str = "") -> t.List[Scope]:
+    """Flatten an arguments tree into completion scopes, the top level first."""
+    from mediapills.console.arguments import InputParameter
+
+    scope, nested = Scope(name), []
+
+    for arg in arguments:
+        if callable(getattr(arg, "execute", None)):
+            for opt in arg.options:
+                scope.commands.append((opt, arg.description))
+                nested.extend(collect(getattr(arg, "arguments", []), name=opt))
+        elif isinstance(arg, InputParameter):
+            if arg.options[0].startswith("-"):
+                scope.values.append((list(arg.options), arg.completer, arg.description))
+            elif arg.completer is not None:
+                scope.positionals.append(arg.completer)
+        else:
+            scope.flags.append((list(arg.options), arg.description))
+
+    return [scope, *nested]
+
+
+def script_command(ttl: int) -> str:
+    """Return the shell command the scripts use to call a values provider."""
+    path = os.path.abspath(__file__)
+    if os.path.isfile(path):  # run as a script to skip the package imports
+        cmd = [sys.executable, path]
+    else:  # pragma: no cover
+        cmd = [sys.executable, "-m", __name__]
+
+    return " ".join(shlex.quote(part) for part in [*cmd, str(ttl)])
+
+
+def render_bash(prog: str, scopes: t.List[Scope], ttl: int) -> str:
+    """Render bash completion script."""
+    fn = _function_name(prog)
+    names = sorted({name for scope in scopes for name, _ in scope.commands})
+    lines = [
+        "# bash completion for {prog}".format(prog=prog),
+        "_{fn}_values() {{".format(fn=fn),
+        '    {cmd} "$1" 2>/dev/null'.format(cmd=script_command(ttl)),
+        "}",
+        "_{fn}() {{".format(fn=fn),
+        "    local cur prev scope i",
+        '    cur="${COMP_WORDS[COMP_CWORD]}"',
+        '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        '    scope=""',
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        case "${COMP_WORDS[i]}" in',
+    ]
+    if names:
+        lines.append(
+            '            {names}) scope="${{COMP_WORDS[i]}}" ;;'.format(
+                names="|".join(shlex.quote(name) for name in names)
+            )
+        )
+    lines.extend(["        esac", "    done", '    case "$scope" in'])
+
+    for scope in scopes:
+        lines.append("        {name})".format(name=shlex.quote(scope.name)))
+        lines.append('            case "$prev" in')
+        for opts, completer, _ in scope.values:
+            lines.append(
+                "                {opts}) {reply}; return ;;".format(
+                    opts="|".join(opts), reply=_bash_reply(fn, completer)
+                )
+            )
+        lines.append("            esac")
+        words = " ".join(scope.words)
+        reply = 'COMPREPLY=($(compgen -W "{words}" -- "$cur"))'.format(words=words)
+        for completer in scope.positionals:
+            reply += (
+                ' COMPREPLY+=($(compgen -W "$(_{fn}_values {path})" -- "$cur"))'.format(
+                    fn=fn, path=shlex.quote(completer)
+                )
+            )
+        lines.extend(["            " + reply, "            ;;"])
+
+    lines.extend(
+        [
+            "    esac",
+            "}",
+            "complete -F _{fn} {prog}".format(fn=fn, prog=shlex.quote(prog)),
+        ]
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+def render_zsh(prog: str, scopes: t.List[Scope], ttl: int) -> str:
+    """Render zsh completion script."""
+    fn = _function_name(prog)
+    names = sorted({name for scope in scopes for name, _ in scope.commands})
+    lines = [
+        "#compdef {prog}".format(prog=prog),
+        "_{fn}_values() {{".format(fn=fn),
+        '    {cmd} "$1" 2>/dev/null'.format(cmd=script_command(ttl)),
+        "}",
+        "_{fn}() {{".format(fn=fn),
+        '    local scope="" prev="${words[CURRENT-1]}" i',
+        "    for ((i = 2; i < CURRENT; i++)); do",
+        '        case "${words[i]}" in',
+    ]
+    if names:
+        lines.append(
+            '            ({names}) scope="${{words[i]}}" ;;'.format(
+                names="|".join(shlex.quote(name) for name in names)
+            )
+        )
+    lines.extend(["        esac", "    done", '    case "$scope" in'])
+
+    for scope in scopes:
+        lines.append("        ({name})".format(name=shlex.quote(scope.name)))
+        lines.append('            case "$prev" in')
+        for opts, completer, _ in scope.values:
+            if completer is None:
+                reply = "_files"
+            else:
+                reply = 'compadd -- ${{(f)"$(_{fn}_values {path})"}}'.format(
+                    fn=fn, path=shlex.quote(completer)
+                )
+            lines.append(
+                "                ({opts}) {reply}; return ;;".format(
+                    opts="|".join(opts), reply=reply
+                )
+            )
+        lines.append("            esac")
+        for completer in scope.positionals:
+            lines.append(
+                '            compadd -- ${{(f)"$(_{fn}_values {path})"}}'.format(
+                    fn=fn, path=shlex.quote(completer)
+                )
+            )
+        lines.extend(
+            [
+                "            compadd -- {words}".format(words=" ".join(scope.words)),
+                "            ;;",
+            ]
+        )
+
+    lines.extend(
+        [
+            "    esac",
+            "}",
+            "compdef _{fn} {prog}".format(fn=fn, prog=shlex.quote(prog)),
+        ]
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+def render_fish(prog: str, scopes: t.List[Scope], ttl: int) -> str:
+    """Render fish completion script."""
+    fn = _function_name(prog)
+    top = scopes[0]
+    lines = [
+        "# fish completion for {prog}".format(prog=prog),
+        "function __{fn}_values".format(fn=fn),
+        "    {cmd} $argv[1] 2>/dev/null".format(cmd=script_command(ttl)),
+        "end",
+        "complete -c {prog} -f".format(prog=prog),
+    ]
+
+    def add(condition: str, spec: str, description: str) -> None:
+        line = "complete -c {prog} -n {cond} {spec}".format(
+            prog=prog, cond=_fish_quote(condition), spec=spec
+        )
+        if description:
+            line += " -d " + _fish_quote(description)
+        lines.append(line)
+
+    for scope in scopes:
+        if scope is top:
+            condition = "__fish_use_subcommand" if top.commands else "true"
+        else:
+            condition = "__fish_seen_subcommand_from " + scope.name
+
+        for name, description in scope.commands:
+            add(condition, "-a " + _fish_quote(name), description)
+        for opts, description in scope.flags:
+            add(condition, _fish_options(opts), description)
+        for opts, completer, description in scope.values:
+            if completer is None:
+                spec = "-r -F"
+            else:
+                spec = "-r -a " + _fish_quote(
+                    "(__{fn}_values {path})".format(fn=fn, path=shlex.quote(completer))
+                )
+            add(condition, _fish_options(opts) + " " + spec, description)
+        for completer in scope.positionals:
+            spec = "-a " + _fish_quote(
+                "(__{fn}_values {path})".format(fn=fn, path=shlex.quote(completer))
+            )
+            add(condition, spec, "")
+
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {"bash": render_bash, "zsh": render_zsh, "fish": render_fish}
+
+
+def generate(
+    arguments: t.Sequence["BaseArgument"],
+    shell: str,
+    prog: t.Optional[str] = None,
+    ttl: int = COMPLETION_CACHE_TTL,
+) -> str:
+    """Return a static completion script for the given arguments tree."""
+    if shell not in RENDERERS:
+        raise ValueError(
+            ERR_MSG_UNSUPPORTED_SHELL.format(shell=shell, shells=", ".join(SHELLS))
+        )
+
+    prog = prog or os.path.basename(sys.argv[0])
+
+    return RENDERERS[shell](prog, collect(arguments), ttl)
+
+
+def cache_dir() -> str:
+    """Return directory the dynamic values are cached in."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(root, "mediapills-console", "completion")
+
+
+def provider(path: str) -> t.Callable[[], t.Iterable[t.Any]]:
+    """Import values provider by "package.module:function" path."""
+    module, _, attrs = path.partition(":")
+    if not module or not attrs:
+        raise ValueError(ERR_MSG_INVALID_PROVIDER.format(path=path))
+
+    obj: t.Any = importlib.import_module(module)
+    for attr in attrs.split("."):
+        obj = getattr(obj, attr)
+
+    return obj  # type: ignore
+
+
+def cached_values(path: str, ttl: int = COMPLETION_CACHE_TTL) -> t.List[str]:
+    """Return provider values, calling the provider only if the cache expired."""
+    directory = cache_dir()
+    filename = os.path.join(directory, hashlib.sha1(path.encode()).hexdigest())
+
+    try:
+        if time.time() - os.stat(filename).st_mtime < ttl:
+            with open(filename, encoding="utf-8") as fh:
+                return fh.read().splitlines()
+    except OSError:
+        pass
+
+    values = [str(value) for value in provider(path)()]
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(values))
+        os.replace(tmp, filename)
+    except OSError:  # pragma: no cover
+        pass  # Caching is best effort
+
+    return values
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    """Completion entry point: print values of a provider, one per line."""
+    ttl, path = (sys.argv[1:] if argv is None else argv)[:2]
+
+    try:
+        values = cached_values(path, ttl=int(ttl))
+    except Exception:  # a broken provider must not break the shell
+        return 1
+
+    sys.stdout.write("".join(value + "\n" for value in values))
+
+    return 0
+
+
+def _function_name(prog: str) -> str:
+    return re.sub(r"\W", "_", os.path.basename(prog))
+
+
+def _bash_reply(fn: str, completer: t.Optional[str]) -> str:
+    if completer is None:
+        return 'COMPREPLY=($(compgen -f -- "$cur"))'
+
+    return 'COMPREPLY=($(compgen -W "$(_{fn}_values {path})" -- "$cur"))'.format(
+        fn=fn, path=shlex.quote(completer)
+    )
+
+
+def _fish_options(opts: t.List[str]) -> str:
+    specs = []
+    for opt in opts:
+        if opt.startswith("--"):
+            specs.append("-l " + opt[2:])
+        elif len(opt) == 2:
+            specs.append("-s " + opt[1:])
+        else:
+            specs.append("-o " + opt[1:])
+
+    return " ".join(specs)
+
+
+def _fish_quote(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(
+        os.path.abspath(__file__)
+    ):
+        sys.path.pop(0)  # do not shadow provider modules with package modules
+
+    sys.exit(main())
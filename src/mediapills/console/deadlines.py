@@ -0,0 +1,132 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import collections.abc
+import threading
+import time
+import typing as t
+
+from mediapills.console.exceptions import ConsoleTimeoutException
+
+"""Seconds a cancelled command has to stop before the process exits."""
+TIMEOUT_GRACE = 5.0
+
+"""Handler keyword argument receiving the cancellation token."""
+CANCEL_ARGUMENT = "cancel"
+
+ERR_MSG_TIMEOUT = "Command timed out after {timeout:g} seconds."
+
+
+class CancelToken:
+    """Cooperative cancellation signal checked by long running handlers."""
+
+    __slots__ = ("_event", "_deadline")
+
+    def __init__(self, timeout: t.Optional[float] = None):
+        """Class constructor."""
+        self._event = threading.Event()
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+
+    @property
+    def cancelled(self) -> bool:
+        """Return true once cancellation was requested."""
+        return self._event.is_set()
+
+    @property
+    def remaining(self) -> t.Optional[float]:
+        """Seconds left until the deadline, None without deadline."""
+        if self._deadline is None:
+            return None
+
+        return max(0.0, self._deadline - time.monotonic())
+
+    def cancel(self) -> None:
+        """Request cancellation."""
+        self._event.set()
+
+    def wait(self, seconds: t.Optional[float] = None) -> bool:
+        """Sleep up to seconds, return true early if cancellation was requested."""
+        return self._event.wait(seconds)
+
+    def raise_if_cancelled(self) -> None:
+        """Raise ConsoleTimeoutException if cancellation was requested."""
+        if self.cancelled:
+            raise ConsoleTimeoutException()
+
+
+class Watchdog:
+    """Thread cancelling a token at timeout and calling expire after grace.
+
+    Used as a context manager around the guarded call, leaving it in time
+    stops the watchdog.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        token: CancelToken,
+        expire: t.Callable[[], t.Any],
+        grace: float = TIMEOUT_GRACE,
+    ):
+        """Class constructor."""
+        self._timeout = timeout
+        self._token = token
+        self._expire = expire
+        self._grace = grace
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self.watch, name="watchdog", daemon=True)
+
+    def watch(self) -> None:
+        """Cancel token once timeout expires, expire if grace expires too."""
+        if self._done.wait(self._timeout):
+            return
+
+        self._token.cancel()
+
+        if not self._done.wait(self._grace):
+            self._expire()
+
+    def __enter__(self) -> "Watchdog":
+        """Start watching."""
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: t.Any) -> None:
+        """Stop watching."""
+        self._done.set()
+
+
+def settle(result: t.Any, timeout: t.Optional[float] = None) -> t.Any:
+    """Return handler result, running a coroutine (async handler) to completion.
+
+    The coroutine task is cancelled once timeout expires.
+    """
+    if not isinstance(result, collections.abc.Coroutine):
+        return result
+
+    import asyncio
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(asyncio.wait_for(result, timeout))
+    except asyncio.TimeoutError:
+        raise ConsoleTimeoutException()
+    finally:
+        loop.close()
@@ -30,3 +30,27 @@ class ConsoleUnrecognizedArgumentsException(ConsoleException):
     """Unrecognized arguments found during parsing."""
 
     pass
+
+
+class ConsoleSpecException(ConsoleException):
+    """Arguments spec could not be read or compiled."""
+
+    pass
+
+
+class ConsoleStreamException(ConsoleException):
+    """Input stream could not be read."""
+
+    pass
+
+
+class ConsoleTimeoutException(ConsoleException):
+    """Command was cancelled because its timeout expired."""
+
+    pass
+
+
+class ConsoleBusyException(ConsoleException):
+    """Command could not start because all its instance slots are taken."""
+
+    pass
@@ -0,0 +1,177 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import itertools
+import os
+import queue
+import threading
+import typing as t
+from collections import deque
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor
+    from concurrent.futures import Future
+
+EXECUTOR_PROCESS = "process"
+
+EXECUTOR_THREAD = "thread"
+
+"""Chunks submitted per worker before waiting for results (bounds memory)."""
+IN_FLIGHT_PER_JOB = 2
+
+ERR_MSG_INVALID_EXECUTOR = 'Executor "{executor}" is not valid.'
+
+TWorker = t.Callable[[t.Any], t.Any]
+
+
+def cpu_jobs(jobs: int = 0) -> int:
+    """Return number of workers, 0 and negative values meaning all cores."""
+    return jobs if jobs > 0 else os.cpu_count() or 1
+
+
+def chunks(items: t.Iterable[t.Any], size: int) -> t.Iterator[t.List[t.Any]]:
+    """Split items into lists of at most size elements."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunk(func: TWorker, chunk: t.List[t.Any]) -> t.List[t.Any]:
+    """Apply worker to each item of a chunk (runs inside the pool)."""
+    return [func(item) for item in chunk]
+
+
+def pool(executor: str, jobs: int) -> "Executor":
+    """Create process or thread pool executor."""
+    # Imported only when a pool is needed, multiprocessing loads many modules
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import ThreadPoolExecutor
+
+    if executor == EXECUTOR_PROCESS:
+        return ProcessPoolExecutor(max_workers=jobs)
+
+    if executor == EXECUTOR_THREAD:
+        return ThreadPoolExecutor(max_workers=jobs)
+
+    raise ValueError(ERR_MSG_INVALID_EXECUTOR.format(executor=executor))
+
+
+def fan_out(
+    func: TWorker,
+    items: t.Iterable[t.Any],
+    jobs: int = 0,
+    ordered: bool = True,
+    executor: str = EXECUTOR_PROCESS,
+    chunksize: int = 1,
+    max_in_flight: t.Optional[int] = None,
+) -> t.Iterator[t.Any]:
+    """Yield func(item) for every item computed by a pool of workers.
+
+    At most max_in_flight chunks are pending at a time, results are yielded in
+    the items order when ordered. Process workers need picklable func and items.
+    """
+    jobs = cpu_jobs(jobs)
+
+    if jobs == 1:  # No pool needed, avoid worker start up costs
+        for item in items:
+            yield func(item)
+        return
+
+    limit = max_in_flight or jobs * IN_FLIGHT_PER_JOB
+    pending: t.Deque["Future[t.List[t.Any]]"] = deque()
+
+    with pool(executor, jobs) as workers:
+        try:
+            for chunk in chunks(items, chunksize):
+                pending.append(workers.submit(run_chunk, func, chunk))
+
+                if len(pending) >= limit:
+                    yield from _drain(pending, ordered, until=limit - 1)
+
+            yield from _drain(pending, ordered, until=0)
+        finally:  # Consumer stopped early, do not compute what nobody reads
+            for future in pending:
+                future.cancel()
+
+
+def prefetch(items: t.Iterable[t.Any], maxsize: int) -> t.Iterator[t.Any]:
+    """Yield items produced by a background thread, at most maxsize ahead.
+
+    Producer exceptions are re-raised in the consumer, the producer stops as
+    soon as the consumer stops iterating.
+    """
+    buffer: "queue.Queue[t.Any]" = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: t.Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException as e:  # Re-raised in consumer thread
+            put((done, e))
+        else:
+            put((done, None))
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()  # Release producer blocked on a full buffer
+
+
+def _drain(
+    pending: t.Deque["Future[t.List[t.Any]]"], ordered: bool, until: int
+) -> t.Iterator[t.Any]:
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import wait
+
+    while len(pending) > until:
+        if ordered:
+            done = [pending.popleft()]
+        else:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            done = [future for future in pending if future in finished]
+            for future in done:
+                pending.remove(future)
+
+        for future in done:
+            yield from future.result()
@@ -0,0 +1,271 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import typing as t
+
+from mediapills.console.abc.features import BaseFeature
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import InputOption
+from mediapills.console.arguments import InputParameter
+from mediapills.console.arguments import TInputCommands
+from mediapills.console.arguments import TInputOptions
+from mediapills.console.arguments import TInputParameters
+from mediapills.console.arguments import VALUE_IS_ARRAY
+from mediapills.console.arguments import VALUE_REQUIRED
+from mediapills.console.traces import TRACE_FORMAT_CHROME
+from mediapills.console.traces import TRACE_FORMATS
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from mediapills.console import Application
+
+TFeatures = t.Sequence[BaseFeature]
+
+
+class BatchFeature(BaseFeature):
+    """Run command lines read from a file or stdin (--batch, --fail-fast)."""
+
+    @property
+    def options(self) -> TInputOptions:
+        """Batch mode failure policy option."""
+        return [
+            InputOption(
+                "--fail-fast", description="stop batch at the first failed command line."
+            )
+        ]
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Batch mode source parameter."""
+        return [
+            InputParameter(
+                "--batch",
+                description="run command lines read from FILE ('-' for stdin).",
+            )
+        ]
+
+    def dispatch(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Run batch if requested, return aggregated exit code."""
+        if not stdin.has_arg("batch"):
+            return None
+
+        return app.run_batch(str(stdin.get_arg("batch")), stdin.has_arg("fail_fast"))
+
+
+class ShellFeature(BaseFeature):
+    """Run command lines typed interactively (--shell)."""
+
+    @property
+    def options(self) -> TInputOptions:
+        """Interactive shell option."""
+        return [InputOption("--shell", description="read command lines interactively.")]
+
+    def dispatch(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Run interactive shell if requested, return aggregated exit code."""
+        return app.run_shell() if stdin.has_arg("shell") else None
+
+
+class InputFeature(BaseFeature):
+    """Read input from a file instead of stdin (--input)."""
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Input file parameter read by stdin.lines(), records() and chunks()."""
+        return [
+            InputParameter(
+                "--input",
+                description="read input from FILE instead of stdin ('-' for stdin).",
+            )
+        ]
+
+
+class JobsFeature(BaseFeature):
+    """Run Application.fan_out work on several workers (-j, --jobs)."""
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Number of workers parameter."""
+        return [
+            InputParameter(
+                "-j",
+                "--jobs",
+                description="run N jobs in parallel (0 for all CPU cores).",
+            )
+        ]
+
+    def configure(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Set number of workers, FAILURE if it is not a number."""
+        if stdin.has_arg("jobs"):
+            try:
+                app.jobs = int(str(stdin.get_arg("jobs")))
+            except ValueError:
+                app.stderr.write(
+                    "invalid number of jobs: {jobs}".format(jobs=stdin.get_arg("jobs"))
+                )
+                return FAILURE
+
+        return None
+
+
+class TimeoutFeature(BaseFeature):
+    """Cancel commands running longer than given seconds (--timeout)."""
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Command timeout parameter."""
+        return [
+            InputParameter(
+                "--timeout",
+                description="cancel command running longer than SECONDS.",
+            )
+        ]
+
+    def configure(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Validate timeout, FAILURE if it is not a positive number."""
+        if stdin.has_arg("timeout"):
+            try:
+                if float(str(stdin.get_arg("timeout"))) <= 0:
+                    raise ValueError()
+            except ValueError:
+                app.stderr.write(
+                    "invalid timeout: {timeout}".format(timeout=stdin.get_arg("timeout"))
+                )
+                return FAILURE
+
+        return None
+
+
+class PipeFeature(BaseFeature):
+    """Run commands in-process streaming records between them (pipe command)."""
+
+    def commands(self, app: "Application") -> TInputCommands:
+        """In-process pipeline command."""
+        return [
+            InputCommand(
+                "pipe",
+                arguments=[
+                    InputParameter(
+                        "stages",
+                        mode=VALUE_REQUIRED | VALUE_IS_ARRAY,
+                        description='command lines run as stages, e.g. "load -a".',
+                    ),
+                    InputOption(
+                        "-t",
+                        "--threaded",
+                        description="run every stage in its own thread.",
+                    ),
+                ],
+                description="run commands in-process streaming records between.",
+                handler=app.do_pipe,
+            )
+        ]
+
+
+class LoggingFeature(BaseFeature):
+    """Write logging records to stderr, levels following output verbosity."""
+
+    def finish(self, app: "Application") -> None:
+        """Leave logging as it was before the run."""
+        if app._log_bridge is not None:
+            app._log_bridge.uninstall()
+
+
+class MetricsFeature(BaseFeature):
+    """Record per-command run metrics (--metrics-dir, --metrics-port)."""
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Metrics export parameters."""
+        return [
+            InputParameter(
+                "--metrics-dir",
+                description="write run metrics to textfile collector DIR.",
+            ),
+            InputParameter(
+                "--metrics-port",
+                description="serve run metrics on local PORT while running.",
+            ),
+        ]
+
+    def configure(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Set metrics directory and start metrics server, FAILURE on bad port."""
+        if stdin.has_arg("metrics_dir"):
+            app.metrics_dir = str(stdin.get_arg("metrics_dir"))
+
+        if stdin.has_arg("metrics_port"):
+            try:
+                app.serve_metrics(int(str(stdin.get_arg("metrics_port"))))
+            except (ValueError, OSError, OverflowError) as e:
+                app.stderr.write(
+                    "invalid metrics port: {port} ({e})".format(
+                        port=stdin.get_arg("metrics_port"), e=e
+                    )
+                )
+                return FAILURE
+
+        return None
+
+    def finish(self, app: "Application") -> None:
+        """Write run metrics to the textfile collector directory, if given."""
+        if app.metrics_dir:
+            app.export_metrics(app.metrics_dir)
+
+
+class TracingFeature(BaseFeature):
+    """Collect spans of each run (--trace, --trace-format)."""
+
+    @property
+    def parameters(self) -> TInputParameters:
+        """Trace export parameters."""
+        return [
+            InputParameter("--trace", description="write run trace to FILE."),
+            InputParameter(
+                "--trace-format",
+                default=TRACE_FORMAT_CHROME,
+                description="trace FILE format: {formats}.".format(
+                    formats=", ".join(TRACE_FORMATS)
+                ),
+            ),
+        ]
+
+    def start(self, app: "Application") -> None:
+        """Drop spans of the previous run."""
+        app.tracer.clear()
+
+    def configure(self, app: "Application", stdin: BaseInput) -> t.Optional[int]:
+        """Set trace path and format, FAILURE if the format is not supported."""
+        if stdin.has_arg("trace"):
+            if stdin.get_arg("trace_format") not in TRACE_FORMATS:
+                app.stderr.write(
+                    "invalid trace format: {fmt}".format(
+                        fmt=stdin.get_arg("trace_format")
+                    )
+                )
+                return FAILURE
+            app.trace_path = str(stdin.get_arg("trace"))
+            app.trace_format = str(stdin.get_arg("trace_format"))
+
+        return None
+
+    def finish(self, app: "Application") -> None:
+        """Write spans of the run to the trace file, if given."""
+        if app.trace_path:
+            app.export_trace(app.trace_path)
@@ -0,0 +1,209 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import typing as t
+
+from mediapills.console.caches import file_digest
+from mediapills.console.executors import EXECUTOR_THREAD
+from mediapills.console.executors import fan_out
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    import sqlite3
+
+"""Files hashed per worker task, small files are not worth a task each."""
+HASH_CHUNK_FILES = 16
+
+"""Paths per lookup query, below SQLite host parameters limit."""
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    scope TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (scope, path)
+)
+"""
+
+"""File stat key (size, mtime_ns, inode), content is rehashed when it changes."""
+TStat = t.Tuple[int, int, int]
+
+"""Path, digest stored by the previous scan and current digest."""
+TScan = t.Tuple[str, t.Optional[str], t.Optional[str]]
+
+
+def index_path() -> str:
+    """Return path of the default index database."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(root, "mediapills-console", "index.sqlite3")
+
+
+def expand(paths: t.Iterable[str]) -> t.Iterator[str]:
+    """Yield paths, replacing directories with the files inside them."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+
+def stat_key(path: str) -> t.Optional[TStat]:
+    """Return file stat key, None if the file does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class HashIndex:
+    """Persistent index of files content hashes by (path, size, mtime_ns, inode).
+
+    Only files whose stat changed since they were indexed are hashed again,
+    on a pool of jobs threads. Scopes keep separate views of the same files,
+    e.g. one per command asking which inputs changed since its last run.
+    """
+
+    def __init__(self, path: t.Optional[str] = None, jobs: int = 0):
+        """Class constructor."""
+        self._path = path or index_path()
+        self._jobs = jobs
+        self._connection: t.Optional["sqlite3.Connection"] = None
+
+    @property
+    def path(self) -> str:
+        """Index database path getter."""
+        return self._path
+
+    @property
+    def jobs(self) -> int:
+        """Hashing threads number getter (0 for all cores)."""
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, jobs: int) -> None:
+        """Hashing threads number setter."""
+        self._jobs = jobs
+
+    @property
+    def connection(self) -> "sqlite3.Connection":
+        """Index database connection, opened on first use."""
+        import sqlite3  # Imported only when the index is used
+
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(SCHEMA)
+
+        return self._connection
+
+    def close(self) -> None:
+        """Close index database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def digest(self, path: str, scope: str = "") -> t.Optional[str]:
+        """Return file content hash, None if the file does not exist."""
+        return self.scan([path], scope=scope)[0][2]
+
+    def digests(
+        self, paths: t.Iterable[str], scope: str = ""
+    ) -> t.Dict[str, t.Optional[str]]:
+        """Return files content hashes (directories are expanded)."""
+        return {path: new for path, _, new in self.scan(paths, scope=scope)}
+
+    def changed(self, paths: t.Iterable[str], scope: str = "") -> t.List[str]:
+        """Return files new, modified or removed since the last scan of a scope."""
+        return [path for path, old, new in self.scan(paths, scope=scope) if old != new]
+
+    def scan(self, paths: t.Iterable[str], scope: str = "") -> t.List[TScan]:
+        """Update index for files, return their previous and current hashes."""
+        files = [*expand(paths)]
+        keys = {path: os.path.abspath(path) for path in files}
+        stats = {path: stat_key(path) for path in files}
+        known = self.lookup(scope, [*keys.values()])
+
+        stale = [
+            path
+            for path in files
+            if stats[path] is not None
+            and known.get(keys[path], (None,))[:3] != stats[path]
+        ]
+        jobs = self.jobs if len(stale) > HASH_CHUNK_FILES else 1  # Pool not worth it
+        hashes = fan_out(
+            file_digest,
+            stale,
+            jobs=jobs,
+            executor=EXECUTOR_THREAD,
+            chunksize=HASH_CHUNK_FILES,
+        )
+        fresh = dict(zip(stale, hashes))
+        removed = [keys[p] for p in files if stats[p] is None and keys[p] in known]
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                [(scope, keys[p], *stats[p], fresh[p]) for p in stale],  # type: ignore
+            )
+            self.connection.executemany(
+                "DELETE FROM files WHERE scope = ? AND path = ?",
+                [(scope, key) for key in removed],
+            )
+
+        result = []
+        for path in files:
+            old = known[keys[path]][3] if keys[path] in known else None
+            new = fresh.get(path, old) if stats[path] is not None else None
+            result.append((path, old, new))
+
+        return result
+
+    def lookup(
+        self, scope: str, paths: t.List[str]
+    ) -> t.Dict[str, t.Tuple[int, int, int, t.Optional[str]]]:
+        """Return indexed (size, mtime_ns, inode, digest) by absolute path."""
+        rows = {}
+
+        for start in range(0, len(paths), LOOKUP_BATCH):
+            end = start + LOOKUP_BATCH
+            batch = paths[start:end]
+            query = (
+                "SELECT path, size, mtime_ns, inode, digest FROM files "
+                "WHERE scope = ? AND path IN ({})".format(", ".join("?" * len(batch)))
+            )
+            for path, *row in self.connection.execute(query, [scope, *batch]):
+                rows[path] = tuple(row)
+
+        return rows
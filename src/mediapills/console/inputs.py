@@ -23,16 +23,19 @@
 
 from mediapills.console.abc.inputs import BaseConsoleInput
 from mediapills.console.abc.parsers import InputParser
+from mediapills.console.abc.parsers import TParserResult
 from mediapills.console.exceptions import ConsoleUnrecognizedArgumentsException
+from mediapills.console.suggestions import explain
 
 
 class ConsoleInput(BaseConsoleInput):  # type: ignore
     """Command argument parser based on argparse."""
 
-    def __init__(self, parser: InputParser):
+    def __init__(self, parser: InputParser, argv: t.Optional[t.List[str]] = None):
         """Class constructor."""
         self._parser = parser
-        self._argv: t.Optional[t.List[str]] = None
+        self._argv: t.Optional[t.List[str]] = argv
+        self._parsed: t.Optional[TParserResult] = None
 
     @property
     def parser(self) -> InputParser:
@@ -43,6 +46,7 @@ def parser(self) -> InputParser:
     def parser(self, parser: InputParser) -> None:
         """Input parser setter."""
         self._parser = parser
+        self._parsed = None
 
     # @property
     # def command(self) -> t.Optional[str]:
@@ -59,9 +63,18 @@ def has_arg(self, name: str) -> bool:
 
     def get_args(self) -> t.Dict[str, str]:
         """Return all the given arguments merged with the default values."""
-        args, _ = self.parser.parse(self.get_argv())
+        args, _ = self.parse()
 
-        return args  # type: ignore
+        return args
+
+    def parse(self) -> TParserResult:
+        """Parse arguments once, skip the parser if argv has built-in flags only."""
+        if self._parsed is None:
+            argv = self.get_argv()
+            args = self.parser.scan(argv)
+            self._parsed = (args, []) if args is not None else self.parser.parse(argv)
+
+        return self._parsed
 
     def get_argv(self) -> t.List[str]:
         """Get console arguments list"""
@@ -78,7 +91,9 @@ def get_argv(self) -> t.List[str]:
 
     def validate(self) -> None:
         """Validate arguments."""
-        args, undef = self.parser.parse(self.get_argv())
+        _, undef = self.parse()
 
         if undef:
-            raise ConsoleUnrecognizedArgumentsException(", ".join(undef))
+            raise ConsoleUnrecognizedArgumentsException(
+                ", ".join(explain(arg, self.parser.suggest(arg)) for arg in undef)
+            )
@@ -0,0 +1,185 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import logging
+import logging.handlers
+import queue
+import threading
+import typing as t
+
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import VERBOSITY_DEBUG
+from mediapills.console.abc.outputs import VERBOSITY_QUIET
+from mediapills.console.abc.outputs import VERBOSITY_VERBOSE
+from mediapills.console.abc.outputs import VERBOSITY_VERY_VERBOSE
+
+"""Finer than debug level, enabled by -vvv (tracing)."""
+LEVEL_TRACE = 5
+
+logging.addLevelName(LEVEL_TRACE, "TRACE")
+
+LOG_FORMAT = "%(levelname)s %(name)s: %(message)s"
+
+"""Seconds between checks the listener is alive while waiting for a flush."""
+LOG_FLUSH_POLL = 0.1
+
+"""Records formatted and written at once by the listener."""
+LOG_BATCH_SIZE = 256
+
+"""Record, barrier set once everything before it is written or None to stop."""
+TLogItem = t.Union[logging.LogRecord, threading.Event, None]
+
+
+def verbosity_level(verbosity: int) -> int:
+    """Return logging level of an output verbosity bitmask."""
+    if verbosity & VERBOSITY_QUIET:
+        return logging.CRITICAL
+    if verbosity & VERBOSITY_DEBUG:
+        return LEVEL_TRACE
+    if verbosity & VERBOSITY_VERY_VERBOSE:
+        return logging.DEBUG
+    if verbosity & VERBOSITY_VERBOSE:
+        return logging.INFO
+
+    return logging.WARNING
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler leaving formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Enqueue record as is, the emitting thread does no formatting."""
+        return record
+
+
+class LogBridge:
+    """Route logging records to an output, levels following verbosity.
+
+    Emitting threads only put records on a queue, a listener thread formats
+    and writes them in batches. Level is set on the logger, so records of
+    disabled levels are never created. If the output fails (e.g. its pipe is
+    closed) the bridge is broken and later records are dropped.
+    """
+
+    def __init__(
+        self,
+        output: BaseOutput,
+        logger: t.Optional[logging.Logger] = None,
+        fmt: str = LOG_FORMAT,
+        batch_size: int = LOG_BATCH_SIZE,
+    ):
+        """Class constructor."""
+        self._output = output
+        self._logger = logger or logging.getLogger()
+        self._formatter = logging.Formatter(fmt)
+        self._batch_size = batch_size
+        self._queue: "queue.Queue[TLogItem]" = queue.Queue()
+        self._handler = DeferredQueueHandler(self._queue)
+        self._listener: t.Optional[threading.Thread] = None
+        self._level = logging.NOTSET
+        self.error: t.Optional[BaseException] = None
+
+    @property
+    def broken(self) -> bool:
+        """Return true once writing to the output failed."""
+        return self.error is not None
+
+    @property
+    def logger(self) -> logging.Logger:
+        """Bridged logger getter."""
+        return self._logger
+
+    def install(self, verbosity: int) -> None:
+        """Attach bridge to the logger and start the listener."""
+        if self._listener is None:
+            self._level = self._logger.level
+
+        self.sync(verbosity)
+
+        if self._listener is None:
+            self._logger.addHandler(self._handler)
+            self._listener = threading.Thread(
+                target=self._drain, name="log-bridge", daemon=True
+            )
+            self._listener.start()
+
+    def sync(self, verbosity: int) -> None:
+        """Set logger level matching output verbosity."""
+        self._logger.setLevel(verbosity_level(verbosity))
+
+    def flush(self) -> None:
+        """Block until records emitted so far are written.
+
+        Raise BrokenPipeError if the output pipe was closed by its reader.
+        """
+        listener = self._listener
+        if listener is None:
+            return
+
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(LOG_FLUSH_POLL):
+            if not listener.is_alive():
+                break
+
+        if isinstance(self.error, BrokenPipeError):
+            raise BrokenPipeError(*self.error.args)
+
+    def uninstall(self) -> None:
+        """Detach bridge from the logger, writing pending records first.
+
+        Logger level is restored to the one it had before install.
+        """
+        if self._listener is None:
+            return
+
+        self._logger.removeHandler(self._handler)
+        self._logger.setLevel(self._level)
+        self._queue.put(None)
+        self._listener.join()
+        self._listener = None
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records: t.List[logging.LogRecord] = []
+            barriers: t.List[threading.Event] = []
+            for item in batch:
+                if isinstance(item, logging.LogRecord):
+                    records.append(item)
+                elif item is not None:
+                    barriers.append(item)
+
+            if records and self.error is None:
+                try:
+                    lines = [self._formatter.format(record) for record in records]
+                    self._output.write("\n".join(lines))
+                except Exception as e:  # Records are dropped from now on
+                    self.error = e
+            for barrier in barriers:
+                barrier.set()
+            if None in batch:
+                return
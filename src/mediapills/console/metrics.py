@@ -0,0 +1,267 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import contextlib
+import os
+import re
+import tempfile
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    import http.server
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+"""Upper bounds in seconds of the command duration histogram buckets."""
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0)
+
+"""Prefix of exported metric names."""
+METRICS_PREFIX = "console"
+
+"""Exported metric families: name (without prefix) to type and help text."""
+METRIC_FAMILIES = {
+    "command_duration_seconds": ("histogram", "Command run duration in seconds."),
+    "command_exit_total": ("counter", "Command runs by exit code."),
+    "output_bytes_total": ("counter", "Bytes written to standard output."),
+    "parse_seconds_total": ("counter", "Seconds spent parsing arguments."),
+    "queue_wait_seconds_total": (
+        "counter",
+        "Seconds spent waiting for a free command instance slot.",
+    ),
+}
+
+"""Content type of metrics served over HTTP."""
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SAMPLE_LINE = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})?\s+(\S+)")
+
+LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+TLabels = t.Tuple[t.Tuple[str, str], ...]
+
+"""Sample identity: metric name and labels."""
+TSampleKey = t.Tuple[str, TLabels]
+
+
+class Metrics:
+    """Per-command run metrics, rendered in Prometheus text format.
+
+    Counters and histograms are cumulative. Written textfiles add the values
+    recorded since the previous write to the file content, so metrics of
+    short lived (e.g. cron) runs accumulate across processes.
+    """
+
+    def __init__(
+        self,
+        prog: str,
+        prefix: str = METRICS_PREFIX,
+        buckets: t.Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        """Class constructor."""
+        self.prog = prog
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._samples: t.Dict[TSampleKey, float] = {}
+        self._exported: t.Dict[TSampleKey, float] = {}
+        self._lock = threading.Lock()
+
+    def name(self, family: str) -> str:
+        """Return exported name of a metric family."""
+        return "{prefix}_{family}".format(prefix=self.prefix, family=family)
+
+    def record(
+        self,
+        command: str,
+        code: int,
+        seconds: float,
+        parse: float,
+        written: int,
+        wait: float = 0.0,
+    ) -> None:
+        """Record a command run."""
+        labels = (("command", command), ("prog", self.prog))
+        duration = self.name("command_duration_seconds")
+
+        with self._lock:
+            self._add(self.name("command_exit_total"), (*labels, ("code", str(code))))
+            for bound in self.buckets:
+                if seconds <= bound:
+                    self._add(duration + "_bucket", (*labels, ("le", repr(bound))))
+            self._add(duration + "_bucket", (*labels, ("le", "+Inf")))
+            self._add(duration + "_sum", labels, seconds)
+            self._add(duration + "_count", labels)
+            self._add(self.name("output_bytes_total"), labels, written)
+            self._add(self.name("parse_seconds_total"), labels, parse)
+            if wait:
+                self._add(self.name("queue_wait_seconds_total"), labels, wait)
+
+    def _add(self, name: str, labels: TLabels, value: float = 1.0) -> None:
+        key = (name, labels)
+        self._samples[key] = self._samples.get(key, 0.0) + value
+
+    def samples(self) -> t.Dict[TSampleKey, float]:
+        """Return a snapshot of recorded samples."""
+        with self._lock:
+            return dict(self._samples)
+
+    def render(self, samples: t.Optional[t.Dict[TSampleKey, float]] = None) -> str:
+        """Return samples (recorded ones by default) in Prometheus text format."""
+        samples = self.samples() if samples is None else samples
+        lines = []
+
+        for family, (kind, description) in METRIC_FAMILIES.items():
+            name = self.name(family)
+            found = [
+                (key, value)
+                for key, value in samples.items()
+                if key[0] == name or key[0].rsplit("_", 1)[0] == name
+            ]
+            if not found:
+                continue
+
+            lines.append("# HELP {name} {help}".format(name=name, help=description))
+            lines.append("# TYPE {name} {kind}".format(name=name, kind=kind))
+            for (sample, labels), value in found:
+                lines.append(
+                    "{sample}{{{labels}}} {value}".format(
+                        sample=sample,
+                        labels=",".join(
+                            '{k}="{v}"'.format(k=k, v=escape(v)) for k, v in labels
+                        ),
+                        value=number(value),
+                    )
+                )
+
+        return "".join(line + "\n" for line in lines)
+
+    def write_textfile(self, directory: str) -> str:
+        """Atomically write metrics to a textfile collector directory, return path.
+
+        Values recorded since the previous write are added to the file content.
+        """
+        path = os.path.join(directory, "{prog}.prom".format(prog=self.prog))
+
+        with locked(path + ".lock"):
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    samples = parse(fh.read(), prefix=self.prefix + "_")
+            except FileNotFoundError:
+                samples = {}
+
+            current = self.samples()
+            for key, value in current.items():
+                samples[key] = (
+                    samples.get(key, 0.0) + value - self._exported.get(key, 0.0)
+                )
+
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    fh.write(self.render(samples))
+                os.chmod(tmp, 0o644)  # Collector may run as another user
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+            self._exported = current
+
+        return path
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "http.server.HTTPServer":
+        """Serve metrics over HTTP from a background thread, return the server."""
+        import http.server  # Imported only when serving, it loads many modules
+
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: t.Any) -> None:
+                pass  # Requests must not mix with the application output
+
+        server = http.server.HTTPServer((host, port), Handler)
+        threading.Thread(
+            target=server.serve_forever, name="metrics", daemon=True
+        ).start()
+
+        return server
+
+
+def escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def unescape(value: str) -> str:
+    """Reverse label value escaping."""
+    return re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), value)
+
+
+def number(value: float) -> str:
+    """Format a sample value, integral values without a fraction."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def parse(text: str, prefix: str = "") -> t.Dict[TSampleKey, float]:
+    """Return samples of metrics starting with prefix from Prometheus text format."""
+    samples: t.Dict[TSampleKey, float] = {}
+
+    for line in text.splitlines():
+        match = SAMPLE_LINE.match(line)
+        if match is None or not match.group(1).startswith(prefix):
+            continue  # Comment, blank line or a foreign metric
+
+        name, labels, value = match.groups()
+        key = (
+            name,
+            tuple((k, unescape(v)) for k, v in LABEL_PAIR.findall(labels or "")),
+        )
+        try:
+            samples[key] = samples.get(key, 0.0) + float(value)
+        except ValueError:
+            continue
+
+    return samples
+
+
+@contextlib.contextmanager
+def locked(path: str) -> t.Iterator[None]:
+    """Hold an exclusive lock on a lock file, no-op where flock is unavailable."""
+    if fcntl is None:  # pragma: no cover
+        yield
+        return
+
+    with open(path, "a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
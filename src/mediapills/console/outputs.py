@@ -18,24 +18,105 @@
 # LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import atexit
+import contextlib
+import errno
+import os
+import queue
+import sys
+import threading
+import typing as t
+
 from mediapills.console.abc.outputs import BaseConsoleOutput
+from mediapills.console.abc.outputs import VERBOSITY_NORMAL
+from mediapills.console.pagers import LazyPager
+from mediapills.console.sinks import Sink
+from mediapills.console.terminals import Terminal
+from mediapills.console.terminals import terminal
+
+"""Lines batch to write, barrier to set once lines before it are written, or None."""
+TDrainItem = t.Optional[t.Union[t.List[str], threading.Event]]
 
 
 class ConsoleOutput(BaseConsoleOutput):  # type: ignore
     """Default class for all CLI output. It uses STDOUT and STDERR."""
 
+    def __init__(
+        self, verbosity: int = VERBOSITY_NORMAL, stream: t.Optional[t.TextIO] = None
+    ):
+        """Class constructor."""
+        super().__init__(verbosity=verbosity)
+        self._stream = stream
+        self._pager: t.Optional[LazyPager] = None
+        self.broken = False
+
+    @property
+    def stream(self) -> t.TextIO:
+        """Output stream getter (current sys.stdout by default)."""
+        return self._stream or sys.stdout
+
+    @property
+    def terminal(self) -> Terminal:
+        """Capabilities of the stream terminal (probed once per descriptor)."""
+        return terminal(self.stream)
+
+    @staticmethod
+    def render(msg: str, newline: bool = False) -> str:
+        """Return text written to the stream for a message."""
+        return msg + ("\n\n\n" if newline else "\n")
+
     def write(
         self, msg: str, newline: bool = False, options: int = 0  # dead: disable
     ) -> None:
-        """Write a message to the output."""
-        print(msg)
-        if newline:
-            print("\n")
+        """Write a message to the output.
+
+        Once the reader of a pipe is gone every write raises BrokenPipeError,
+        so producers stop even if they swallowed the first error.
+        """
+        if self.broken:
+            raise BrokenPipeError(errno.EPIPE, os.strerror(errno.EPIPE))
+
+        if self._pager is not None:
+            self._pager.write(self.render(msg, newline))
+            return
+
+        try:
+            print(msg, file=self.stream)
+            if newline:
+                print("\n", file=self.stream)
+        except BrokenPipeError:
+            self.broken = True
+            raise
 
     def writeln(self, msg: str, options: int = 0) -> None:
         """Write a message to the output and adds a newline at the end."""
         self.write(msg=msg, newline=True, options=options)
 
+    def flush(self) -> None:
+        """Flush the output stream."""
+        try:
+            self.stream.flush()
+        except BrokenPipeError:
+            self.broken = True
+            raise
+
+    @contextlib.contextmanager
+    def paged(self) -> t.Iterator[None]:
+        """Page messages written in the block if they overflow the terminal.
+
+        Pager is used only if the stream is a terminal, nested blocks share it.
+        """
+        if self._pager is not None or not self.stream.isatty():
+            yield
+            return
+
+        self._pager = LazyPager(self.stream)
+        try:
+            yield
+        finally:
+            pager, self._pager = self._pager, None
+            pager.close()
+
 
 class ConsoleRedOutput(ConsoleOutput):
     """Default class for all CLI output. It uses STDOUT and STDERR."""
@@ -43,7 +124,322 @@ class ConsoleRedOutput(ConsoleOutput):
     def write(
         self, msg: str, newline: bool = False, options: int = 0  # dead: disable
     ) -> None:
-        """Write a message to the output."""
-        super().write(
-            msg="\033[91m" + msg + "\033[0m", newline=newline, options=options
-        )
+        """Write a message to the output, in red if the terminal has colors."""
+        if self.terminal.color:
+            msg = "\033[91m" + msg + "\033[0m"
+
+        super().write(msg=msg, newline=newline, options=options)
+
+
+class WrappedOutput(BaseConsoleOutput):
+    """Output passing messages, verbosity, flushes and paging to a wrapped one."""
+
+    def __init__(self, output: BaseConsoleOutput):
+        """Class constructor."""
+        super().__init__(verbosity=output.verbosity)
+        self._output = output
+
+    @property
+    def output(self) -> BaseConsoleOutput:
+        """Wrapped output getter."""
+        return self._output
+
+    @property
+    def verbosity(self) -> int:
+        """Verbosity of the wrapped output getter."""
+        return self._output.verbosity
+
+    @verbosity.setter
+    def verbosity(self, verbosity: int) -> None:
+        """Verbosity of the wrapped output setter."""
+        self._output.verbosity = verbosity
+
+    def write(self, msg: str, newline: bool = False, options: int = 0) -> None:
+        """Write a message to the wrapped output."""
+        self._output.write(msg, newline=newline, options=options)
+
+    def writeln(self, msg: str, options: int = 0) -> None:
+        """Write a message to the wrapped output and adds a newline at the end."""
+        self.write(msg=msg, newline=True, options=options)
+
+    def flush(self) -> None:
+        """Flush the wrapped output."""
+        self._output.flush()
+
+    @contextlib.contextmanager
+    def paged(self) -> t.Iterator[None]:
+        """Page messages written in the block if the wrapped output supports it."""
+        with self._output.paged():
+            yield
+
+
+class RecordingOutput(WrappedOutput):
+    """Output keeping a copy of written messages (e.g. to replay them later)."""
+
+    def __init__(self, output: BaseConsoleOutput):
+        """Class constructor."""
+        super().__init__(output)
+        self._messages: t.List[t.Tuple[str, bool, int]] = []
+
+    @property
+    def messages(self) -> t.List[t.Tuple[str, bool, int]]:
+        """Written messages getter (message, newline, options)."""
+        return self._messages
+
+    def write(self, msg: str, newline: bool = False, options: int = 0) -> None:
+        """Record a message and write it to the wrapped output."""
+        self._messages.append((msg, newline, options))
+        super().write(msg, newline=newline, options=options)
+
+
+class CountingOutput(WrappedOutput):
+    """Output counting bytes of messages written to the wrapped output."""
+
+    def __init__(self, output: BaseConsoleOutput, encoding: str = "utf-8"):
+        """Class constructor."""
+        super().__init__(output)
+        self._encoding = encoding
+        self.written = 0
+
+    def write(self, msg: str, newline: bool = False, options: int = 0) -> None:
+        """Count message bytes and write it to the wrapped output."""
+        self.written += len(ConsoleOutput.render(msg, newline).encode(self._encoding))
+        super().write(msg, newline=newline, options=options)
+
+
+class TeeOutput(BaseConsoleOutput):
+    """Output encoding each message once and fanning it out to many sinks.
+
+    E.g. TeeOutput([StreamSink(), ThreadedSink(RotatingFileSink("app.log"))])
+    shows output on the terminal and logs it without the file slowing it down.
+    """
+
+    def __init__(
+        self,
+        sinks: t.Sequence[Sink],
+        verbosity: int = VERBOSITY_NORMAL,
+        encoding: str = "utf-8",
+    ):
+        """Class constructor."""
+        super().__init__(verbosity=verbosity)
+        self._sinks = [*sinks]
+        self._encoding = encoding
+        atexit.register(self.flush)
+
+    @property
+    def sinks(self) -> t.List[Sink]:
+        """Output sinks getter."""
+        return self._sinks
+
+    def write(self, msg: str, newline: bool = False, options: int = 0) -> None:
+        """Encode a message and write it to every sink."""
+        data = ConsoleOutput.render(msg, newline).encode(self._encoding, "replace")
+
+        for sink in self._sinks:
+            sink.write(data)
+
+    def writeln(self, msg: str, options: int = 0) -> None:
+        """Write a message to every sink and adds a newline at the end."""
+        self.write(msg=msg, newline=True, options=options)
+
+    def flush(self) -> None:
+        """Flush every sink."""
+        for sink in self._sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        """Close every sink."""
+        for sink in self._sinks:
+            sink.close()
+
+
+class ThreadBuffer:
+    """Messages written by one thread and not yet handed to the writer."""
+
+    __slots__ = ("lines", "lock", "thread")
+
+    def __init__(self) -> None:
+        """Class constructor."""
+        self.lines: t.List[str] = []
+        self.lock = threading.Lock()  # contended only while being drained
+        self.thread = threading.current_thread()
+
+
+class ThreadedConsoleOutput(ConsoleOutput):
+    """Console output for concurrent writers.
+
+    Each thread appends whole messages to its own buffer, a single writer
+    thread drains the buffers to the stream in batches, so lines never tear.
+    Stream errors are raised by the next flush on the caller thread. Messages
+    written in a paged block go to the pager directly, in the writing thread.
+    The writer thread runs from the first write until close.
+    """
+
+    def __init__(
+        self,
+        verbosity: int = VERBOSITY_NORMAL,
+        stream: t.Optional[t.TextIO] = None,
+        batch_size: int = 256,
+        interval: float = 0.05,
+    ):
+        """Class constructor."""
+        super().__init__(verbosity=verbosity, stream=stream)
+        self._batch_size = batch_size
+        self._interval = interval
+        self._local = threading.local()
+        self._buffers: t.List[ThreadBuffer] = []
+        self._lock = threading.Lock()  # guards buffers registration only
+        self._queue: "queue.Queue[TDrainItem]" = queue.Queue()
+        self._writer: t.Optional[threading.Thread] = None
+        self._error: t.Optional[Exception] = None
+        self._paging_lock = threading.Lock()  # pager is not thread safe
+
+    def write(
+        self, msg: str, newline: bool = False, options: int = 0  # dead: disable
+    ) -> None:
+        """Append a message to the current thread buffer, or write it to the pager."""
+        if self.broken:
+            raise BrokenPipeError(errno.EPIPE, os.strerror(errno.EPIPE))
+
+        if self._pager is not None:
+            with self._paging_lock:
+                return super().write(msg, newline=newline, options=options)
+
+        buffer = self._buffer()
+
+        with buffer.lock:  # Batches of a thread are queued in order
+            buffer.lines.append(self.render(msg, newline))
+
+            if len(buffer.lines) >= self._batch_size:
+                self._queue.put(buffer.lines)
+                buffer.lines = []
+
+    def flush(self) -> None:
+        """Block until messages written so far by all threads reach the stream."""
+        if self._writer is None:
+            return super().flush()
+
+        writer, done = self._writer, threading.Event()
+        self._collect()
+        self._queue.put(done)
+        while not done.wait(self._interval):
+            if not writer.is_alive():
+                break
+
+        if self.broken:
+            raise BrokenPipeError(errno.EPIPE, os.strerror(errno.EPIPE))
+
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    @contextlib.contextmanager
+    def paged(self) -> t.Iterator[None]:
+        """Page messages written in the block, after the ones buffered before it."""
+        if self._pager is None and self.stream.isatty():
+            self.flush()
+
+        with super().paged():
+            yield
+
+    def close(self) -> None:
+        """Write pending messages and stop the writer thread."""
+        with self._lock:
+            writer = self._writer
+            if writer is None:
+                return
+
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            writer.join()
+            atexit.unregister(self._flush_at_exit)
+            with self._lock:
+                self._local = threading.local()
+                self._buffers = []
+                self._writer = None
+
+    def __enter__(self) -> "ThreadedConsoleOutput":
+        """Return the output."""
+        return self
+
+    def __exit__(self, exc_type: t.Any, exc: t.Any, tb: t.Any) -> None:
+        """Close the output."""
+        self.close()
+
+    def _flush_at_exit(self) -> None:
+        with contextlib.suppress(BrokenPipeError):
+            self.flush()
+
+    def _buffer(self) -> ThreadBuffer:
+        buffer: t.Optional[ThreadBuffer] = getattr(self._local, "buffer", None)
+
+        if buffer is None:
+            buffer = self._local.buffer = ThreadBuffer()
+            with self._lock:
+                self._buffers.append(buffer)
+
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._drain, name="console-output", daemon=True
+                    )
+                    self._writer.start()
+                    atexit.register(self._flush_at_exit)
+
+        return buffer
+
+    def _collect(self) -> None:
+        with self._lock:
+            for buffer in [*self._buffers]:
+                with buffer.lock:  # Queued after the thread batches, never before
+                    if buffer.lines:
+                        self._queue.put(buffer.lines)
+                        buffer.lines = []
+
+                if not buffer.thread.is_alive():  # nothing will be appended anymore
+                    self._buffers.remove(buffer)
+
+    def _drain(self) -> None:
+        lines: t.List[str] = []
+
+        while True:
+            try:
+                if lines:  # Join batches queued at once into a single write
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=self._interval)
+            except queue.Empty:
+                if lines:
+                    self._emit(lines)
+                    lines = []
+                else:
+                    self._collect()
+                continue
+
+            if isinstance(item, list):
+                lines.extend(item)
+                continue
+
+            if lines:
+                self._emit(lines)
+                lines = []
+
+            if item is None:
+                return
+
+            self._emit([])
+            item.set()
+
+    def _emit(self, lines: t.List[str]) -> None:
+        if self.broken:  # Reader is gone, lines are dropped
+            return
+
+        try:
+            if lines:
+                self.stream.write("".join(lines))
+            self.stream.flush()
+        except BrokenPipeError:
+            self.broken = True
+        except Exception as e:  # e.g. EIO, ENOSPC or a closed stream
+            self._error = e
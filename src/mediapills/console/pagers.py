@@ -0,0 +1,133 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import contextlib
+import os
+import shlex
+import subprocess
+import typing as t
+
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.terminals import terminal
+
+DEFAULT_PAGER = "less"
+
+"""less options: quit if one screen, keep colors, do not clear the screen."""
+DEFAULT_LESS = "FRX"
+
+
+def paged(output: t.Any) -> t.ContextManager[None]:
+    """Return output paging block, no-op for objects that are not outputs."""
+    if isinstance(output, BaseOutput):
+        return output.paged()
+
+    return contextlib.suppress()
+
+
+def rows(text: str, width: int) -> int:
+    """Return terminal rows text takes, long lines wrapped at width."""
+    return sum(max(1, -(-len(line) // width)) for line in text.splitlines())
+
+
+class LazyPager:
+    """Buffer text up to one screen, spawn $PAGER only once it overflows.
+
+    After the pager started the rest is streamed into its stdin, short outputs
+    are written to the stream without spawning a process.
+    """
+
+    def __init__(
+        self,
+        stream: t.TextIO,
+        height: t.Optional[int] = None,
+        width: t.Optional[int] = None,
+        command: t.Optional[str] = None,
+    ):
+        """Class constructor."""
+        self._stream = stream
+        self._height = height or terminal(stream).lines
+        self._width = width or terminal(stream).columns
+        self._command = (
+            os.environ.get("PAGER", DEFAULT_PAGER) if command is None else command
+        )
+        self._buffer: t.List[str] = []
+        self._rows = 0
+        self._process: t.Optional["subprocess.Popen[str]"] = None
+        self._closed = False  # Pager quit by the user, drop the rest
+
+    @property
+    def paging(self) -> bool:
+        """Return true if pager process was spawned."""
+        return self._process is not None
+
+    def write(self, text: str) -> None:
+        """Buffer text or stream it to the pager."""
+        if self._process is not None:
+            self._pipe(text)
+            return
+
+        self._buffer.append(text)
+        self._rows += rows(text, self._width)
+
+        if self._rows >= self._height and self._command:
+            self.spawn()
+
+    def spawn(self) -> None:
+        """Start pager and hand it the buffered text."""
+        env = dict(os.environ)
+        env.setdefault("LESS", DEFAULT_LESS)
+        self._stream.flush()
+
+        try:
+            self._process = subprocess.Popen(
+                shlex.split(self._command),
+                stdin=subprocess.PIPE,
+                universal_newlines=True,
+                env=env,
+            )
+        except OSError:  # Pager not installed, keep writing to the stream
+            self._command = ""
+            return
+
+        text, self._buffer = "".join(self._buffer), []
+        self._pipe(text)
+
+    def close(self) -> None:
+        """Write buffered text or wait until the user quits the pager."""
+        if self._process is None:
+            self._stream.write("".join(self._buffer))
+            self._buffer = []
+            return
+
+        try:
+            self._process.stdin.close()  # type: ignore
+        except BrokenPipeError:
+            pass
+        self._process.wait()
+        self._process = None
+
+    def _pipe(self, text: str) -> None:
+        if self._closed:
+            return
+
+        try:
+            self._process.stdin.write(text)  # type: ignore
+        except BrokenPipeError:
+            self._closed = True
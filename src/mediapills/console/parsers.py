@@ -27,19 +27,30 @@
 from mediapills.console.abc.arguments import BaseArgument
 from mediapills.console.abc.parsers import ConsoleArgumentParser
 from mediapills.console.abc.parsers import InputParser
+from mediapills.console.abc.parsers import LazySubParsersAction
+from mediapills.console.arguments import InputParameter
+from mediapills.console.suggestions import BKTree
+from mediapills.console.suggestions import suggest
 
 
 class InputArgumentsParser(InputParser):  # type: ignore
     """CLI arguments parser."""
 
     def __init__(
-        self, arguments: t.List[BaseArgument], description: str = "", epilog: str = "",
+        self,
+        arguments: t.List[BaseArgument],
+        description: str = "",
+        epilog: str = "",
+        eager: t.Sequence[str] = (),
     ) -> None:
         """Class constructor."""
         self._args = arguments
         self._desc = description
         self._epilog = epilog
+        self._eager = eager
         self._parser: t.Optional[ConsoleArgumentParser] = None
+        self._eager_parser: t.Optional[ConsoleArgumentParser] = None
+        self._names: t.Optional[BKTree] = None
 
     @property
     def arguments(self) -> t.List[BaseArgument]:
@@ -56,6 +67,11 @@ def epilog(self) -> str:
         """Parser epilog getter."""
         return self._epilog
 
+    @property
+    def eager(self) -> t.Sequence[str]:
+        """Names of arguments ending the run (e.g. help), checked before others."""
+        return self._eager
+
     @classmethod
     def extend_parser(
         cls,
@@ -66,18 +82,27 @@ def extend_parser(
         """Extend parser."""
         for arg in args:
             is_command = callable(getattr(arg, "execute", None))
-            is_parameter = callable(getattr(arg, "default", None))
+            is_parameter = isinstance(arg, InputParameter)
 
             if is_command:
                 if subparsers is None:
-                    subparsers = parser.add_subparsers(dest="command")
+                    subparsers = parser.add_subparsers(
+                        dest="command",
+                        action=LazySubParsersAction,
+                        parser_class=ConsoleArgumentParser,
+                    )
 
-                cls.extend_parser(
-                    subparsers.add_parser(*arg.options, help=arg.description),
-                    arg.arguments,
+                # Command arguments are added only if the command is selected
+                subparsers.add_parser(
+                    arg.options[0],
+                    aliases=arg.options[1:],
+                    help=arg.description,
+                    populate=lambda sub, cmd=arg: cls.extend_parser(sub, cmd.arguments),
                 )
             elif is_parameter:
-                parser.add_argument(*arg.options, nargs=1)
+                parser.add_argument(
+                    *arg.options, **cls.parameter_kwargs(arg)  # type: ignore
+                )
             else:
                 parser.add_argument(
                     *arg.options, action="count", default=SUPPRESS, help=arg.description
@@ -85,6 +110,25 @@ def extend_parser(
 
         return parser, subparsers
 
+    @staticmethod
+    def parameter_kwargs(arg: InputParameter) -> t.Dict[str, t.Any]:
+        """Return built-in parser keyword arguments for a parameter mode."""
+        kwargs: t.Dict[str, t.Any] = {"default": arg.default, "help": arg.description}
+        positional = not arg.options[0].startswith("-")
+
+        if arg.is_array():
+            if positional:
+                kwargs["nargs"] = "+" if arg.is_required() else "*"
+            else:
+                kwargs["action"] = "append"
+        elif positional and not arg.is_required():
+            kwargs["nargs"] = "?"
+
+        if not positional and arg.is_required():
+            kwargs["required"] = True
+
+        return kwargs
+
     @property
     def parser(self) -> ConsoleArgumentParser:
         """Built-in Argument parser getter."""
@@ -102,14 +146,134 @@ def parser(self) -> ConsoleArgumentParser:
 
         return self._parser
 
+    def scan(self, argv: t.List[str]) -> t.Optional[t.Dict[str, t.Any]]:
+        """Return parsing result if argv has options only (e.g. -h, -V, -q, -vv).
+
+        Such argv is resolved from the arguments definitions, so the built-in
+        parser and the commands tree are not constructed at all. If required or
+        positional parameters are declared, only argv with an eager option
+        (e.g. -h or -V) is resolved, as their values are not needed then.
+        """
+        flags: t.Dict[str, str] = {}
+        args: t.Dict[str, t.Any] = {}
+        strict = False
+
+        for arg in self.arguments:
+            if callable(getattr(arg, "execute", None)):
+                args["command"] = None
+            elif not arg.options[0].startswith("-"):
+                strict = True  # Positional values are left to the parser
+            elif isinstance(arg, InputParameter):
+                strict = strict or arg.is_required()
+                args[option_dest(arg.options)] = arg.default
+            else:
+                for name in arg.options:
+                    flags[name] = option_dest(arg.options)
+
+        for token in argv:
+            if token in flags:
+                names = [token]
+            elif token[:1] == "-" and token[1:2] not in ("", "-"):
+                names = ["-" + char for char in token[1:]]  # Combined, e.g. -vv
+            else:
+                return None
+
+            for name in names:
+                if name not in flags:
+                    return None
+                args[flags[name]] = args.get(flags[name], 0) + 1
+
+        counted = set(args).intersection(flags.values())
+        if strict and not counted.intersection(self.eager):
+            return None
+
+        return args
+
     def parse(self, argv: t.List[str]) -> t.Tuple[t.Dict[str, str], t.List[str]]:
         """Return parsing result."""
+        eager = self.parse_eager(argv)
+        if eager is not None:
+            return eager, []
+
         args, undef = self.parser.parse_known_args(argv)
 
         return vars(args), undef
 
+    def parse_eager(self, argv: t.List[str]) -> t.Optional[t.Dict[str, t.Any]]:
+        """Return parsing result if argv has an argument ending the run, else None.
+
+        Like the argparse help action, such argument (e.g. --help or --version)
+        wins over the required arguments check, so the rest of argv is ignored.
+        Only arguments before the command name count, the command may have
+        own options named alike (e.g. -V).
+        """
+        if not self.eager:
+            return None
+
+        parser = self._eager_parser
+        if parser is None:
+            parser = ConsoleArgumentParser(prog=sys.argv[0], add_help=False)
+            self.extend_parser(
+                parser=parser,
+                args=[arg for arg in self.arguments if self.is_eager(arg)],
+            )
+            self._eager_parser = parser
+
+        commands = {
+            name
+            for arg in self.arguments
+            if callable(getattr(arg, "execute", None))
+            for name in arg.options
+        }
+        end = next(
+            (i for i, token in enumerate(argv) if token in commands or token == "--"),
+            len(argv),
+        )
+        args: t.Dict[str, t.Any] = vars(parser.parse_known_args(argv[:end])[0])
+
+        if all(args.get(name) is None for name in self.eager):
+            return None
+
+        return args
+
+    def is_eager(self, arg: BaseArgument) -> bool:
+        """Return true if an argument ends the run, e.g. --help."""
+        return (
+            arg.options[0].startswith("-")
+            and not callable(getattr(arg, "execute", None))
+            and option_dest(arg.options) in self.eager
+        )
+
+    def suggest(self, token: str) -> t.List[str]:
+        """Return option or command names similar to an unrecognized token.
+
+        The names index is built on the first call only, so it costs nothing
+        unless parsing failed.
+        """
+        if self._names is None:
+            self._names = BKTree(argument_names(self.arguments))
+
+        return suggest(token, self._names)
+
     def help(self) -> str:
         """Print a help message, including the program usage and registered arguments."""
         output = io.StringIO()
         self.parser.print_help(file=output)
         return output.getvalue()
+
+
+def option_dest(names: t.Sequence[str]) -> str:
+    """Return the attribute name the built-in parser stores an option under."""
+    name = next((n for n in names if n.startswith("--")), names[0])
+
+    return name.lstrip("-").replace("-", "_")
+
+
+def argument_names(arguments: t.Sequence[BaseArgument]) -> t.Iterator[str]:
+    """Yield option and command names of an arguments tree, positionals excluded."""
+    for arg in arguments:
+        if callable(getattr(arg, "execute", None)):
+            yield from arg.options
+            yield from argument_names(getattr(arg, "arguments", []))
+        elif arg.options[0].startswith("-"):
+            yield from arg.options
@@ -0,0 +1,117 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import functools
+import typing as t
+
+from mediapills.console.abc.inputs import BaseConsoleInput
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.exceptions import ConsoleException
+from mediapills.console.executors import prefetch
+
+"""Records buffered ahead of a threaded stage consumer (backpressure bound)."""
+PIPE_QUEUE_SIZE = 1024
+
+"""Handler keyword argument receiving upstream records."""
+RECORDS_ARGUMENT = "records"
+
+ERR_MSG_NO_RECORDS = 'Pipeline stage "{stage}" does not produce records.'
+
+CO_VARKEYWORDS = 0x08
+
+TStage = t.Tuple[str, t.Callable[..., t.Any], BaseInput]
+
+
+@functools.lru_cache(maxsize=None)
+def accepts(handler: t.Callable[..., t.Any], name: str) -> bool:
+    """Return true if handler takes a keyword argument (directly or **kwargs)."""
+    code = getattr(handler, "__code__", None)
+
+    if code is None:  # Callable object or partial, inspect it the slow way
+        import inspect
+
+        params = inspect.signature(handler).parameters.values()
+        return any(p.name == name or p.kind == p.VAR_KEYWORD for p in params)
+
+    names = code.co_varnames[: code.co_argcount + code.co_kwonlyargcount]
+    return name in names or bool(code.co_flags & CO_VARKEYWORDS)
+
+
+def accepts_records(handler: t.Callable[..., t.Any]) -> bool:
+    """Return true if handler takes upstream records keyword argument."""
+    return accepts(handler, RECORDS_ARGUMENT)
+
+
+def is_records(result: t.Any) -> bool:
+    """Return true if handler result is records iterator (not an exit code)."""
+    return hasattr(result, "__iter__") and not isinstance(result, (str, bytes))
+
+
+def call(
+    handler: t.Callable[..., t.Any],
+    stdin: BaseInput,
+    stdout: BaseOutput,
+    records: t.Optional[t.Iterable[t.Any]] = None,
+    **context: t.Any
+) -> t.Any:
+    """Call command handler, passing records and context it accepts.
+
+    Without upstream stage the records are the input lines (stdin or --input),
+    context keyword arguments (e.g. app) are passed only if the handler takes them.
+    """
+    kwargs = {name: value for name, value in context.items() if accepts(handler, name)}
+
+    if accepts_records(handler):
+        if records is None:
+            records = stdin.lines() if isinstance(stdin, BaseConsoleInput) else iter(())
+        kwargs[RECORDS_ARGUMENT] = records
+
+    return handler(stdin=stdin, stdout=stdout, **kwargs)
+
+
+def compose(
+    stages: t.Sequence[TStage],
+    stdout: BaseOutput,
+    threaded: bool = False,
+    maxsize: int = PIPE_QUEUE_SIZE,
+    **context: t.Any
+) -> t.Any:
+    """Chain stages handlers, each consuming records yielded by the previous one.
+
+    Generators are pulled by the last stage, so a slow consumer throttles the
+    producers. Threaded stages run ahead in their own thread, at most maxsize
+    records. Return the last stage result.
+    """
+    records: t.Optional[t.Iterable[t.Any]] = None
+    result: t.Any = None
+
+    for i, (name, handler, stdin) in enumerate(stages):
+        result = call(handler, stdin, stdout, records, **context)
+
+        if i == len(stages) - 1:
+            break
+
+        if not is_records(result):
+            raise ConsoleException(ERR_MSG_NO_RECORDS.format(stage=name))
+
+        records = prefetch(result, maxsize) if threaded else result
+
+    return result
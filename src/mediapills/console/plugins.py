@@ -0,0 +1,193 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import typing as t
+
+from mediapills.console import specs
+from mediapills.console.abc.arguments import TBaseArguments
+from mediapills.console.arguments import InputCommand
+from mediapills.console.loaders import import_string
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # pragma: no cover
+    from importlib_metadata import entry_points  # type: ignore
+
+log = logging.getLogger(__name__)
+
+"""Entry points group third party packages register their commands in."""
+PLUGINS_GROUP = "mediapills.console.commands"
+
+METADATA_SUFFIXES = (".dist-info", ".egg-info")
+
+
+def fingerprint(group: str) -> str:
+    """Return hash of sys.path and installed distributions metadata mtimes."""
+    digest = hashlib.sha1(group.encode())
+    digest.update(sys.version.encode())
+
+    for path in sys.path:
+        digest.update(path.encode())
+        try:
+            with os.scandir(path or ".") as it:
+                for entry in it:
+                    if entry.name.endswith(METADATA_SUFFIXES):
+                        stat = entry.stat()
+                        digest.update(
+                            "{name}:{mtime}".format(
+                                name=entry.name, mtime=stat.st_mtime_ns
+                            ).encode()
+                        )
+        except OSError:  # Not a directory (e.g. zip archive) or missing
+            continue
+
+    return digest.hexdigest()
+
+
+def cache_path(group: str) -> str:
+    """Return registry cache file path for an entry points group."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(root, "mediapills-console", "plugins", group + ".json")
+
+
+def group_entry_points(group: str) -> t.List[t.Any]:
+    """Return entry points of a group (walks every installed distribution)."""
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return [*eps.select(group=group)]
+
+    return [*eps.get(group, [])]
+
+
+def entry_key(ep: t.Any) -> str:
+    """Return entry point identity, changed when its distribution is upgraded."""
+    dist = getattr(ep, "dist", None)
+
+    return "{name}={value}@{version}".format(
+        name=ep.name, value=ep.value, version=getattr(dist, "version", "")
+    )
+
+
+def load_entry(ep: t.Any) -> t.Optional[specs.TEntry]:
+    """Import a plugin and return its command entry, None if it is broken."""
+    try:
+        obj = ep.load()
+    except Exception:  # A broken plugin must not break the application
+        log.warning("Plugin %s could not be loaded.", ep.value, exc_info=True)
+        return None
+
+    if isinstance(obj, InputCommand):
+        obj = InputCommand(
+            *obj.options,
+            arguments=obj.arguments,
+            description=obj.description,
+            handler=ep.value,  # Resolved back to the object on dispatch
+        )
+    else:
+        obj = InputCommand(ep.name, handler=ep.value)
+
+    return specs.compact([obj])[0]
+
+
+def scan(
+    group: str, known: t.Optional[t.Dict[str, t.Optional[specs.TEntry]]] = None
+) -> t.Dict[str, t.Optional[specs.TEntry]]:
+    """Return command entries of a group plugins, importing only unknown ones."""
+    known = known or {}
+
+    return {
+        key: known[key] if key in known else load_entry(ep)
+        for key, ep in ((entry_key(ep), ep) for ep in group_entry_points(group))
+    }
+
+
+def plugin_arguments(path: str) -> TBaseArguments:
+    """Import plugin by entry point value and return its command arguments."""
+    obj = import_string(path)
+
+    return obj.arguments if isinstance(obj, InputCommand) else []
+
+
+def lazy_commands(group: str) -> TBaseArguments:
+    """Return plugin commands named after entry points, importing nothing."""
+    return [
+        InputCommand(
+            ep.name,
+            arguments=functools.partial(plugin_arguments, ep.value),
+            handler=ep.value,
+        )
+        for ep in group_entry_points(group)
+    ]
+
+
+def entries(plugins: t.Dict[str, t.Optional[specs.TEntry]]) -> specs.TEntries:
+    """Return command entries of loaded plugins, broken ones skipped."""
+    return tuple(entry for entry in plugins.values() if entry is not None)
+
+
+def discover(group: str = PLUGINS_GROUP, cache: bool = True) -> TBaseArguments:
+    """Return plugin commands, rescanning entry points only if packages changed.
+
+    Commands are built from the cached registry, plugin modules are imported
+    only when one of their commands is dispatched. A rescan imports only new
+    or upgraded plugins. Without cache commands are named after entry points
+    and a plugin is imported only when its command is selected.
+    """
+    if not cache:
+        return lazy_commands(group)
+
+    path, key = cache_path(group), fingerprint(group)
+    known: t.Dict[str, t.Optional[specs.TEntry]] = {}
+
+    try:
+        with open(path, encoding="utf-8") as fh:
+            registry = json.load(fh)
+        if registry["format"] == specs.SPEC_FORMAT:
+            known = dict(registry["plugins"])
+            if registry["fingerprint"] == key:
+                return specs.build(entries(known))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing, outdated or corrupted registry
+
+    plugins = scan(group, known)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"format": specs.SPEC_FORMAT, "fingerprint": key, "plugins": plugins},
+                fh,
+            )
+        os.replace(tmp, path)
+    except OSError:  # pragma: no cover
+        log.warning("Plugins registry %s could not be saved.", path)
+
+    return specs.build(entries(plugins))
@@ -0,0 +1,280 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import collections
+import os
+import queue
+import sys
+import threading
+import typing as t
+
+"""Bytes a file sink accumulates before writing (one syscall per buffer)."""
+FILE_BUFFER_SIZE = 1 << 16
+
+"""File size triggering rotation of a rotating file sink."""
+ROTATE_MAX_BYTES = 10 << 20
+
+"""Chunks written by a threaded sink before waiting for the next ones."""
+DRAIN_BATCH_SIZE = 256
+
+"""Seconds between checks the drain thread is alive while waiting for a flush."""
+DRAIN_FLUSH_POLL = 0.1
+
+"""Bytes kept by a ring buffer sink (oldest messages are dropped)."""
+RING_CAPACITY = 1 << 20
+
+"""Encoded data, barrier set once everything before it is written or None."""
+TSinkItem = t.Union[bytes, threading.Event, None]
+
+
+class Sink:
+    """Destination of encoded output with its own buffering policy.
+
+    Data is emitted once buffer_size bytes are accumulated (0 for every
+    message) and on flush.
+    """
+
+    def __init__(self, buffer_size: int = 0):
+        """Class constructor."""
+        self._buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> None:
+        """Buffer data, emit the buffer once it is full."""
+        if not self._buffer_size:
+            self.emit(data)
+            return
+
+        self._buffer += data
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Emit buffered data."""
+        if self._buffer:
+            data, self._buffer = bytes(self._buffer), bytearray()
+            self.emit(data)
+
+    def close(self) -> None:
+        """Emit buffered data and release resources."""
+        self.flush()
+
+    def emit(self, data: bytes) -> None:
+        """Write data to the destination."""
+        raise NotImplementedError()
+
+
+class StreamSink(Sink):
+    """Sink writing to a stream (current sys.stdout by default)."""
+
+    def __init__(
+        self,
+        stream: t.Optional[t.IO[t.Any]] = None,
+        buffer_size: int = 0,
+        encoding: str = "utf-8",
+    ):
+        """Class constructor."""
+        super().__init__(buffer_size=buffer_size)
+        self._stream = stream
+        self._encoding = encoding
+
+    @property
+    def stream(self) -> t.IO[t.Any]:
+        """Output stream getter."""
+        return self._stream or sys.stdout
+
+    def emit(self, data: bytes) -> None:
+        """Write data to the binary layer of the stream (text streams decode)."""
+        stream = self.stream
+        binary = getattr(stream, "buffer", None)
+
+        if binary is None:
+            stream.write(data.decode(self._encoding))
+            stream.flush()
+            return
+
+        stream.flush()  # Text written directly to the stream goes first
+        binary.write(data)
+        binary.flush()
+
+
+class RotatingFileSink(Sink):
+    """Sink appending to a file rotated to path.1 ... path.N once it is too big."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = ROTATE_MAX_BYTES,
+        backups: int = 3,
+        buffer_size: int = FILE_BUFFER_SIZE,
+    ):
+        """Class constructor."""
+        super().__init__(buffer_size=buffer_size)
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._file: t.Optional[t.BinaryIO] = None
+
+    @property
+    def path(self) -> str:
+        """Log file path getter."""
+        return self._path
+
+    def emit(self, data: bytes) -> None:
+        """Append data, rotating the file first if it would grow too big."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+
+        size = self._file.tell()
+        if size and size + len(data) > self._max_bytes:
+            self.rotate()
+
+        self._file.write(data)
+        self._file.flush()
+
+    def rotate(self) -> None:
+        """Shift backups and start a new file."""
+        if self._file is not None:
+            self._file.close()
+
+        for i in range(self._backups - 1, 0, -1):
+            source = "{path}.{i}".format(path=self.path, i=i)
+            if os.path.exists(source):
+                os.replace(source, "{path}.{i}".format(path=self.path, i=i + 1))
+
+        if self._backups:
+            os.replace(self.path, self.path + ".1")
+
+        self._file = open(self.path, "wb")
+
+    def close(self) -> None:
+        """Write buffered data and close the file."""
+        super().close()
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RingBufferSink(Sink):
+    """Sink keeping the last capacity bytes of output in memory."""
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        """Class constructor."""
+        super().__init__()
+        self._capacity = capacity
+        self._chunks: t.Deque[bytes] = collections.deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def emit(self, data: bytes) -> None:
+        """Append data, dropping the oldest chunks over capacity."""
+        with self._lock:
+            self._chunks.append(data)
+            self._size += len(data)
+
+            while self._size > self._capacity and len(self._chunks) > 1:
+                self._size -= len(self._chunks.popleft())
+
+    def getvalue(self) -> bytes:
+        """Return kept output."""
+        with self._lock:
+            return b"".join(self._chunks)
+
+
+class ThreadedSink(Sink):
+    """Sink handing data to a background thread writing to a slow sink.
+
+    Writes never block on the wrapped sink, so a slow file does not stall
+    faster sinks of the same output. Errors of the wrapped sink (e.g. disk
+    full) are raised by the next flush or close on the caller thread.
+    """
+
+    def __init__(self, sink: Sink):
+        """Class constructor."""
+        super().__init__()
+        self._sink = sink
+        self._queue: "queue.Queue[TSinkItem]" = queue.Queue()
+        self._thread: t.Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._error: t.Optional[Exception] = None
+
+    def emit(self, data: bytes) -> None:
+        """Queue data for the background thread."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._drain, name="output-sink", daemon=True
+                    )
+                    self._thread.start()
+
+        self._queue.put(data)
+
+    def flush(self) -> None:
+        """Block until data queued so far is written and flushed."""
+        if self._thread is None:
+            return self._sink.flush()
+
+        thread, done = self._thread, threading.Event()
+        self._queue.put(done)
+        while not done.wait(DRAIN_FLUSH_POLL):
+            if not thread.is_alive():
+                break
+
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write queued data, stop the thread and close the wrapped sink."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+        self._sink.close()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _drain(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < DRAIN_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                try:
+                    if isinstance(item, bytes):
+                        self._sink.write(item)
+                    else:
+                        self._sink.flush()
+                except Exception as e:  # Raised by the next flush
+                    self._error = e
+
+                if item is None:
+                    return
+                if isinstance(item, threading.Event):
+                    item.set()
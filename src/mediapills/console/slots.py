@@ -0,0 +1,182 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import re
+import tempfile
+import time
+import typing as t
+
+from mediapills.console.exceptions import ConsoleBusyException
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+"""Wait until an instance slot is free."""
+SLOT_POLICY_WAIT = "wait"
+
+"""Do not run the command if all instance slots are taken."""
+SLOT_POLICY_SKIP = "skip"
+
+"""Fail if all instance slots are taken."""
+SLOT_POLICY_FAIL = "fail"
+
+SLOT_POLICIES = (SLOT_POLICY_WAIT, SLOT_POLICY_SKIP, SLOT_POLICY_FAIL)
+
+"""Seconds between the first attempts to take a slot, doubled up to the maximum."""
+SLOT_POLL_INTERVAL = 0.01
+
+"""Maximum seconds between attempts to take a slot."""
+SLOT_POLL_MAX_INTERVAL = 0.5
+
+ERR_MSG_SLOT_POLICY = 'Busy policy "{policy}" is not supported, use one of: {policies}.'
+
+ERR_MSG_BUSY = 'Command "{name}" is already running {size} time(s).'
+
+ERR_MSG_BUSY_TIMEOUT = (
+    'Command "{name}" is still running {size} time(s) after {timeout:g} seconds.'
+)
+
+
+def runtime_dir() -> str:
+    """Return directory the instance slot lock files are kept in."""
+    root = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        tempfile.gettempdir(),
+        "mediapills-console-{uid}".format(uid=getattr(os, "getuid", lambda: "")()),
+    )
+
+    return os.path.join(root, "mediapills-console", "slots")
+
+
+class Slot:
+    """Instance slot held by a running command, released on close."""
+
+    __slots__ = ("index", "waited", "_fd")
+
+    def __init__(self, index: int, fd: t.Optional[int], waited: float = 0.0) -> None:
+        """Class constructor."""
+        self.index = index
+        self.waited = waited
+        self._fd = fd
+
+    def release(self) -> None:
+        """Release the slot (closing the descriptor drops the lock)."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "Slot":
+        """Return the held slot."""
+        return self
+
+    def __exit__(self, exc_type: t.Any, exc: t.Any, tb: t.Any) -> None:
+        """Release the slot."""
+        self.release()
+
+
+class Slots:
+    """Limit of concurrently running instances of a command across processes.
+
+    Each slot is a lock file in the runtime directory, held with an exclusive
+    flock while the command runs. The kernel drops the lock when the process
+    exits, so slots of crashed or killed instances are freed. Where flock is
+    unavailable slots are not enforced.
+    """
+
+    def __init__(self, name: str, size: int = 1, directory: t.Optional[str] = None):
+        """Class constructor."""
+        self.name = name
+        self.size = max(1, size)
+        self.directory = directory or runtime_dir()
+
+    def path(self, index: int) -> str:
+        """Return lock file path of a slot."""
+        return os.path.join(
+            self.directory,
+            "{name}.{index}.lock".format(
+                name=re.sub(r"[^\w.-]", "_", self.name), index=index
+            ),
+        )
+
+    def try_acquire(self) -> t.Optional[Slot]:
+        """Take a free slot without blocking, None if all slots are taken."""
+        if fcntl is None:  # pragma: no cover
+            return Slot(0, None)
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+        for index in range(self.size):
+            fd = os.open(self.path(index), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            except BaseException:
+                os.close(fd)
+                raise
+
+            return Slot(index, fd)
+
+        return None
+
+    def acquire(
+        self, policy: str = SLOT_POLICY_WAIT, timeout: t.Optional[float] = None
+    ) -> t.Optional[Slot]:
+        """Take a slot following busy policy, None if the command is skipped.
+
+        With a timeout the wait policy gives up after that many seconds.
+        """
+        if policy not in SLOT_POLICIES:
+            raise ValueError(
+                ERR_MSG_SLOT_POLICY.format(
+                    policy=policy, policies=", ".join(SLOT_POLICIES)
+                )
+            )
+
+        started, interval = time.monotonic(), SLOT_POLL_INTERVAL
+        slot = self.try_acquire()
+
+        while slot is None:
+            if policy == SLOT_POLICY_SKIP:
+                return None
+            if policy == SLOT_POLICY_FAIL:
+                raise ConsoleBusyException(
+                    ERR_MSG_BUSY.format(name=self.name, size=self.size)
+                )
+
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise ConsoleBusyException(
+                        ERR_MSG_BUSY_TIMEOUT.format(
+                            name=self.name, size=self.size, timeout=timeout
+                        )
+                    )
+                interval = min(interval, remaining)
+
+            time.sleep(interval)
+            interval = min(interval * 2, SLOT_POLL_MAX_INTERVAL)
+            slot = self.try_acquire()
+
+        slot.waited = time.monotonic() - started
+        return slot
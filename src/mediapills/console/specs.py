@@ -0,0 +1,262 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import functools
+import json
+import os
+import pickle
+import sys
+import typing as t
+
+from mediapills.console.abc.arguments import TBaseArguments
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import InputOption
+from mediapills.console.arguments import InputParameter
+from mediapills.console.arguments import VALUE_IS_ARRAY
+from mediapills.console.arguments import VALUE_OPTIONAL
+from mediapills.console.arguments import VALUE_REQUIRED
+from mediapills.console.exceptions import ConsoleSpecException
+
+"""Compiled spec layout version, bumped on every incompatible change."""
+SPEC_FORMAT = 1
+
+COMPILED_EXTENSION = ".pickle"
+
+MODES = {
+    "required": VALUE_REQUIRED,
+    "optional": VALUE_OPTIONAL,
+    "array": VALUE_IS_ARRAY,
+}
+
+KIND_OPTION = "o"
+KIND_PARAMETER = "p"
+KIND_COMMAND = "c"
+
+ERR_MSG_UNSUPPORTED_FORMAT = 'Arguments spec format "{ext}" is not supported.'
+
+ERR_MSG_MISSING_DEPENDENCY = 'Reading "{ext}" arguments spec requires "{package}".'
+
+ERR_MSG_INVALID_SPEC = 'Arguments spec "{path}" is not valid: {error}.'
+
+ERR_MSG_SPEC_FORMAT = 'Compiled arguments spec "{path}" should be recompiled.'
+
+"""Compact spec: nested tuples of (kind, names, description, ...) entries."""
+TEntry = t.Tuple[t.Any, ...]
+TEntries = t.Tuple[TEntry, ...]
+TCompiled = t.Tuple[int, str, TEntries]
+
+
+def read(path: str) -> t.Dict[str, t.Any]:
+    """Read JSON, TOML or YAML spec document."""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".json":
+        with open(path, "rb") as fh:
+            return json.load(fh)  # type: ignore
+
+    if ext == ".toml":
+        try:
+            import tomllib as toml
+        except ImportError:
+            try:
+                import tomli as toml  # type: ignore
+            except ImportError:
+                raise ConsoleSpecException(
+                    ERR_MSG_MISSING_DEPENDENCY.format(ext=ext, package="tomli")
+                )
+        with open(path, "rb") as fh:
+            return toml.load(fh)
+
+    if ext in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ConsoleSpecException(
+                ERR_MSG_MISSING_DEPENDENCY.format(ext=ext, package="PyYAML")
+            )
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(path, "rb") as fh:
+            return yaml.load(fh, Loader=loader)  # type: ignore
+
+    raise ConsoleSpecException(ERR_MSG_UNSUPPORTED_FORMAT.format(ext=ext))
+
+
+def mode(value: t.Union[int, str, t.List[str]]) -> int:
+    """Convert mode names ("required", "optional", "array") into mode bitmask."""
+    if isinstance(value, int):
+        return value
+
+    names = [value] if isinstance(value, str) else value
+
+    return functools.reduce(lambda acc, name: acc | MODES[name], names, 0)
+
+
+def entries(doc: t.Dict[str, t.Any]) -> TEntries:
+    """Convert spec document section into compact entries."""
+    result: t.List[TEntry] = []
+
+    for opt in doc.get("options", []):
+        result.append((KIND_OPTION, tuple(opt["names"]), opt.get("description", "")))
+
+    for param in doc.get("parameters", []):
+        result.append(
+            (
+                KIND_PARAMETER,
+                tuple(param["names"]),
+                param.get("description", ""),
+                mode(param.get("mode", VALUE_OPTIONAL)),
+                param.get("default"),
+                param.get("completer"),
+            )
+        )
+
+    for cmd in doc.get("commands", []):
+        names = cmd["names"] if "names" in cmd else [cmd["name"]]
+        result.append(
+            (
+                KIND_COMMAND,
+                tuple(names),
+                cmd.get("description", ""),
+                cmd.get("handler"),
+                entries(cmd),
+            )
+        )
+
+    return tuple(result)
+
+
+def compile_spec(source: str, target: t.Optional[str] = None) -> str:
+    """Compile spec document into compact pickle file, return its path."""
+    try:
+        doc = read(source)
+        compiled: TCompiled = (SPEC_FORMAT, doc.get("description", ""), entries(doc))
+        build(compiled[2], lazy=False)  # validate modes and defaults once, here
+    except (KeyError, TypeError, ValueError) as e:
+        raise ConsoleSpecException(ERR_MSG_INVALID_SPEC.format(path=source, error=e))
+
+    target = target or os.path.splitext(source)[0] + COMPILED_EXTENSION
+    with open(target, "wb") as fh:
+        pickle.dump(compiled, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return target
+
+
+def load(path: str) -> TCompiled:
+    """Load compiled (trusted pickle) or source spec as compact entries."""
+    if not path.endswith(COMPILED_EXTENSION):
+        try:
+            doc = read(path)
+            return SPEC_FORMAT, doc.get("description", ""), entries(doc)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ConsoleSpecException(ERR_MSG_INVALID_SPEC.format(path=path, error=e))
+
+    with open(path, "rb") as fh:
+        compiled: TCompiled = pickle.load(fh)
+
+    if compiled[0] != SPEC_FORMAT:
+        raise ConsoleSpecException(ERR_MSG_SPEC_FORMAT.format(path=path))
+
+    return compiled
+
+
+def build(items: TEntries, lazy: bool = True) -> TBaseArguments:
+    """Build arguments from compact entries, commands arguments on first use."""
+    arguments: TBaseArguments = []
+
+    for entry in items:
+        kind, names, description = entry[:3]
+
+        if kind == KIND_OPTION:
+            arguments.append(InputOption(*names, description=description))
+        elif kind == KIND_PARAMETER:
+            arguments.append(
+                InputParameter(
+                    *names,
+                    description=description,
+                    mode=entry[3],
+                    default=entry[4],
+                    completer=entry[5],
+                )
+            )
+        else:
+            nested = functools.partial(build, entry[4], lazy)
+            arguments.append(
+                InputCommand(
+                    *names,
+                    description=description,
+                    handler=entry[3],
+                    arguments=nested if lazy else nested(),
+                )
+            )
+
+    return arguments
+
+
+def compact(arguments: TBaseArguments) -> TEntries:
+    """Convert arguments into compact entries (inverse of build)."""
+    result: t.List[TEntry] = []
+
+    for arg in arguments:
+        if isinstance(arg, InputCommand):
+            handler = arg.handler
+            if callable(handler):
+                handler = "{module}:{name}".format(
+                    module=handler.__module__, name=handler.__qualname__
+                )
+            result.append(
+                (
+                    KIND_COMMAND,
+                    arg.options,
+                    arg.description,
+                    handler,
+                    compact(arg.arguments),
+                )
+            )
+        elif isinstance(arg, InputParameter):
+            result.append(
+                (
+                    KIND_PARAMETER,
+                    arg.options,
+                    arg.description,
+                    arg.mode,
+                    arg.default,
+                    arg.completer,
+                )
+            )
+        else:
+            result.append((KIND_OPTION, arg.options, arg.description))
+
+    return tuple(result)
+
+
+def main(argv: t.Optional[t.List[str]] = None) -> int:
+    """Compile spec: python -m mediapills.console.specs SOURCE [TARGET]."""
+    args = sys.argv[1:] if argv is None else argv
+    if not args:
+        sys.stderr.write(main.__doc__ + "\n")  # type: ignore
+        return 2
+
+    sys.stdout.write(compile_spec(*args[:2]) + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
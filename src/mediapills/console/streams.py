@@ -0,0 +1,186 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import functools
+import io
+import mmap
+import os
+import stat
+import sys
+import typing as t
+
+from mediapills.console.exceptions import ConsoleStreamException
+from mediapills.console.executors import prefetch
+
+"""Bytes read per chunk, large reads keep syscalls count low on pipes."""
+CHUNK_SIZE = 1 << 20
+
+"""Decompressed chunks buffered ahead of the consumer."""
+QUEUE_SIZE = 8
+
+COMPRESSION_GZIP = "gzip"
+
+COMPRESSION_ZSTD = "zstd"
+
+MAGIC_NUMBERS = {
+    b"\x1f\x8b": COMPRESSION_GZIP,
+    b"\x28\xb5\x2f\xfd": COMPRESSION_ZSTD,
+}
+
+ERR_MSG_MISSING_DEPENDENCY = 'Reading "{codec}" input requires "{package}".'
+
+TSource = t.Union[str, t.BinaryIO, None]
+
+
+def chunks(source: TSource = None, size: int = CHUNK_SIZE) -> t.Iterator[memoryview]:
+    """Iterate input chunks from a path, a binary file or stdin (None or '-').
+
+    Regular files are memory mapped and chunks are zero-copy views of the
+    mapping, pipes are read into a reused buffer, so a chunk is valid only
+    until the next one is requested. Gzip and zstd input is decompressed
+    transparently in a background thread.
+    """
+    if source is None or source == "-":
+        source = sys.stdin.buffer
+
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            yield from read(fh, size)
+    else:
+        yield from read(source, size)
+
+
+def records(
+    source: TSource = None, separator: bytes = b"\n", size: int = CHUNK_SIZE
+) -> t.Iterator[bytes]:
+    """Iterate input records split by separator (not included)."""
+    tail = b""
+
+    for chunk in chunks(source, size):
+        parts = (tail + chunk).split(separator)
+        tail = parts.pop()
+        yield from parts
+
+    if tail:
+        yield tail
+
+
+def lines(
+    source: TSource = None, encoding: str = "utf-8", size: int = CHUNK_SIZE
+) -> t.Iterator[str]:
+    """Iterate decoded input lines without line endings."""
+    for record in records(source, b"\n", size):
+        if record.endswith(b"\r"):
+            record = record[:-1]
+        yield record.decode(encoding)
+
+
+def read(fh: t.BinaryIO, size: int) -> t.Iterator[memoryview]:
+    """Iterate chunks of an opened binary file using the fastest reader."""
+    codec = compression(fh)
+
+    if codec is not None:
+        yield from background(decompressor(fh, codec), size)
+    elif is_regular(fh):
+        yield from mapped(fh, size)
+    else:
+        yield from buffered(fh, size)
+
+
+def compression(fh: t.BinaryIO) -> t.Optional[str]:
+    """Detect compression by magic number without consuming input."""
+    if hasattr(fh, "peek"):
+        head = fh.peek(4)[:4]
+    elif fh.seekable():
+        pos = fh.tell()
+        head = fh.read(4)
+        fh.seek(pos)
+    else:
+        return None
+
+    for magic, codec in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return codec
+
+    return None
+
+
+def is_regular(fh: t.BinaryIO) -> bool:
+    """Return true if file is a regular file on disk (can be memory mapped)."""
+    try:
+        return stat.S_ISREG(os.fstat(fh.fileno()).st_mode)
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return False
+
+
+def mapped(fh: t.BinaryIO, size: int) -> t.Iterator[memoryview]:
+    """Iterate zero-copy views of a memory mapped file from current position."""
+    start = fh.tell()
+    if os.fstat(fh.fileno()).st_size <= start:
+        return
+
+    mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mm)
+    try:
+        for offset in range(start, len(mm), size):
+            end = offset + size
+            yield view[offset:end]
+        fh.seek(len(mm))
+    finally:
+        view.release()
+        try:
+            mm.close()
+        except BufferError:  # Consumer still holds a view, closed when collected
+            pass
+
+
+def buffered(fh: t.BinaryIO, size: int) -> t.Iterator[memoryview]:
+    """Iterate views of a reused buffer filled with large reads."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+
+    while True:
+        n = fh.readinto(view)  # type: ignore
+        if not n:
+            return
+        yield view[:n]
+
+
+def decompressor(fh: t.BinaryIO, codec: str) -> t.BinaryIO:
+    """Return decompressing reader of a compressed file."""
+    if codec == COMPRESSION_GZIP:
+        import gzip
+
+        return gzip.GzipFile(fileobj=fh)  # type: ignore
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ConsoleStreamException(
+            ERR_MSG_MISSING_DEPENDENCY.format(codec=codec, package="zstandard")
+        )
+
+    return zstandard.ZstdDecompressor().stream_reader(fh)  # type: ignore
+
+
+def background(fh: t.BinaryIO, size: int) -> t.Iterator[memoryview]:
+    """Iterate chunks read by a background thread (decompression off-loaded)."""
+    for data in prefetch(iter(functools.partial(fh.read, size), b""), QUEUE_SIZE):
+        yield memoryview(data)
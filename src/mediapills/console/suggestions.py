@@ -0,0 +1,130 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import typing as t
+
+"""Maximum edit distance of a suggested name (shorter names allow one edit)."""
+SUGGEST_DISTANCE = 2
+
+"""Maximum number of names suggested for a token."""
+SUGGEST_LIMIT = 3
+
+ERR_MSG_DID_YOU_MEAN = "{token} (did you mean {names}?)"
+
+
+def distance(source: str, target: str) -> int:
+    """Return Levenshtein edit distance between two strings."""
+    if len(source) < len(target):
+        source, target = target, source
+
+    previous = list(range(len(target) + 1))
+    for i, char in enumerate(source, 1):
+        current = [i]
+        for j, other in enumerate(target, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char != other),
+                )
+            )
+        previous = current
+
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree finding names within an edit distance of a token.
+
+    Each node keeps children by their distance to the node name, so a search
+    only descends into children the triangle inequality can not rule out.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, names: t.Iterable[str] = ()) -> None:
+        """Class constructor."""
+        self._root: t.Optional[t.Tuple[str, t.Dict[int, t.Any]]] = None
+        self._size = 0
+
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        """Return number of names in the tree."""
+        return self._size
+
+    def add(self, name: str) -> None:
+        """Add name to the tree, duplicates are ignored."""
+        if self._root is None:
+            self._root = (name, {})
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            dist = distance(name, node[0])
+            if dist == 0:
+                return
+            if dist not in node[1]:
+                node[1][dist] = (name, {})
+                self._size += 1
+                return
+            node = node[1][dist]
+
+    def search(self, token: str, radius: int) -> t.List[t.Tuple[int, str]]:
+        """Return (distance, name) pairs within radius, closest first."""
+        found: t.List[t.Tuple[int, str]] = []
+        stack = [] if self._root is None else [self._root]
+
+        while stack:
+            name, children = stack.pop()
+            dist = distance(token, name)
+            if dist <= radius:
+                found.append((dist, name))
+            for child_dist, child in children.items():
+                if dist - radius <= child_dist <= dist + radius:
+                    stack.append(child)
+
+        return sorted(found)
+
+
+def radius(token: str) -> int:
+    """Return maximum edit distance of names suggested for token."""
+    return SUGGEST_DISTANCE if len(token.lstrip("-")) > 4 else 1
+
+
+def suggest(token: str, tree: BKTree, limit: int = SUGGEST_LIMIT) -> t.List[str]:
+    """Return names closest to the token, e.g. ["--verbose"] for "--verbos"."""
+    if token.startswith("--"):
+        token = token.split("=", 1)[0]
+
+    option = token.startswith("-")
+    found = tree.search(token, radius(token))
+
+    return [name for _, name in found if name.startswith("-") == option][:limit]
+
+
+def explain(token: str, names: t.Sequence[str]) -> str:
+    """Return token followed by the names suggested for it, if any."""
+    if not names:
+        return token
+
+    return ERR_MSG_DID_YOU_MEAN.format(token=token, names=" or ".join(names))
@@ -0,0 +1,142 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import locale
+import os
+import signal
+import threading
+import typing as t
+
+"""Terminal size used when it can not be detected (e.g. output is a file)."""
+DEFAULT_SIZE = (80, 24)
+
+"""Terminals probed so far by file descriptor."""
+_terminals: t.Dict[int, "Terminal"] = {}
+
+_lock = threading.Lock()
+
+
+class Terminal:
+    """Capabilities of a stream terminal, probed once.
+
+    isatty, color and encoding are plain attributes, size is probed again
+    lazily only after the terminal was resized (SIGWINCH).
+    """
+
+    __slots__ = ("fd", "isatty", "color", "encoding", "_size", "_stale")
+
+    def __init__(self, fd: t.Optional[int] = None, encoding: t.Optional[str] = None):
+        """Class constructor."""
+        self.fd = fd
+        self.isatty = fd is not None and os.isatty(fd)
+        self.color = self.isatty and supports_color()
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self._size: t.Tuple[int, int] = DEFAULT_SIZE
+        self._stale = True
+
+    @property
+    def columns(self) -> int:
+        """Terminal width."""
+        return self.size[0]
+
+    @property
+    def lines(self) -> int:
+        """Terminal height."""
+        return self.size[1]
+
+    @property
+    def size(self) -> t.Tuple[int, int]:
+        """Terminal (columns, lines), COLUMNS and LINES variables take precedence."""
+        if self._stale:
+            self._size = probe_size(self.fd if self.isatty else None)
+            self._stale = False
+
+        return self._size
+
+    def resized(self) -> None:
+        """Mark size as outdated, probed again on next access."""
+        self._stale = True
+
+
+def supports_color() -> bool:
+    """Return false if colors are disabled by NO_COLOR or a dumb TERM."""
+    if os.environ.get("NO_COLOR"):
+        return False
+
+    return os.environ.get("TERM", "") != "dumb"
+
+
+def probe_size(fd: t.Optional[int]) -> t.Tuple[int, int]:
+    """Return terminal (columns, lines) of a descriptor, environment first."""
+    columns, lines = 0, 0
+
+    try:
+        columns = int(os.environ.get("COLUMNS", 0))
+        lines = int(os.environ.get("LINES", 0))
+    except ValueError:
+        pass
+
+    if (not columns or not lines) and fd is not None:
+        try:
+            size = os.get_terminal_size(fd)
+            columns, lines = columns or size.columns, lines or size.lines
+        except OSError:
+            pass
+
+    return columns or DEFAULT_SIZE[0], lines or DEFAULT_SIZE[1]
+
+
+def terminal(stream: t.Any) -> Terminal:
+    """Return capabilities of a stream terminal (shared per descriptor)."""
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):  # In-memory stream
+        return Terminal(encoding=getattr(stream, "encoding", None))
+
+    found = _terminals.get(fd)
+    if found is not None:
+        return found
+
+    with _lock:
+        if fd not in _terminals:
+            if not _terminals:
+                watch_resize()
+            _terminals[fd] = Terminal(fd, encoding=getattr(stream, "encoding", None))
+
+    return _terminals[fd]
+
+
+def watch_resize() -> None:
+    """Install SIGWINCH handler marking probed terminals sizes outdated."""
+    if not hasattr(signal, "SIGWINCH"):  # pragma: no cover
+        return
+
+    try:
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def resized(signum: int, frame: t.Any) -> None:
+            for found in [*_terminals.values()]:
+                found.resized()
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(signal.SIGWINCH, resized)
+    except ValueError:  # Not the main thread, sizes stay as first probed
+        pass
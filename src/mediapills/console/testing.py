@@ -0,0 +1,160 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import contextlib
+import io
+import os
+import sys
+import typing as t
+
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.outputs import ConsoleOutput
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from mediapills.console import Application
+
+"""Standard input given to an invocation as text or raw bytes."""
+TInput = t.Optional[t.Union[str, bytes]]
+
+"""Environment variables to set for an invocation, None values are unset."""
+TEnviron = t.Optional[t.Mapping[str, t.Optional[str]]]
+
+
+class Result:
+    """Captured outcome of an application invocation."""
+
+    __slots__ = ("exit_code", "stdout_bytes", "stderr_bytes", "exception", "encoding")
+
+    def __init__(
+        self,
+        exit_code: int,
+        stdout_bytes: bytes,
+        stderr_bytes: bytes,
+        exception: t.Optional[BaseException] = None,
+        encoding: str = "utf-8",
+    ) -> None:
+        """Class constructor."""
+        self.exit_code = exit_code
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+        self.exception = exception
+        self.encoding = encoding
+
+    @property
+    def stdout(self) -> str:
+        """Decoded standard output."""
+        return self.stdout_bytes.decode(self.encoding, "replace")
+
+    @property
+    def stderr(self) -> str:
+        """Decoded standard errors output."""
+        return self.stderr_bytes.decode(self.encoding, "replace")
+
+    def __repr__(self) -> str:
+        """Return result representation."""
+        return "<Result exit_code={code}>".format(code=self.exit_code)
+
+
+class CliRunner:
+    """Invoke an application in-process with captured outputs.
+
+    Outputs are written to in-memory byte buffers and exit codes are returned
+    by Application.run, so nothing unwinds through SystemExit. The application
+    builds its parser on the first invocation and reuses it afterwards.
+    Invocations swap process wide streams and environment, so a runner must
+    not be used from several threads at once.
+    """
+
+    def __init__(
+        self, app: "Application", env: TEnviron = None, encoding: str = "utf-8"
+    ) -> None:
+        """Class constructor."""
+        self.app = app
+        self.env = dict(env or {})
+        self.encoding = encoding
+
+    def invoke(
+        self,
+        argv: t.Optional[t.Sequence[str]] = None,
+        input: TInput = None,
+        env: TEnviron = None,
+        catch_exceptions: bool = True,
+    ) -> Result:
+        """Run application with argv, stdin and environment, return result."""
+        app, exception = self.app, None
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        out, err = self.text(stdout), self.text(stderr)
+
+        if isinstance(input, str):
+            input = input.encode(self.encoding)
+        stdin = io.TextIOWrapper(io.BytesIO(input or b""), encoding=self.encoding)
+
+        saved = app.stdout, app.stderr, app._log_bridge
+        streams = sys.stdin, sys.stdout, sys.stderr
+        app.stdout, app.stderr = ConsoleOutput(stream=out), ConsoleOutput(stream=err)
+        app._log_bridge = None  # logs go to captured stderr
+        sys.stdin, sys.stdout, sys.stderr = stdin, out, err
+
+        try:
+            with environ({**self.env, **(env or {})}):
+                code = app.run([*argv] if argv is not None else [])
+        except Exception as e:
+            if not catch_exceptions:
+                raise
+            code, exception = FAILURE, e
+        finally:
+            if app._log_bridge is not None:
+                app._log_bridge.uninstall()
+            app.stdout, app.stderr, app._log_bridge = saved
+            sys.stdin, sys.stdout, sys.stderr = streams
+
+        return Result(
+            exit_code=code,
+            stdout_bytes=stdout.getvalue(),
+            stderr_bytes=stderr.getvalue(),
+            exception=exception,
+            encoding=self.encoding,
+        )
+
+    def text(self, buffer: t.BinaryIO) -> t.TextIO:
+        """Return text layer writing through to a byte buffer."""
+        return io.TextIOWrapper(
+            buffer, encoding=self.encoding, newline="", write_through=True
+        )
+
+
+@contextlib.contextmanager
+def environ(env: t.Mapping[str, t.Optional[str]]) -> t.Iterator[None]:
+    """Set environment variables in the block, restore previous values after."""
+    saved = {name: os.environ.get(name) for name in env}
+
+    try:
+        for name, value in env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
@@ -0,0 +1,250 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import itertools
+import os
+import threading
+import time
+import typing as t
+
+"""Maximum number of spans kept per trace, later spans are counted as dropped."""
+TRACE_MAX_SPANS = 1 << 16
+
+TRACE_FORMAT_CHROME = "chrome"
+
+TRACE_FORMAT_OTLP = "otlp"
+
+TRACE_FORMATS = (TRACE_FORMAT_CHROME, TRACE_FORMAT_OTLP)
+
+ERR_MSG_TRACE_FORMAT = 'Trace format "{fmt}" is not supported, use one of: {formats}.'
+
+if hasattr(time, "monotonic_ns"):
+    now_ns = time.monotonic_ns
+    wall_ns = time.time_ns
+else:  # pragma: no cover
+    # Python 3.6 has no nanosecond clocks
+
+    def now_ns() -> int:
+        """Return monotonic clock in nanoseconds."""
+        return int(time.monotonic() * 1e9)
+
+    def wall_ns() -> int:
+        """Return wall clock in nanoseconds."""
+        return int(time.time() * 1e9)
+
+
+class Span:
+    """Timed operation of a trace, nested in the span open in the same thread."""
+
+    __slots__ = (
+        "tracer",
+        "name",
+        "span_id",
+        "parent_id",
+        "thread_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+    )
+
+    def __init__(
+        self, tracer: "Tracer", name: str, attributes: t.Dict[str, t.Any]
+    ) -> None:
+        """Class constructor."""
+        self.tracer = tracer
+        self.name = name
+        self.span_id = next(tracer.ids)
+        self.parent_id = 0
+        self.thread_id = 0
+        self.start_ns = 0
+        self.end_ns = 0
+        self.attributes = attributes
+
+    def __enter__(self) -> "Span":
+        """Open span as a child of the current thread span."""
+        stack = self.tracer.stack()
+        if stack:
+            self.parent_id = stack[-1].span_id
+        stack.append(self)
+        self.thread_id = threading.get_ident()
+        self.start_ns = now_ns()
+
+        return self
+
+    def __exit__(self, exc_type: t.Any, exc: t.Any, tb: t.Any) -> None:
+        """Close span, record exception type as "error" attribute."""
+        self.end_ns = now_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+
+        stack = self.tracer.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        self.tracer.finish(self)
+
+    def set(self, key: str, value: t.Any) -> None:
+        """Set span attribute."""
+        self.attributes[key] = value
+
+
+class NoopSpan:
+    """Span doing nothing, used when tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NoopSpan":
+        """Do nothing."""
+        return self
+
+    def __exit__(self, exc_type: t.Any, exc: t.Any, tb: t.Any) -> None:
+        """Do nothing."""
+
+    def set(self, key: str, value: t.Any) -> None:
+        """Do nothing."""
+
+
+"""Shared span returned when tracing is off."""
+NOOP_SPAN = NoopSpan()
+
+TSpan = t.Union[Span, NoopSpan]
+
+
+class Tracer:
+    """Collect spans and export them as Chrome trace events or OTLP JSON."""
+
+    def __init__(self, max_spans: int = TRACE_MAX_SPANS) -> None:
+        """Class constructor."""
+        self.max_spans = max_spans
+        self.spans: t.List[Span] = []
+        self.dropped = 0
+        self.ids = itertools.count(1)
+        self.trace_id = os.urandom(16).hex()
+        self.epoch_ns = wall_ns() - now_ns()
+        self._local = threading.local()
+
+    def span(self, name: str, **attributes: t.Any) -> Span:
+        """Return span to open with a "with" statement."""
+        return Span(self, name, attributes)
+
+    def stack(self) -> t.List[Span]:
+        """Return open spans of the current thread."""
+        try:
+            return self._local.stack  # type: ignore
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack  # type: ignore
+
+    def finish(self, span: Span) -> None:
+        """Keep a closed span, unless the trace is full."""
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def clear(self) -> None:
+        """Forget spans collected so far and start a new trace."""
+        self.spans, self.dropped = [], 0
+        self.trace_id = os.urandom(16).hex()
+
+    def chrome(self) -> t.Dict[str, t.Any]:
+        """Return spans as Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {k: str(v) for k, v in span.attributes.items()},
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped},
+        }
+
+    def otlp(self, service: str) -> t.Dict[str, t.Any]:
+        """Return spans as OTLP JSON (an ExportTraceServiceRequest)."""
+        spans = []
+
+        for span in self.spans:
+            record = {
+                "traceId": self.trace_id,
+                "spanId": "{id:016x}".format(id=span.span_id),
+                "name": span.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(span.start_ns + self.epoch_ns),
+                "endTimeUnixNano": str(span.end_ns + self.epoch_ns),
+                "attributes": [
+                    {"key": k, "value": otlp_value(v)}
+                    for k, v in {**span.attributes, "thread.id": span.thread_id}.items()
+                ],
+            }
+            if span.parent_id:
+                record["parentSpanId"] = "{id:016x}".format(id=span.parent_id)
+            if "error" in span.attributes:
+                record["status"] = {"code": 2}  # STATUS_CODE_ERROR
+            spans.append(record)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": otlp_value(service)}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "mediapills.console"}, "spans": spans}
+                    ],
+                }
+            ]
+        }
+
+    def write(
+        self, path: str, fmt: str = TRACE_FORMAT_CHROME, service: str = "console"
+    ) -> None:
+        """Write spans to a JSON file in Chrome or OTLP format."""
+        if fmt not in TRACE_FORMATS:
+            raise ValueError(
+                ERR_MSG_TRACE_FORMAT.format(fmt=fmt, formats=", ".join(TRACE_FORMATS))
+            )
+
+        import json  # Imported only when a trace is written
+
+        data = self.chrome() if fmt == TRACE_FORMAT_CHROME else self.otlp(service)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+
+
+def otlp_value(value: t.Any) -> t.Dict[str, t.Any]:
+    """Return OTLP JSON AnyValue of an attribute value."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
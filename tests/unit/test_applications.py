@@ -18,11 +18,28 @@
 # LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import os
+import subprocess
+import sys
+import typing as t
 import unittest
 from unittest.mock import Mock
 from unittest.mock import patch
 
 from mediapills.console import Application
+from mediapills.console import parameter
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import BROKEN_PIPE
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import VALUE_REQUIRED
+from mediapills.console.deadlines import CancelToken
+from mediapills.console.features import BatchFeature
+from mediapills.console.features import ShellFeature
+from mediapills.console.outputs import ConsoleOutput
 
 
 class TestApplication(unittest.TestCase):
@@ -37,101 +54,281 @@ def test_no_args_should_no_output(self, mock_in: Mock) -> None:
 
         self.assertEqual(mock_out.write.call_count, 0)
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({}, ["--option"])),
-    )
     def test_exception_should_show_help(self) -> None:
         app = Application(stdout=Mock(), stderr=Mock())
 
-        with self.assertRaises(SystemExit) as e:
-            app.run()
-        self.assertEqual(e.exception.code, 1)
+        self.assertEqual(app.run(["--option"]), FAILURE)
+
+    def test_unrecognized_option_should_suggest_similar(self) -> None:
+        mock_err = Mock()
+        app = Application(stdout=Mock(), stderr=mock_err)
+
+        self.assertEqual(app.run(["--quite"]), FAILURE)
+        mock_err.write.assert_called_once_with(
+            "unrecognized arguments: --quite (did you mean --quiet?)"
+        )
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse", Mock(return_value=({}, [])),
-    )
     def test_default_verbosity_should_be_normal(self) -> None:
         mock_out = Mock()
 
         app = Application(stdout=mock_out, stderr=Mock())
-        app.run()
+        app.run([])
 
         self.assertEqual(mock_out.call_count, 0)
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"quiet": 1}, [])),
-    )
     def test_quiet_verbosity_should_be_correct(self) -> None:
         mock_out = Mock()
 
         app = Application(stdout=mock_out, stderr=Mock())
-        app.run()
+        app.run(["-q"])
 
         mock_out.set_quiet.assert_called_once()
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"v": 1}, [])),
-    )
     def test_verbose_verbosity_should_be_correct(self) -> None:
         mock_out = Mock()
 
         app = Application(stdout=mock_out, stderr=Mock())
-        app.run()
+        app.run(["-v"])
 
         mock_out.set_verbose.assert_called_once()
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"v": 2}, [])),
-    )
     def test_very_verbose_verbosity_should_be_correct(self) -> None:
         mock_out = Mock()
 
         app = Application(stdout=mock_out, stderr=Mock())
-        app.run()
+        app.run(["-vv"])
 
         mock_out.set_very_verbose.assert_called_once()
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"v": 3}, [])),
-    )
     def test_debug_verbosity_should_be_correct(self) -> None:
         mock_out = Mock()
 
         app = Application(stdout=mock_out, stderr=Mock())
-        app.run()
+        app.run(["-v", "-vv"])
 
         mock_out.set_debug.assert_called_once()
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"help": 1}, [])),
-    )
     def test_help_option_should_show_help(self) -> None:
         mock_out = Mock()
         app = Application(stdout=mock_out, stderr=Mock(), show_help=True)
 
-        with self.assertRaises(SystemExit) as e:
-            app.run()
-        self.assertEqual(e.exception.code, 0)
+        self.assertEqual(app.run(["--help"]), SUCCESS)
         mock_out.write.assert_called_once()
 
-    @patch(
-        "mediapills.console.InputArgumentsParser.parse",
-        Mock(return_value=({"version": 1}, [])),
-    )
     def test_version_option_should_show_version(self) -> None:
         mock_out = Mock()
         app = Application(
             stdout=mock_out, stderr=Mock(), version="test", show_version=True
         )
 
-        with self.assertRaises(SystemExit) as e:
-            app.run()
-        self.assertEqual(e.exception.code, 0)
+        self.assertEqual(app.run(["-V"]), SUCCESS)
 
         mock_out.write.assert_called_once()
+
+    def test_command_overriding_execute_should_run(self) -> None:
+        class Hello(InputCommand):
+            def execute(self, stdin: BaseInput, stdout: BaseOutput) -> int:
+                stdout.write("hello")
+                return 3
+
+        mock_out = Mock()
+        app = Application(stdout=mock_out, stderr=Mock())
+        app.commands.append(Hello("hello"))
+
+        self.assertEqual(3, app.run(["hello"]))
+        mock_out.write.assert_called_once_with("hello")
+
+    def test_builtin_flags_should_not_build_parser(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock(), show_version=True)
+
+        @app.command("first")
+        def first(stdin: BaseInput, stdout: BaseOutput) -> None:
+            pass
+
+        self.assertEqual(app.run(["-vV"]), SUCCESS)
+        self.assertIsNone(app.parser._parser)
+
+    def test_builtin_flags_should_ignore_required_parameters(self) -> None:
+        for argv in (["--help"], ["-V"], ["--completion", "bash"]):
+            mock_out, mock_err = Mock(), Mock()
+            app = Application(
+                stdout=mock_out,
+                stderr=mock_err,
+                show_help=True,
+                show_version=True,
+                show_completion=True,
+            )
+            app.parameters.append(parameter("--name", mode=VALUE_REQUIRED))
+            app.parameters.append(parameter("path", mode=VALUE_REQUIRED))
+
+            self.assertEqual(app.run(argv), SUCCESS)
+            mock_out.write.assert_called_once()
+            mock_err.write.assert_not_called()
+
+    def test_required_parameters_should_still_be_checked(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock(), show_version=True)
+        app.parameters.append(parameter("--name", mode=VALUE_REQUIRED))
+
+        with patch("sys.stderr", new_callable=io.StringIO) as stderr:
+            self.assertEqual(app.run(["-v"]), 2)
+        self.assertIn("--name", stderr.getvalue())
+
+
+class TestApplicationBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_out = Mock()
+        self.app = Application(
+            stdout=self.mock_out,
+            stderr=Mock(),
+            features=[BatchFeature(), ShellFeature()],
+            name="app",
+        )
+
+        @self.app.command("ok")
+        def ok(stdin: BaseInput, stdout: BaseOutput) -> int:
+            stdout.write("ok")
+            return SUCCESS
+
+        @self.app.command("fail")
+        def fail(stdin: BaseInput, stdout: BaseOutput) -> int:
+            return 3
+
+    def test_lines_should_collect_exit_codes(self) -> None:
+        codes = self.app.run_lines(["ok", "# comment", "", "fail", "ok --undef", "ok"])
+
+        self.assertListEqual([SUCCESS, 3, FAILURE, SUCCESS], codes)
+        self.assertEqual(3, self.app.aggregate(codes))
+        self.assertEqual(self.mock_out.write.call_count, 2)
+
+    def test_fail_fast_should_stop_at_first_failure(self) -> None:
+        codes = self.app.run_lines(["ok", "fail", "ok"], fail_fast=True)
+
+        self.assertListEqual([SUCCESS, 3], codes)
+
+    def test_batch_option_should_exit_with_aggregated_code(self) -> None:
+        with patch("sys.stdin", io.StringIO("ok\nfail\n")):
+            self.assertEqual(self.app.run(["--batch", "-"]), 3)
+
+    def test_run_should_be_repeatable(self) -> None:
+        self.assertEqual(self.app.run(["fail"]), 3)
+        self.assertEqual(self.app.run(["ok"]), SUCCESS)
+        self.assertEqual(self.mock_out.write.call_count, 1)
+        self.assertIn("execute", self.app.timings)
+
+    def test_shell_should_prompt_with_app_name(self) -> None:
+        tty = Mock(isatty=Mock(return_value=True))
+        typed = Mock(side_effect=["ok", KeyboardInterrupt(), "fail", "exit", "ok"])
+
+        with patch("sys.stdin", tty), patch("builtins.input", typed):
+            self.assertEqual(self.app.run(["--shell"]), 3)
+
+        typed.assert_called_with("app> ")
+        self.assertEqual(4, typed.call_count)
+        self.assertListEqual(
+            ["ok", ""], [c.args[0] for c in self.mock_out.write.call_args_list]
+        )
+
+    def test_main_should_exit_with_code(self) -> None:
+        with self.assertRaises(SystemExit) as e:
+            self.app.main(["fail"])
+
+        self.assertEqual(e.exception.code, 3)
+
+
+class TestBrokenPipe(unittest.TestCase):
+    def setUp(self) -> None:
+        self.produced = 0
+        self.closed = False
+        self.stream = io.StringIO()
+        self.stream.write = Mock(side_effect=[1, 1, BrokenPipeError()])  # type: ignore
+        self.app = Application(stdout=ConsoleOutput(stream=self.stream), stderr=Mock())
+        self.app.command("dump")(self.dump)
+
+    def dump(self, stdin: BaseInput, stdout: BaseOutput) -> t.Iterator[str]:
+        try:
+            while True:
+                self.produced += 1
+                yield str(self.produced)
+        finally:
+            self.closed = True
+
+    def test_closed_pipe_should_stop_producer(self) -> None:
+        self.assertEqual(BROKEN_PIPE, self.app.run(["dump"]))
+        self.assertEqual(2, self.produced)
+        self.assertTrue(self.closed)
+
+    def test_closed_pipe_should_cancel_token(self) -> None:
+        token = CancelToken()
+
+        with self.assertRaises(BrokenPipeError):
+            self.app.drain(self.dump(Mock(), self.app.stdout), cancel=token)
+
+        self.assertTrue(token.cancelled)
+
+    def test_closed_pipe_should_exit_without_traceback(self) -> None:
+        script = (
+            "import itertools, sys\n"
+            "from mediapills.console import Application\n"
+            "from mediapills.console.outputs import ConsoleOutput\n"
+            "app = Application(stdout=ConsoleOutput(), stderr=ConsoleOutput())\n"
+            "app.command('dump')(lambda stdin, stdout: map(str, itertools.count()))\n"
+            "app.main(['dump'])\n"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        process = subprocess.Popen(
+            [sys.executable, "-c", script],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+        )
+        process.stdout.readline()  # type: ignore
+        process.stdout.close()  # type: ignore
+
+        self.assertEqual(BROKEN_PIPE, process.wait(timeout=30))
+        self.assertEqual(b"", process.stderr.read())  # type: ignore
+        process.stderr.close()  # type: ignore
+
+
+class TestApplicationImport(unittest.TestCase):
+    def test_disabled_features_should_not_import_modules(self) -> None:
+        script = (
+            "import sys\n"
+            "from mediapills.console import Application\n"
+            "from mediapills.console.outputs import ConsoleOutput\n"
+            "Application(stdout=ConsoleOutput(), stderr=ConsoleOutput()).run([])\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+        modules = subprocess.run(
+            [sys.executable, "-c", script], stdout=subprocess.PIPE, env=env, check=True
+        ).stdout.decode().split()
+
+        for module in (
+            "concurrent.futures",
+            "http.server",
+            "logging.handlers",
+            "multiprocessing",
+            "sqlite3",
+        ):
+            self.assertNotIn(module, modules)
+
+
+def lazy_handler(stdin: BaseInput, stdout: BaseOutput) -> int:
+    stdout.write("lazy")
+    return 5
+
+
+class TestApplicationLazyCommand(unittest.TestCase):
+    def test_handler_should_be_imported_on_dispatch(self) -> None:
+        mock_out = Mock()
+        app = Application(stdout=mock_out, stderr=Mock(), show_help=True)
+        app.command("lazy", handler=__name__ + ":lazy_handler")
+        app.command("missing", handler="mediapills_missing_module:handler")
+
+        self.assertEqual(app.run(["--help"]), SUCCESS)
+        self.assertEqual(app.run(["lazy"]), 5)
+        mock_out.write.assert_called_with("lazy")
+        self.assertIn("import:lazy", app.timings)
+
+        with self.assertRaises(expected_exception=ImportError):
+            app.run(["missing"])
@@ -31,7 +31,7 @@ class TestInputParameter(unittest.TestCase):
     def test_default_should_be_valid(self) -> None:
         obj = InputParameter("test")
 
-        self.assertEqual(["test"], obj.options)
+        self.assertEqual(("test",), obj.options)
         self.assertEqual("", obj.description)
         self.assertIsNone(obj.default)
         self.assertFalse(obj.is_array())
@@ -104,3 +104,16 @@ def test_array_default_should_be_valid(self) -> None:
     def test_default_type_should_be_valid(self, default: Any) -> None:
         with self.assertRaises(expected_exception=ValueError):
             InputParameter("test", default=default)
+
+    def test_argument_should_not_have_dict(self) -> None:
+        obj = InputParameter("-t", "--test")
+
+        self.assertEqual(("-t", "--test"), obj.options)
+        with self.assertRaises(expected_exception=AttributeError):
+            obj.unknown = "value"  # type: ignore
+
+    def test_mode_setter_should_validate(self) -> None:
+        obj = InputParameter("test")
+
+        with self.assertRaises(expected_exception=ValueError):
+            obj.mode = arguments.VALUE_REQUIRED | arguments.VALUE_OPTIONAL
@@ -0,0 +1,137 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console import parameter
+from mediapills.console.caches import cache_key
+from mediapills.console.caches import ResultsCache
+
+
+class TestCaches(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt")
+        with open(self.path, "w") as fh:
+            fh.write("first")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_key_should_depend_on_args_env_and_files(self) -> None:
+        args = {"command": "lint", "input": self.path}
+        key = cache_key(args, env=["LINT_LEVEL"], files=["input"])
+
+        self.assertEqual(key, cache_key({**args}, env=["LINT_LEVEL"], files=["input"]))
+        self.assertNotEqual(key, cache_key({**args, "command": "report"}))
+
+        with patch.dict(os.environ, {"LINT_LEVEL": "strict"}):
+            self.assertNotEqual(
+                key, cache_key(args, env=["LINT_LEVEL"], files=["input"])
+            )
+
+        with open(self.path, "w") as fh:
+            fh.write("second")
+        self.assertNotEqual(key, cache_key(args, env=["LINT_LEVEL"], files=["input"]))
+
+    def test_results_should_be_evicted_least_recently_used_first(self) -> None:
+        cache = ResultsCache(os.path.join(self.tmp.name, "results"), max_size=300)
+        result = ([("x" * 100, False, 0)], 0)
+
+        cache.put("a", result)
+        cache.put("b", result)
+        os.utime(cache.path("a"), ns=(0, 0))
+        os.utime(cache.path("b"), ns=(1, 1))
+        self.assertIsNotNone(cache.get("a"))  # Becomes the most recently used
+        cache.put("c", result)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(result, cache.get("c"))
+
+    def test_results_should_be_stored_as_json(self) -> None:
+        cache = ResultsCache(os.path.join(self.tmp.name, "results"))
+        cache.put("a", ([("héllo", True, 2)], 3))
+
+        with open(cache.path("a"), encoding="utf-8") as fh:
+            self.assertEqual([[["héllo", True, 2]], 3], json.load(fh))
+        self.assertEqual(([("héllo", True, 2)], 3), cache.get("a"))
+
+        for content in (b"\x80\x04K\x01.", b"[1, 2, 3]", b'[[["x"]], 0]', b"{}"):
+            with open(cache.path("a"), "wb") as fh:
+                fh.write(content)
+            self.assertIsNone(cache.get("a"))
+
+
+class TestApplicationCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.handler = Mock(return_value=3)
+        self.mock_out = Mock()
+        self.app = Application(stdout=self.mock_out, stderr=Mock())
+        self.app.results_cache = ResultsCache(self.tmp.name)
+
+        @self.app.command("report", arguments=[parameter("--id")], cache=True)
+        def report(stdin, stdout) -> int:  # type: ignore
+            stdout.write("report {}".format(stdin.get_arg("id")))
+            return self.handler()  # type: ignore
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_cached_result_should_be_replayed(self) -> None:
+        self.assertEqual(3, self.app.run(["report", "--id", "1"]))
+        self.assertEqual(3, self.app.run(["report", "--id", "1"]))
+        self.assertEqual(3, self.app.run(["report", "--id", "2"]))
+
+        self.assertEqual(2, self.handler.call_count)
+        self.assertListEqual(
+            ["report 1", "report 1", "report 2"],
+            [c.args[0] for c in self.mock_out.write.call_args_list],
+        )
+
+    def test_apps_should_not_share_results(self) -> None:
+        mock_out = Mock()
+        other = Application(stdout=mock_out, stderr=Mock(), name="other")
+        other.results_cache = self.app.results_cache
+
+        @other.command("report", arguments=[parameter("--id")], cache=True)
+        def report(stdin, stdout) -> int:  # type: ignore
+            stdout.write("other report")
+            return 0
+
+        self.assertEqual(3, self.app.run(["report", "--id", "1"]))
+        self.assertEqual(0, other.run(["report", "--id", "1"]))
+
+        self.assertListEqual(
+            ["other report"], [c.args[0] for c in mock_out.write.call_args_list]
+        )
+
+    def test_no_cache_should_bypass_cache(self) -> None:
+        self.app.run(["report"])
+        self.app.run(["--no-cache", "report"])
+
+        self.assertEqual(2, self.handler.call_count)
@@ -0,0 +1,83 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import completion
+from mediapills.console import option
+from mediapills.console import parameter
+from mediapills.console.arguments import InputCommand
+
+
+class TestCompletion(unittest.TestCase):
+    def setUp(self) -> None:
+        self.arguments = [
+            option("-h", "--help", description="show help."),
+            parameter("--region", completer="tests:regions"),
+            InputCommand(
+                "deploy", arguments=[option("-f", "--force", description="force.")]
+            ),
+        ]
+
+    def test_bash_should_list_scope_words(self) -> None:
+        script = completion.generate(self.arguments, shell="bash", prog="app")
+
+        self.assertIn('compgen -W "-h --help --region deploy"', script)
+        self.assertIn('compgen -W "-f --force"', script)
+        self.assertIn("_app_values tests:regions", script)
+        self.assertTrue(script.endswith("complete -F _app app\n"))
+
+    def test_fish_should_condition_command_options(self) -> None:
+        script = completion.generate(self.arguments, shell="fish", prog="app")
+
+        self.assertIn(
+            "complete -c app -n '__fish_seen_subcommand_from deploy' -s f -l force",
+            script,
+        )
+        self.assertIn("-l region -r -a '(__app_values tests:regions)'", script)
+
+    def test_zsh_should_register_function(self) -> None:
+        script = completion.generate(self.arguments, shell="zsh", prog="app")
+
+        self.assertIn("compdef _app app", script)
+
+    def test_unsupported_shell_should_raise_error(self) -> None:
+        with self.assertRaises(expected_exception=ValueError):
+            completion.generate(self.arguments, shell="tcsh")
+
+    def test_invalid_provider_should_raise_error(self) -> None:
+        with self.assertRaises(expected_exception=ValueError):
+            completion.provider("tests.regions")
+
+    def test_values_should_be_cached(self) -> None:
+        func = Mock(return_value=["eu", "us"])
+
+        with tempfile.TemporaryDirectory() as tmp, patch.dict(
+            os.environ, {"XDG_CACHE_HOME": tmp}
+        ), patch.object(completion, "provider", Mock(return_value=func)):
+            self.assertListEqual(["eu", "us"], completion.cached_values("m:f"))
+            self.assertListEqual(["eu", "us"], completion.cached_values("m:f"))
+            self.assertListEqual(["eu", "us"], completion.cached_values("m:f", ttl=0))
+
+        self.assertEqual(func.call_count, 2)
@@ -0,0 +1,107 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import asyncio
+import time
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.abc.outputs import TIMEOUT
+from mediapills.console.deadlines import CancelToken
+from mediapills.console.deadlines import Watchdog
+from mediapills.console.features import TimeoutFeature
+
+
+class TestDeadlines(unittest.TestCase):
+    def test_watchdog_should_cancel_then_expire(self) -> None:
+        token, expire = CancelToken(), Mock()
+
+        with Watchdog(0.01, token, expire=expire, grace=0.01):
+            self.assertTrue(token.wait(5))
+            time.sleep(0.1)
+
+        expire.assert_called_once()
+
+    def test_watchdog_should_stop_when_left_in_time(self) -> None:
+        token, expire = CancelToken(), Mock()
+
+        with Watchdog(0.05, token, expire=expire):
+            pass
+        time.sleep(0.1)
+
+        self.assertFalse(token.cancelled)
+        expire.assert_not_called()
+
+
+class TestApplicationTimeout(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_err = Mock()
+        self.app = Application(
+            stdout=Mock(), stderr=self.mock_err, features=[TimeoutFeature()]
+        )
+
+        @self.app.command("poll", timeout=0.01)
+        def poll(stdin, stdout, cancel) -> int:  # type: ignore
+            while not cancel.wait(0.01):
+                pass
+            return SUCCESS
+
+        @self.app.command("check", timeout=0.01)
+        def check(stdin, stdout, cancel) -> int:  # type: ignore
+            while not cancel.wait(0.01):
+                pass
+            cancel.raise_if_cancelled()
+            return SUCCESS
+
+        @self.app.command("wait")
+        async def wait(stdin, stdout) -> None:  # type: ignore
+            await asyncio.sleep(5)
+
+        @self.app.command("quick")
+        def quick(stdin, stdout, cancel) -> int:  # type: ignore
+            return SUCCESS if cancel.remaining > 1 else FAILURE
+
+    def test_cancelled_handler_should_time_out(self) -> None:
+        self.assertEqual(TIMEOUT, self.app.run(["check"]))
+        self.assertEqual(TIMEOUT, self.app.run(["--timeout", "0.02", "wait"]))
+
+        msg = self.mock_err.write.call_args[0][0]
+        self.assertRegex(msg, "timed out after 0.02 seconds.*parse=")
+
+    def test_handler_returning_when_cancelled_should_time_out(self) -> None:
+        self.assertEqual(TIMEOUT, self.app.run(["--timeout", "0.2", "poll"]))
+
+        msg = self.mock_err.write.call_args[0][0]
+        self.assertRegex(msg, "timed out after 0.2 seconds.*import:poll=")
+
+    def test_timeout_option_should_override_default(self) -> None:
+        self.assertEqual(SUCCESS, self.app.run(["--timeout", "10", "quick"]))
+        self.assertEqual(FAILURE, self.app.run(["--timeout", "nope", "quick"]))
+
+    @patch("os._exit")
+    def test_expire_should_flush_and_exit(self, mock_exit: Mock) -> None:
+        self.app.expire(1)
+
+        self.app.stdout.flush.assert_called_once()  # type: ignore
+        mock_exit.assert_called_once_with(TIMEOUT)
@@ -0,0 +1,74 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console.executors import chunks
+from mediapills.console.executors import EXECUTOR_PROCESS
+from mediapills.console.executors import EXECUTOR_THREAD
+from mediapills.console.executors import fan_out
+from mediapills.console.features import JobsFeature
+
+
+class TestFanOut(unittest.TestCase):
+    def test_chunks_should_split_items(self) -> None:
+        self.assertListEqual([[1, 2], [3]], [*chunks([1, 2, 3], 2)])
+
+    def test_single_job_should_run_serially(self) -> None:
+        self.assertListEqual([1, 2], [*fan_out(abs, [-1, -2], jobs=1)])
+
+    def test_threads_should_keep_order(self) -> None:
+        results = fan_out(
+            abs, range(-100, 0), jobs=4, executor=EXECUTOR_THREAD, chunksize=7
+        )
+
+        self.assertListEqual([*range(100, 0, -1)], [*results])
+
+    def test_unordered_should_yield_every_result(self) -> None:
+        results = fan_out(
+            abs, range(-50, 0), jobs=4, ordered=False, executor=EXECUTOR_THREAD
+        )
+
+        self.assertSetEqual({*range(1, 51)}, {*results})
+
+    def test_processes_should_keep_order(self) -> None:
+        results = fan_out(abs, [-3, -2, -1], jobs=2, executor=EXECUTOR_PROCESS)
+
+        self.assertListEqual([3, 2, 1], [*results])
+
+    def test_invalid_executor_should_raise_error(self) -> None:
+        with self.assertRaises(expected_exception=ValueError):
+            [*fan_out(abs, [1], jobs=2, executor="cluster")]
+
+    def test_application_should_write_results(self) -> None:
+        mock_out = Mock()
+        app = Application(stdout=mock_out, stderr=Mock(), features=[JobsFeature()])
+        app.jobs = 2
+
+        app.fan_out(
+            lambda item: None if item == 2 else [str(item)] * item,
+            [1, 2, 3],
+            executor=EXECUTOR_THREAD,
+        )
+
+        writes = [call.args[0] for call in mock_out.write.call_args_list]
+        self.assertListEqual(["1", "3", "3", "3"], writes)
@@ -0,0 +1,99 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import typing as t
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console import option
+from mediapills.console.abc.features import BaseFeature
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.arguments import TInputOptions
+from mediapills.console.features import JobsFeature
+from mediapills.console.features import TracingFeature
+from mediapills.console.testing import CliRunner
+
+
+class DryRunFeature(BaseFeature):
+    def __init__(self) -> None:
+        self.calls: t.List[str] = []
+
+    @property
+    def options(self) -> TInputOptions:
+        return [option("--dry-run", description="show what would be done.")]
+
+    def start(self, app: Application) -> None:
+        self.calls.append("start")
+
+    def dispatch(self, app: Application, stdin: BaseInput) -> t.Optional[int]:
+        if not stdin.has_arg("dry_run"):
+            return None
+
+        app.stdout.write("dry run")
+        return SUCCESS
+
+    def finish(self, app: Application) -> None:
+        self.calls.append("finish")
+
+
+class TestFeatures(unittest.TestCase):
+    def setUp(self) -> None:
+        self.dry_run = DryRunFeature()
+        self.app = Application(
+            stdout=Mock(), stderr=Mock(), features=[JobsFeature(), self.dry_run]
+        )
+
+        @self.app.command("build")
+        def build(stdin: BaseInput, stdout: BaseOutput) -> int:
+            stdout.write("built")
+            return SUCCESS
+
+        self.runner = CliRunner(self.app)
+
+    def test_feature_should_add_arguments_and_run_mode(self) -> None:
+        result = self.runner.invoke(["--dry-run", "build"])
+
+        self.assertEqual(SUCCESS, result.exit_code)
+        self.assertEqual("dry run\n", result.stdout)
+        self.assertEqual(["start", "finish"], self.dry_run.calls)
+
+    def test_invalid_setting_should_stop_before_mode(self) -> None:
+        result = self.runner.invoke(["--jobs", "many", "--dry-run", "build"])
+
+        self.assertEqual(FAILURE, result.exit_code)
+        self.assertEqual("", result.stdout)
+        self.assertIn("invalid number of jobs: many", result.stderr)
+        self.assertEqual(["start", "finish"], self.dry_run.calls)
+
+    def test_feature_should_be_found_by_class(self) -> None:
+        self.assertIs(self.dry_run, self.app.feature(DryRunFeature))
+        self.assertIsInstance(self.app.feature(BaseFeature), JobsFeature)
+        self.assertIsNone(self.app.feature(TracingFeature))
+
+    def test_disabled_feature_should_add_no_arguments(self) -> None:
+        names = [arg.options[0] for arg in [*self.app.options, *self.app.parameters]]
+
+        self.assertIn("--dry-run", names)
+        self.assertIn("-j", names)
+        self.assertNotIn("--batch", names)
@@ -0,0 +1,111 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console import indexes
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.caches import file_digest
+from mediapills.console.indexes import HashIndex
+
+
+class TestHashIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "tree")
+        os.makedirs(os.path.join(self.root, "sub"))
+        self.files = [
+            os.path.join(self.root, name)
+            for name in ("a.txt", os.path.join("sub", "b"))
+        ]
+        for path in self.files:
+            self.write(path, path)
+        self.index = HashIndex(os.path.join(self.tmp.name, "index.sqlite3"), jobs=2)
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def write(path: str, content: str) -> None:
+        with open(path, "w") as fh:
+            fh.write(content)
+
+    def test_changed_should_report_new_modified_and_removed(self) -> None:
+        self.assertListEqual(self.files, self.index.changed([self.root]))
+        self.assertListEqual([], self.index.changed([self.root]))
+
+        self.write(self.files[0], "modified")
+        self.assertListEqual([self.files[0]], self.index.changed([self.root]))
+
+        os.remove(self.files[1])
+        self.assertListEqual([self.files[1]], self.index.changed(self.files))
+        self.assertListEqual([], self.index.changed(self.files))
+
+    def test_unchanged_stat_should_not_rehash(self) -> None:
+        self.index.changed(self.files)
+
+        with patch.object(indexes, "file_digest", Mock()) as digest:
+            self.assertEqual(
+                file_digest(self.files[0]), self.index.digest(self.files[0])
+            )
+            digest.assert_not_called()
+
+            os.utime(self.files[0], ns=(1, 1))
+            digest.return_value = "rehashed"
+            self.assertEqual("rehashed", self.index.digest(self.files[0]))
+            digest.assert_called_once()
+
+    def test_scopes_should_be_independent(self) -> None:
+        self.index.changed(self.files, scope="lint")
+
+        self.assertListEqual(self.files, self.index.changed(self.files, scope="report"))
+        self.assertListEqual([], self.index.changed(self.files, scope="lint"))
+
+    def test_many_files_should_be_hashed_in_parallel(self) -> None:
+        paths = []
+        for i in range(indexes.HASH_CHUNK_FILES * 3):
+            paths.append(os.path.join(self.root, "file{}".format(i)))
+            self.write(paths[-1], str(i))
+
+        digests = self.index.digests(paths)
+
+        self.assertDictEqual({path: file_digest(path) for path in paths}, digests)
+
+
+class TestApplicationContext(unittest.TestCase):
+    def test_handler_taking_app_should_receive_it(self) -> None:
+        mock_out = Mock()
+        app = Application(stdout=mock_out, stderr=Mock())
+        app.hash_index = Mock()
+
+        @app.command("changed")
+        def changed(stdin, stdout, app):  # type: ignore
+            return app.hash_index.changed(["."])
+
+        app.hash_index.changed.return_value = ["a.txt"]
+
+        self.assertEqual(SUCCESS, app.run(["changed"]))
+        mock_out.write.assert_called_once_with("a.txt")
@@ -0,0 +1,196 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import logging
+import threading
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console.abc.outputs import BROKEN_PIPE
+from mediapills.console.abc.outputs import VERBOSITY_DEBUG
+from mediapills.console.abc.outputs import VERBOSITY_NORMAL
+from mediapills.console.abc.outputs import VERBOSITY_QUIET
+from mediapills.console.abc.outputs import VERBOSITY_VERBOSE
+from mediapills.console.features import LoggingFeature
+from mediapills.console.logs import LEVEL_TRACE
+from mediapills.console.logs import LogBridge
+from mediapills.console.logs import verbosity_level
+from mediapills.console.outputs import ConsoleOutput
+
+
+class TestLogs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.output = Mock()
+        self.logger = logging.getLogger("test.logs")
+        self.logger.propagate = False
+        self.bridge = LogBridge(self.output, logger=self.logger, fmt="%(message)s")
+
+    def tearDown(self) -> None:
+        self.bridge.uninstall()
+
+    def test_verbosity_should_map_to_level(self) -> None:
+        self.assertEqual(logging.WARNING, verbosity_level(VERBOSITY_NORMAL))
+        self.assertEqual(
+            logging.INFO, verbosity_level(VERBOSITY_NORMAL | VERBOSITY_VERBOSE)
+        )
+        self.assertEqual(LEVEL_TRACE, verbosity_level(VERBOSITY_DEBUG))
+        self.assertEqual(
+            logging.CRITICAL, verbosity_level(VERBOSITY_QUIET | VERBOSITY_DEBUG)
+        )
+
+    def test_records_should_be_written_in_batches(self) -> None:
+        self.bridge.install(VERBOSITY_NORMAL)
+        threads = [
+            threading.Thread(target=self.logger.warning, args=("thread %d", i))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.bridge.flush()
+
+        lines = "\n".join(c.args[0] for c in self.output.write.call_args_list)
+        self.assertListEqual(
+            ["thread {}".format(i) for i in range(4)], sorted(lines.split("\n"))
+        )
+
+    def test_disabled_level_should_not_create_records(self) -> None:
+        self.bridge.install(VERBOSITY_NORMAL)
+
+        with patch.object(self.logger, "makeRecord") as make_record:
+            self.logger.info("hidden")
+
+        make_record.assert_not_called()
+
+    def test_trace_level_should_have_name(self) -> None:
+        self.assertEqual("TRACE", logging.getLevelName(LEVEL_TRACE))
+
+    def test_uninstall_should_restore_level(self) -> None:
+        self.logger.setLevel(logging.ERROR)
+        self.bridge.install(VERBOSITY_DEBUG)
+        self.assertEqual(LEVEL_TRACE, self.logger.level)
+
+        self.bridge.uninstall()
+
+        self.assertEqual(logging.ERROR, self.logger.level)
+
+    def test_closed_pipe_should_break_bridge(self) -> None:
+        self.output.write.side_effect = BrokenPipeError()
+        self.bridge.install(VERBOSITY_NORMAL)
+
+        for _ in range(2):  # Records are dropped, barriers still released
+            self.logger.warning("lost")
+            with self.assertRaises(BrokenPipeError):
+                self.bridge.flush()
+
+        self.assertTrue(self.bridge.broken)
+        self.assertEqual(1, self.output.write.call_count)
+
+    def test_output_error_should_not_block_flush(self) -> None:
+        self.output.write.side_effect = OSError(5, "EIO")
+        self.bridge.install(VERBOSITY_NORMAL)
+        self.logger.warning("lost")
+
+        self.bridge.flush()
+
+        self.assertIsInstance(self.bridge.error, OSError)
+
+    def test_dead_listener_should_not_block_flush(self) -> None:
+        self.bridge.install(VERBOSITY_NORMAL)
+        listener = self.bridge._listener
+        self.bridge._listener = dead = threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+
+        self.bridge.flush()
+
+        self.bridge._listener = listener
+
+
+class TestApplicationLogging(unittest.TestCase):
+    def test_verbose_option_should_enable_info_records(self) -> None:
+        mock_err = Mock()
+        app = Application(
+            stdout=ConsoleOutput(), stderr=mock_err, features=[LoggingFeature()]
+        )
+
+        @app.entrypoint  # type: ignore
+        def main(stdin, stdout) -> None:  # type: ignore
+            logging.getLogger("test.app").info("progress")
+
+        try:
+            app.run([])
+            mock_err.write.assert_not_called()
+
+            app.run(["-v"])
+            mock_err.write.assert_called_once_with("INFO test.app: progress")
+        finally:
+            app.log_bridge.uninstall()
+
+        self.assertEqual(logging.WARNING, logging.getLogger().level)
+
+    def test_run_should_leave_logging_as_it_was(self) -> None:
+        root = logging.getLogger()
+        level, handlers = root.level, [*root.handlers]
+        errors = [Mock(), Mock()]
+        root.setLevel(logging.DEBUG)
+
+        try:
+            for mock_err in errors:
+                app = Application(
+                    stdout=ConsoleOutput(), stderr=mock_err, features=[LoggingFeature()]
+                )
+
+                @app.entrypoint  # type: ignore
+                def main(stdin, stdout) -> None:  # type: ignore
+                    logging.getLogger("test.app").warning("once")
+
+                app.run([])
+
+                self.assertEqual(logging.DEBUG, root.level)
+                self.assertEqual(handlers, root.handlers)
+        finally:
+            root.setLevel(level)
+
+        for mock_err in errors:
+            mock_err.write.assert_called_once_with("WARNING test.app: once")
+
+    def test_closed_stderr_pipe_should_exit_with_broken_pipe(self) -> None:
+        stream = io.StringIO()
+        stream.write = Mock(side_effect=BrokenPipeError())  # type: ignore
+        app = Application(
+            stdout=ConsoleOutput(stream=io.StringIO()),
+            stderr=ConsoleOutput(stream=stream),
+            features=[LoggingFeature()],
+        )
+
+        @app.entrypoint  # type: ignore
+        def main(stdin, stdout) -> None:  # type: ignore
+            for _ in range(1000):
+                logging.getLogger("test.app").warning("noise")
+
+        try:
+            self.assertEqual(BROKEN_PIPE, app.run([]))
+        finally:
+            app.log_bridge.uninstall()
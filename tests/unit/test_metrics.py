@@ -0,0 +1,164 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.features import MetricsFeature
+from mediapills.console.metrics import CONTENT_TYPE
+from mediapills.console.metrics import Metrics
+from mediapills.console.metrics import parse
+from mediapills.console.outputs import CountingOutput
+from mediapills.console.testing import CliRunner
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.metrics = Metrics(prog="app", buckets=(0.1, 1.0))
+
+    def test_record_should_fill_histogram_and_counters(self) -> None:
+        self.metrics.record("build", code=0, seconds=0.5, parse=0.01, written=12)
+        text = self.metrics.render()
+
+        self.assertIn("# TYPE console_command_duration_seconds histogram\n", text)
+        self.assertIn(
+            "console_command_duration_seconds_bucket"
+            '{command="build",prog="app",le="1.0"} 1\n',
+            text,
+        )
+        self.assertNotIn('le="0.1"', text)
+        self.assertIn(
+            'console_command_exit_total{command="build",prog="app",code="0"} 1\n', text
+        )
+        self.assertIn(
+            'console_output_bytes_total{command="build",prog="app"} 12\n', text
+        )
+        self.assertIn(
+            'console_parse_seconds_total{command="build",prog="app"} 0.01\n', text
+        )
+
+    def test_empty_metrics_should_render_nothing(self) -> None:
+        self.assertEqual("", self.metrics.render())
+
+    def test_parse_should_read_rendered_samples(self) -> None:
+        self.metrics.record('say "hi"', code=2, seconds=3.0, parse=0.0, written=0)
+
+        self.assertEqual(self.metrics.samples(), parse(self.metrics.render()))
+
+    def test_parse_should_skip_foreign_metrics(self) -> None:
+        text = 'other_total{a="b"} 1\nconsole_x_total 2\n# HELP console_x_total x\n'
+
+        self.assertEqual({("console_x_total", ()): 2.0}, parse(text, "console_"))
+
+    def test_textfile_should_accumulate_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(2):  # Two processes
+                metrics = Metrics(prog="app")
+                metrics.record("build", code=0, seconds=0.2, parse=0.0, written=5)
+                path = metrics.write_textfile(directory)
+
+            metrics.write_textfile(directory)  # Nothing new recorded
+            with open(path) as fh:
+                samples = parse(fh.read())
+
+            self.assertEqual(
+                ["app.prom", "app.prom.lock"], sorted(os.listdir(directory))
+            )
+
+        labels = (("command", "build"), ("prog", "app"))
+        self.assertEqual(10, samples[("console_output_bytes_total", labels)])
+        self.assertEqual(2, samples[("console_command_duration_seconds_count", labels)])
+
+    def test_serve_should_expose_metrics(self) -> None:
+        self.metrics.record("build", code=1, seconds=0.2, parse=0.0, written=0)
+        server = self.metrics.serve(0)
+
+        try:
+            url = "http://127.0.0.1:{port}/metrics".format(port=server.server_port)
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertEqual(CONTENT_TYPE, response.headers["Content-Type"])
+                self.assertIn(b'code="1"', response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestApplicationMetrics(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = Application(
+            stdout=Mock(), stderr=Mock(), features=[MetricsFeature()], name="app"
+        )
+
+        @self.app.command("hello")
+        def hello(stdin: BaseInput, stdout: BaseOutput) -> int:
+            stdout.write("héllo")
+            return 3
+
+    def test_run_should_write_textfile(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            result = CliRunner(self.app).invoke(["--metrics-dir", directory, "hello"])
+
+            self.assertEqual(3, result.exit_code)
+            self.assertEqual(
+                self.app.metrics.samples(), parse(self.read(directory, self.app))
+            )
+
+        labels = (("command", "hello"), ("prog", "app"))
+        samples = self.app.metrics.samples()
+        self.assertEqual(7, samples[("console_output_bytes_total", labels)])
+        self.assertEqual(
+            1, samples[("console_command_exit_total", (*labels, ("code", "3")))]
+        )
+
+    def test_disabled_metrics_should_not_record(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock())
+        app.run([])
+
+        self.assertIsNone(app._metrics_registry)
+
+    def test_invalid_port_should_fail(self) -> None:
+        result = CliRunner(self.app).invoke(["--metrics-port", "http"])
+
+        self.assertEqual(1, result.exit_code)
+        self.assertIn("invalid metrics port: http", result.stderr)
+
+    @staticmethod
+    def read(directory: str, app: Application) -> str:
+        path = os.path.join(directory, app.prog + ".prom")
+        with open(path, encoding="utf-8") as fh:
+            return fh.read()
+
+
+class TestCountingOutput(unittest.TestCase):
+    def test_write_should_count_encoded_bytes(self) -> None:
+        mock_out = Mock()
+        output = CountingOutput(mock_out)
+
+        output.write("é")
+        output.writeln("ab")
+
+        self.assertEqual(3 + 5, output.written)
+        self.assertEqual(2, mock_out.write.call_count)
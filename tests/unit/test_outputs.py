@@ -18,7 +18,19 @@
 # LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import threading
 import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console.outputs import ConsoleOutput
+from mediapills.console.outputs import TeeOutput
+from mediapills.console.outputs import ThreadedConsoleOutput
+from mediapills.console.sinks import RingBufferSink
+from mediapills.console.sinks import Sink
+from mediapills.console.sinks import StreamSink
+from mediapills.console.sinks import ThreadedSink
 
 
 class TestConsoleOutput(unittest.TestCase):
@@ -26,3 +38,141 @@ def test_import_should_not_fail(self) -> None:
         __import__("mediapills.console.outputs")
 
         self.assertTrue(True)
+
+    def test_write_should_use_stream(self) -> None:
+        stream = io.StringIO()
+
+        ConsoleOutput(stream=stream).write("message")
+
+        self.assertEqual("message\n", stream.getvalue())
+
+
+class BrokenStream(io.StringIO):
+    def write(self, text: str) -> int:
+        raise BrokenPipeError()
+
+
+class TestBrokenPipe(unittest.TestCase):
+    def test_closed_pipe_should_fail_every_write(self) -> None:
+        stream = BrokenStream()
+        output = ConsoleOutput(stream=stream)
+
+        with self.assertRaises(BrokenPipeError):
+            output.write("first")
+
+        stream.write = Mock()  # type: ignore
+        with self.assertRaises(BrokenPipeError):
+            output.write("second")
+
+        self.assertTrue(output.broken)
+        stream.write.assert_not_called()
+
+    def test_threaded_output_should_report_closed_pipe(self) -> None:
+        output = ThreadedConsoleOutput(stream=BrokenStream())
+        output.write("first")
+
+        with self.assertRaises(BrokenPipeError):
+            output.flush()  # Writer thread must not die with waiters blocked
+        with self.assertRaises(BrokenPipeError):
+            output.write("second")
+
+        output._flush_at_exit()
+
+    def test_threaded_output_should_raise_stream_error_on_flush(self) -> None:
+        stream = io.StringIO()
+        stream.write = Mock(side_effect=OSError(5, "EIO"))  # type: ignore
+        output = ThreadedConsoleOutput(stream=stream)
+        output.write("lost")
+
+        with self.assertRaises(OSError):
+            output.flush()
+
+        stream.write = Mock()  # type: ignore
+        output.write("second")
+        output.flush()
+        stream.write.assert_called_once_with("second\n")
+
+
+class TestTeeOutputErrors(unittest.TestCase):
+    def test_threaded_sink_error_should_not_block_flush(self) -> None:
+        sink = Mock(spec=Sink)
+        sink.write.side_effect = OSError(28, "No space left on device")
+        output = TeeOutput([ThreadedSink(sink)])
+        output.write("lost")
+
+        with self.assertRaises(OSError):
+            output.flush()
+
+
+class TestThreadedConsoleOutput(unittest.TestCase):
+    def test_flush_should_write_every_line_whole(self) -> None:
+        stream = io.StringIO()
+        output = ThreadedConsoleOutput(stream=stream, batch_size=16)
+
+        def worker(name: str) -> None:
+            for i in range(500):
+                output.write("{name}-{i}".format(name=name, i=i))
+
+        threads = [threading.Thread(target=worker, args=(str(n),)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        output.flush()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(8 * 500, len(lines))
+        for n in range(8):
+            own = [line for line in lines if line.startswith("{n}-".format(n=n))]
+            self.assertListEqual(["{n}-{i}".format(n=n, i=i) for i in range(500)], own)
+
+    def test_collected_lines_should_follow_queued_batch(self) -> None:
+        stream = io.StringIO()
+        output = ThreadedConsoleOutput(stream=stream, batch_size=2)
+
+        with patch.object(ThreadedConsoleOutput, "_drain"):  # No writer thread
+            for msg in ("first", "second", "third"):  # A full batch, then a newer line
+                output.write(msg)
+        output._collect()
+        output._queue.put(None)
+        output._drain()
+
+        self.assertEqual("first\nsecond\nthird\n", stream.getvalue())
+
+    @patch("mediapills.console.outputs.atexit")
+    def test_close_should_stop_writer(self, mock_atexit: Mock) -> None:
+        stream = io.StringIO()
+
+        with ThreadedConsoleOutput(stream=stream) as output:
+            output.write("first")
+            writer = output._writer
+
+        self.assertFalse(writer.is_alive())  # type: ignore
+        mock_atexit.unregister.assert_called_once_with(output._flush_at_exit)
+
+        output.write("second")
+        output.close()
+        self.assertEqual("first\nsecond\n", stream.getvalue())
+
+    def test_flush_should_render_as_console_output(self) -> None:
+        stream = io.StringIO()
+        output = ThreadedConsoleOutput(stream=stream)
+
+        output.writeln("message")
+        output.flush()
+
+        self.assertEqual("message\n\n\n", stream.getvalue())
+
+
+class TestTeeOutput(unittest.TestCase):
+    def test_message_should_be_encoded_once_for_every_sink(self) -> None:
+        stream, ring, sink = io.StringIO(), RingBufferSink(), Mock()
+        output = TeeOutput([StreamSink(stream), ring, sink])
+
+        output.write("message")
+        output.writeln("é")
+        output.flush()
+
+        self.assertEqual("message\né\n\n\n", stream.getvalue())
+        self.assertEqual("message\né\n\n\n".encode(), ring.getvalue())
+        sink.flush.assert_called_once()
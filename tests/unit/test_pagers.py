@@ -0,0 +1,129 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console.outputs import ConsoleOutput
+from mediapills.console.outputs import CountingOutput
+from mediapills.console.outputs import RecordingOutput
+from mediapills.console.outputs import ThreadedConsoleOutput
+from mediapills.console.pagers import LazyPager
+from mediapills.console.pagers import rows
+
+
+class Terminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+class TestPagers(unittest.TestCase):
+    def test_rows_should_count_wrapped_lines(self) -> None:
+        self.assertEqual(5, rows("a\n" + "b" * 25 + "\n\n", width=10))
+
+    @patch("subprocess.Popen")
+    def test_short_output_should_not_spawn_pager(self, popen: Mock) -> None:
+        stream = Terminal()
+        pager = LazyPager(stream, height=3, width=80, command="less")
+
+        pager.write("first\n")
+        pager.write("second\n")
+        pager.close()
+
+        popen.assert_not_called()
+        self.assertEqual("first\nsecond\n", stream.getvalue())
+
+    @patch("subprocess.Popen")
+    def test_overflow_should_stream_into_pager(self, popen: Mock) -> None:
+        pager = LazyPager(Terminal(), height=3, width=80, command="less -S")
+
+        for i in range(5):
+            pager.write("{}\n".format(i))
+        pager.close()
+
+        self.assertEqual(["less", "-S"], popen.call_args[0][0])
+        written = [c.args[0] for c in popen.return_value.stdin.write.call_args_list]
+        self.assertEqual("0\n1\n2\n3\n4\n", "".join(written))
+        popen.return_value.wait.assert_called_once()
+
+    @patch("subprocess.Popen", Mock(side_effect=FileNotFoundError))
+    def test_missing_pager_should_write_to_stream(self) -> None:
+        stream = Terminal()
+        pager = LazyPager(stream, height=1, width=80, command="missing")
+
+        pager.write("first\n")
+        pager.write("second\n")
+        pager.close()
+
+        self.assertEqual("first\nsecond\n", stream.getvalue())
+
+
+class TestOutputPaging(unittest.TestCase):
+    @patch("mediapills.console.outputs.LazyPager")
+    def test_paging_should_need_terminal(self, pager: Mock) -> None:
+        stream = io.StringIO()
+        output = ConsoleOutput(stream=stream)
+
+        with output.paged():
+            output.write("message")
+
+        pager.assert_not_called()
+        self.assertEqual("message\n", stream.getvalue())
+
+    @patch("mediapills.console.outputs.LazyPager")
+    def test_threaded_output_should_be_paged_in_order(self, pager: Mock) -> None:
+        stream = Terminal()
+        output = ThreadedConsoleOutput(stream=stream)
+
+        output.write("before")
+        with output.paged():
+            self.assertEqual("before\n", stream.getvalue())
+            output.write("paged")
+
+        pager.return_value.write.assert_called_once_with("paged\n")
+        pager.return_value.close.assert_called_once()
+
+    @patch("mediapills.console.outputs.LazyPager")
+    def test_wrapped_output_should_be_paged(self, pager: Mock) -> None:
+        recorder = RecordingOutput(CountingOutput(ConsoleOutput(stream=Terminal())))
+
+        with recorder.paged():
+            recorder.write("paged")
+
+        pager.return_value.write.assert_called_once_with("paged\n")
+        self.assertEqual([("paged", False, 0)], recorder.messages)
+
+    def test_wrapped_output_should_forward_flush(self) -> None:
+        output = Mock()
+        CountingOutput(output).flush()
+
+        output.flush.assert_called_once()
+
+    @patch("mediapills.console.outputs.LazyPager")
+    def test_help_should_be_paged(self, pager: Mock) -> None:
+        app = Application(stdout=ConsoleOutput(stream=Terminal()), stderr=Mock())
+
+        app.show_help()
+
+        pager.return_value.write.assert_called_once()
+        pager.return_value.close.assert_called_once()
@@ -21,6 +21,9 @@
 import unittest
 from unittest.mock import Mock
 
+from mediapills.console import arguments
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import InputParameter
 from mediapills.console.parsers import InputArgumentsParser
 
 
@@ -53,3 +56,107 @@ def test_parse_option_should_be_valid(self) -> None:
         args, undef = parser.parse(["-m", "undef"])
         self.assertListEqual(["m"], [*args.keys()])
         self.assertListEqual(["undef"], undef)
+
+    def test_parse_parameter_should_have_value(self) -> None:
+        parser = InputArgumentsParser(
+            [
+                InputParameter("--param"),
+                InputParameter("--dir", mode=arguments.VALUE_IS_ARRAY),
+            ]
+        )
+
+        args, undef = parser.parse(["--param", "value", "--dir", "a", "--dir", "b"])
+        self.assertDictEqual({"param": "value", "dir": ["a", "b"]}, args)
+        self.assertListEqual([], undef)
+
+    def test_command_arguments_should_be_added_when_selected(self) -> None:
+        first = Mock(return_value=[InputParameter("--first")])
+        second = Mock(return_value=[InputParameter("--second")])
+        parser = InputArgumentsParser(
+            [
+                InputCommand("first", "1st", arguments=first),
+                InputCommand("second", arguments=second),
+            ]
+        )
+
+        args, undef = parser.parse(["1st", "--first", "value"])
+        self.assertDictEqual({"command": "1st", "first": "value"}, args)
+        self.assertListEqual([], undef)
+        first.assert_called_once()
+        second.assert_not_called()
+
+    def test_scan_should_match_parse_without_building_parser(self) -> None:
+        parser = InputArgumentsParser(
+            [
+                InputParameter("--param", default="value"),
+                arguments.InputOption("-v"),
+                arguments.InputOption("-q", "--quiet"),
+                InputCommand("first", arguments=[InputParameter("--first")]),
+            ]
+        )
+
+        for argv in ([], ["-vv", "--quiet"], ["-qv", "-v"]):
+            args = parser.scan(argv)
+            self.assertIsNone(parser._parser)
+            self.assertDictEqual(parser.parse(argv)[0], args)  # type: ignore
+            parser._parser = None
+
+    def test_scan_should_fall_back_to_parse(self) -> None:
+        parser = InputArgumentsParser(
+            [InputParameter("--param"), arguments.InputOption("-v")]
+        )
+
+        for argv in (["--param", "value"], ["-x"], ["-vx"], ["--"], ["first"]):
+            self.assertIsNone(parser.scan(argv))
+        self.assertIsNone(InputArgumentsParser([InputParameter("name")]).scan([]))
+
+    def test_eager_argument_should_skip_required_check(self) -> None:
+        parser = InputArgumentsParser(
+            [
+                InputParameter("--name", mode=arguments.VALUE_REQUIRED),
+                InputParameter("path", mode=arguments.VALUE_REQUIRED),
+                InputParameter("--completion"),
+                arguments.InputOption("-h", "--help"),
+            ],
+            eager=["help", "completion"],
+        )
+
+        self.assertDictEqual({"help": 1, "completion": None}, parser.parse(["-h"])[0])
+        self.assertDictEqual(
+            {"completion": "bash"}, parser.parse(["x", "--completion", "bash"])[0]
+        )
+        self.assertIsNone(parser.parse_eager(["--name", "value", "x"]))
+        with self.assertRaises(SystemExit):
+            parser.parse([])
+
+    def test_eager_argument_should_be_global_only(self) -> None:
+        parser = InputArgumentsParser(
+            [
+                arguments.InputOption("-V", "--version"),
+                InputCommand("grep", arguments=[arguments.InputOption("-V", "--invert")]),
+            ],
+            eager=["version"],
+        )
+
+        self.assertIsNone(parser.parse_eager(["grep", "-V"]))
+        self.assertDictEqual(
+            {"command": "grep", "invert": 1}, parser.parse(["grep", "-V"])[0]
+        )
+        self.assertDictEqual({"version": 1}, parser.parse(["-V", "grep"])[0])
+
+    def test_scan_should_resolve_eager_options_with_required_parameters(self) -> None:
+        parser = InputArgumentsParser(
+            [
+                InputParameter("--name", mode=arguments.VALUE_REQUIRED),
+                InputParameter("path"),
+                arguments.InputOption("-v"),
+                arguments.InputOption("-V", "--version"),
+            ],
+            eager=["version"],
+        )
+
+        self.assertEqual({"name": None, "version": 1}, parser.scan(["-V"]))
+        self.assertEqual({"name": None, "version": 1, "v": 2}, parser.scan(["-vV", "-v"]))
+        self.assertIsNone(parser._parser)
+        for argv in ([], ["-v"], ["-V", "x"]):
+            self.assertIsNone(parser.scan(argv))
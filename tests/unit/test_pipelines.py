@@ -0,0 +1,106 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import functools
+import typing as t
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console import parameter
+from mediapills.console import pipelines
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.exceptions import ConsoleException
+from mediapills.console.features import PipeFeature
+
+
+def source(stdin: BaseInput, stdout: BaseOutput) -> t.Iterator[int]:
+    yield from range(5)
+
+
+def double(stdin: BaseInput, stdout: BaseOutput, records: t.Any) -> t.Iterator[int]:
+    for record in records:
+        yield record * 2
+
+
+def sink(stdin: BaseInput, stdout: BaseOutput, **kwargs: t.Any) -> int:
+    stdout.write(str(sum(kwargs["records"])))
+    return 3
+
+
+class TestPipelines(unittest.TestCase):
+    def test_accepts_records_should_check_signature(self) -> None:
+        self.assertFalse(pipelines.accepts_records(source))
+        self.assertTrue(pipelines.accepts_records(double))
+        self.assertTrue(pipelines.accepts_records(sink))
+        self.assertTrue(pipelines.accepts_records(functools.partial(double)))
+
+    def test_compose_should_stream_records(self) -> None:
+        for threaded in (False, True):
+            stdout = Mock()
+            stages: t.List[t.Any] = [
+                ("s", source, Mock()),
+                ("d", double, Mock()),
+                ("k", sink, Mock()),
+            ]
+
+            self.assertEqual(3, pipelines.compose(stages, stdout, threaded=threaded))
+            stdout.write.assert_called_once_with("20")
+
+    def test_compose_should_require_records(self) -> None:
+        stages: t.List[t.Any] = [("s", Mock(return_value=0), Mock())]
+        stages.append(("d", double, Mock()))
+
+        with self.assertRaises(ConsoleException):
+            pipelines.compose(stages, Mock())
+
+
+class TestApplicationPipe(unittest.TestCase):
+    def setUp(self) -> None:
+        self.mock_out = Mock()
+        self.mock_err = Mock()
+        self.app = Application(
+            stdout=self.mock_out, stderr=self.mock_err, features=[PipeFeature()]
+        )
+        self.app.command("source", arguments=[parameter("--count", default="5")])(
+            lambda stdin, stdout: range(int(str(stdin.get_arg("count"))))
+        )
+        self.app.command("double")(double)
+        self.app.command("sink")(sink)
+        self.app.command("status")(lambda stdin, stdout: SUCCESS)
+
+    def test_pipe_should_run_stages(self) -> None:
+        code = self.app.run(["pipe", "-t", "source --count 3", "double", "sink"])
+
+        self.assertEqual(3, code)
+        self.mock_out.write.assert_called_once_with("6")
+
+    def test_records_should_be_written_by_last_stage(self) -> None:
+        self.assertEqual(SUCCESS, self.app.run(["pipe", "source --count 2", "double"]))
+        self.assertListEqual(
+            ["0", "2"], [c.args[0] for c in self.mock_out.write.call_args_list]
+        )
+
+    def test_invalid_stage_should_fail(self) -> None:
+        for stage in ("status", "pipe source", "source --undef"):
+            self.assertEqual(FAILURE, self.app.run(["pipe", stage, "double"]))
@@ -0,0 +1,132 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console import arguments
+from mediapills.console import plugins
+
+
+def greet(stdin, stdout) -> None:  # type: ignore
+    stdout.write("Hello {}".format(stdin.get_arg("name")))
+
+
+plugin_command = arguments.InputCommand(
+    "greet",
+    arguments=[arguments.InputParameter("--name", default="world")],
+    description="Say hello.",
+    handler=greet,
+)
+
+
+def plugin_handler(stdin, stdout) -> int:  # type: ignore
+    return 3
+
+
+def entry_point(name: str, value: str) -> Mock:
+    ep = Mock(value=value, dist=None)
+    ep.name = name
+    ep.load.side_effect = lambda: getattr(
+        __import__(__name__, fromlist=["_"]), value.split(":")[1]
+    )
+    return ep
+
+
+ENTRY_POINTS = [
+    entry_point("greet", __name__ + ":plugin_command"),
+    entry_point("answer", __name__ + ":plugin_handler"),
+]
+
+
+class TestPlugins(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"XDG_CACHE_HOME": self.tmp.name})
+        self.env.start()
+        self.scan = patch.object(
+            plugins, "group_entry_points", return_value=ENTRY_POINTS
+        )
+        self.group_entry_points = self.scan.start()
+        for ep in ENTRY_POINTS:
+            ep.load.reset_mock()
+
+    def tearDown(self) -> None:
+        self.scan.stop()
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_discover_should_build_commands(self) -> None:
+        commands = plugins.discover()
+
+        self.assertEqual(["greet", "answer"], [c.options[0] for c in commands])
+        self.assertEqual("Say hello.", commands[0].description)
+        self.assertEqual(("--name",), commands[0].arguments[0].options)  # type: ignore
+
+    def test_registry_should_be_reused_until_packages_change(self) -> None:
+        plugins.discover()
+        plugins.discover()
+        self.assertEqual(1, self.group_entry_points.call_count)
+
+        with patch.object(plugins, "fingerprint", return_value="changed"):
+            plugins.discover()
+        self.assertEqual(2, self.group_entry_points.call_count)
+
+    def test_rescan_should_import_only_new_plugins(self) -> None:
+        plugins.discover()
+        plugin = entry_point("plugin", __name__ + ":plugin_handler")
+
+        with patch.object(plugins, "fingerprint", return_value="changed"):
+            self.group_entry_points.return_value = [*ENTRY_POINTS, plugin]
+            commands = plugins.discover()
+
+        self.assertEqual(
+            ["greet", "answer", "plugin"], [c.options[0] for c in commands]
+        )
+        self.assertEqual([1, 1], [ep.load.call_count for ep in ENTRY_POINTS])
+        self.assertEqual(1, plugin.load.call_count)
+
+    def test_discover_without_cache_should_import_nothing(self) -> None:
+        commands = plugins.discover(cache=False)
+
+        self.assertEqual(["greet", "answer"], [c.options[0] for c in commands])
+        self.assertEqual([0, 0], [ep.load.call_count for ep in ENTRY_POINTS])
+        self.assertEqual(("--name",), commands[0].arguments[0].options)  # type: ignore
+        self.assertEqual([], commands[1].arguments)  # type: ignore
+
+    def test_handler_should_be_imported_on_dispatch(self) -> None:
+        plugins.discover()
+        command = plugins.discover()[1]
+
+        self.assertIsInstance(command.handler, str)  # type: ignore
+        self.assertEqual(3, command.execute(Mock(), Mock()))  # type: ignore
+
+    def test_application_should_dispatch_plugin_command(self) -> None:
+        plugins.discover()
+        mock_out = Mock()
+        app = Application(stdout=mock_out, stderr=Mock())
+        app.load_plugins()
+
+        self.assertEqual(0, app.run(["greet", "--name", "plugin"]))
+        mock_out.write.assert_called_with("Hello plugin")
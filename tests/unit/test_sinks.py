@@ -0,0 +1,107 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from mediapills.console.sinks import RingBufferSink
+from mediapills.console.sinks import RotatingFileSink
+from mediapills.console.sinks import Sink
+from mediapills.console.sinks import StreamSink
+from mediapills.console.sinks import ThreadedSink
+
+
+class SlowSink(Sink):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.data = b""
+
+    def emit(self, data: bytes) -> None:
+        self.release.wait(5)
+        self.data += data
+
+
+class FullSink(Sink):
+    def emit(self, data: bytes) -> None:
+        raise OSError(28, "No space left on device")
+
+
+class TestSinks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "app.log")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_buffered_sink_should_emit_when_full(self) -> None:
+        stream = io.BytesIO()
+        sink = StreamSink(io.TextIOWrapper(stream), buffer_size=4)
+
+        sink.write(b"ab")
+        self.assertEqual(b"", stream.getvalue())
+        sink.write(b"cd")
+        self.assertEqual(b"abcd", stream.getvalue())
+
+    def test_file_should_be_rotated(self) -> None:
+        sink = RotatingFileSink(self.path, max_bytes=4, backups=2, buffer_size=0)
+
+        for data in (b"1111", b"2222", b"3333", b"4444"):
+            sink.write(data)
+        sink.close()
+
+        for suffix, content in (("", b"4444"), (".1", b"3333"), (".2", b"2222")):
+            with open(self.path + suffix, "rb") as fh:
+                self.assertEqual(content, fh.read())
+        self.assertFalse(os.path.exists(self.path + ".3"))
+
+    def test_ring_buffer_should_keep_last_bytes(self) -> None:
+        sink = RingBufferSink(capacity=6)
+
+        for data in (b"abc", b"def", b"ghi"):
+            sink.write(data)
+
+        self.assertEqual(b"defghi", sink.getvalue())
+
+    def test_threaded_sink_should_not_block_writer(self) -> None:
+        slow = SlowSink()
+        sink = ThreadedSink(slow)
+
+        sink.write(b"first")  # Returns while the slow sink is blocked
+        sink.write(b"second")
+        slow.release.set()
+        sink.close()
+
+        self.assertEqual(b"firstsecond", slow.data)
+
+    def test_threaded_sink_should_raise_sink_error_on_flush(self) -> None:
+        sink = ThreadedSink(FullSink())
+        sink.write(b"lost")
+
+        with self.assertRaises(OSError):
+            sink.flush()  # Must not wait for a dead thread
+
+        sink.write(b"lost")
+        with self.assertRaises(OSError):
+            sink.close()
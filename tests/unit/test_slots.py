@@ -0,0 +1,178 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import sys
+import tempfile
+import threading
+import typing as t
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import BUSY
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.exceptions import ConsoleBusyException
+from mediapills.console.features import MetricsFeature
+from mediapills.console.slots import runtime_dir
+from mediapills.console.slots import Slots
+from mediapills.console.testing import CliRunner
+
+
+class TestSlots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.slots = Slots("app.build", size=2, directory=self.tmp.name)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_slots_should_be_taken_until_released(self) -> None:
+        first, second = self.slots.try_acquire(), self.slots.try_acquire()
+
+        self.assertEqual((0, 1), (first.index, second.index))  # type: ignore
+        self.assertIsNone(self.slots.try_acquire())
+
+        second.release()  # type: ignore
+        third = self.slots.try_acquire()
+        self.assertEqual(1, third.index)  # type: ignore
+
+        first.release()  # type: ignore
+        third.release()  # type: ignore
+
+    def test_busy_policies_should_skip_or_fail(self) -> None:
+        slots = Slots("app.build", directory=self.tmp.name)
+
+        with slots.acquire("fail"):  # type: ignore
+            self.assertIsNone(slots.acquire("skip"))
+            with self.assertRaises(ConsoleBusyException):
+                slots.acquire("fail")
+
+        with self.assertRaises(ValueError):
+            slots.acquire("retry")
+
+    def test_wait_policy_should_wait_for_release(self) -> None:
+        slots = Slots("app.build", directory=self.tmp.name)
+        held = slots.acquire()
+        threading.Timer(0.05, held.release).start()  # type: ignore
+
+        with slots.acquire("wait") as slot:  # type: ignore
+            self.assertGreater(slot.waited, 0.0)
+
+    def test_wait_policy_should_give_up_after_timeout(self) -> None:
+        slots = Slots("app.build", directory=self.tmp.name)
+
+        with slots.acquire():  # type: ignore
+            with self.assertRaises(ConsoleBusyException):
+                slots.acquire("wait", timeout=0.05)
+
+    def test_name_should_be_safe_file_name(self) -> None:
+        self.assertEqual(
+            os.path.join(self.tmp.name, "a_b_c.0.lock"),
+            Slots("a/b c", directory=self.tmp.name).path(0),
+        )
+
+    def test_runtime_dir_should_follow_xdg(self) -> None:
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1"}):
+            self.assertEqual("/run/user/1/mediapills-console/slots", runtime_dir())
+
+
+class TestApplicationSlots(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.calls = Mock(return_value=SUCCESS)
+        self.app = Application(
+            stdout=Mock(), stderr=Mock(), features=[MetricsFeature()], name="app"
+        )
+        self.runner = CliRunner(self.app, env={"XDG_RUNTIME_DIR": self.tmp.name})
+
+        for policy in ("wait", "skip", "fail"):
+            self.app.command(policy, max_instances=1, on_busy=policy)(self.handler)
+        self.app.command("bounded", max_instances=1, timeout=0.05)(self.handler)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def handler(self, stdin: BaseInput, stdout: BaseOutput) -> int:
+        return self.calls()  # type: ignore
+
+    def hold(self, command: str) -> t.Any:
+        directory = os.path.join(self.tmp.name, "mediapills-console", "slots")
+        return Slots("app." + command, directory=directory).acquire()
+
+    def test_free_slot_should_run_command(self) -> None:
+        self.assertEqual(SUCCESS, self.runner.invoke(["fail"]).exit_code)
+        self.assertEqual(1, self.calls.call_count)
+        self.assertIn("wait", self.app.timings)
+
+    def test_taken_slot_should_skip_command(self) -> None:
+        with self.hold("skip"):
+            self.assertEqual(SUCCESS, self.runner.invoke(["skip"]).exit_code)
+
+        self.assertEqual(0, self.calls.call_count)
+
+    def test_taken_slot_should_fail_command(self) -> None:
+        with self.hold("fail"):
+            result = self.runner.invoke(["fail"])
+
+        self.assertEqual(BUSY, result.exit_code)
+        self.assertIn("is already running 1 time(s)", result.stderr)
+        self.assertEqual(0, self.calls.call_count)
+
+    def test_slots_should_be_namespaced_by_application_name(self) -> None:
+        other = Application(stdout=Mock(), stderr=Mock(), name="other")
+        other.command("fail", max_instances=1, on_busy="fail")(self.handler)
+
+        with self.hold("fail"):
+            result = CliRunner(other, env={"XDG_RUNTIME_DIR": self.tmp.name}).invoke(
+                ["fail"]
+            )
+
+        self.assertEqual(SUCCESS, result.exit_code)
+        self.assertEqual(1, self.calls.call_count)
+
+    def test_prog_should_fall_back_to_script_or_package_name(self) -> None:
+        with patch.object(sys, "argv", ["/usr/bin/app"]):
+            self.assertEqual("app", Application(stdout=Mock(), stderr=Mock()).prog)
+
+        with patch.object(sys, "argv", ["/src/tool/__main__.py"]):
+            self.assertEqual("tool", Application(stdout=Mock(), stderr=Mock()).prog)
+
+    def test_wait_should_be_recorded_as_metric(self) -> None:
+        held = self.hold("wait")
+        threading.Timer(0.05, held.release).start()
+
+        self.assertEqual(SUCCESS, self.runner.invoke(["wait"]).exit_code)
+        self.assertIn("console_queue_wait_seconds_total", self.app.metrics.render())
+
+    def test_wait_should_be_bounded_by_command_timeout(self) -> None:
+        with self.hold("bounded"):
+            result = self.runner.invoke(["bounded"])
+
+        self.assertEqual(BUSY, result.exit_code)
+        self.assertIn("is still running 1 time(s) after 0.05 seconds", result.stderr)
+        self.assertEqual(0, self.calls.call_count)
+
+    def test_invalid_policy_should_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            self.app.command("other", max_instances=1, on_busy="retry")
@@ -0,0 +1,97 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console import arguments
+from mediapills.console import specs
+from mediapills.console.exceptions import ConsoleSpecException
+
+SPEC = {
+    "description": "Generated application.",
+    "options": [{"names": ["-a", "--all"], "description": "Show all."}],
+    "parameters": [{"names": ["--region"], "mode": "required"}],
+    "commands": [
+        {
+            "name": "describe",
+            "handler": "builtins:dict",
+            "parameters": [{"names": ["--id"], "mode": ["optional", "array"]}],
+        }
+    ],
+}
+
+
+class TestSpecs(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "app.json")
+        with open(self.source, "w") as fh:
+            json.dump(SPEC, fh)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_compile_should_match_source(self) -> None:
+        target = specs.compile_spec(self.source)
+
+        self.assertTrue(target.endswith(".pickle"))
+        self.assertEqual(specs.load(self.source), specs.load(target))
+
+    def test_command_should_be_built_lazily(self) -> None:
+        _, _, entries = specs.load(specs.compile_spec(self.source))
+        option, parameter, command = specs.build(entries)
+
+        self.assertEqual(("-a", "--all"), option.options)
+        self.assertEqual(arguments.VALUE_REQUIRED, parameter.mode)  # type: ignore
+        self.assertTrue(callable(command._arguments))  # type: ignore
+        self.assertEqual(("--id",), command.arguments[0].options)  # type: ignore
+
+    def test_handler_should_be_imported_on_execute(self) -> None:
+        _, _, entries = specs.load(self.source)
+        command = specs.build(entries)[2]
+
+        self.assertEqual("builtins:dict", command.handler)  # type: ignore
+        result = command.execute(stdin="in", stdout="out")  # type: ignore
+        self.assertDictEqual({"stdin": "in", "stdout": "out"}, result)
+
+    def test_application_should_load_spec(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock())
+        app.load_spec(self.source)
+
+        self.assertEqual("Generated application.", app.description)
+        self.assertEqual(["describe"], [cmd.options[0] for cmd in app.commands])
+        args, undef = app.parser.parse(["--region", "eu", "describe", "--id", "1"])
+        self.assertDictEqual({"region": "eu", "command": "describe", "id": ["1"]}, args)
+
+    def test_invalid_spec_should_raise_error(self) -> None:
+        with open(self.source, "w") as fh:
+            json.dump({"parameters": [{"names": ["-p"], "mode": 3}]}, fh)
+
+        with self.assertRaises(expected_exception=ConsoleSpecException):
+            specs.compile_spec(self.source)
+
+    def test_unsupported_format_should_raise_error(self) -> None:
+        with self.assertRaises(expected_exception=ConsoleSpecException):
+            specs.load("app.ini")
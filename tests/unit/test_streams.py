@@ -0,0 +1,132 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from mediapills.console import Application
+from mediapills.console import streams
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.exceptions import ConsoleStreamException
+from mediapills.console.features import InputFeature
+from mediapills.console.inputs import ConsoleInput
+
+DATA = b"first\r\nsecond\n\nthird"
+
+
+class TestStreams(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt")
+        with open(self.path, "wb") as fh:
+            fh.write(DATA)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_regular_file_should_be_memory_mapped(self) -> None:
+        with patch.object(streams, "buffered") as buffered:
+            chunks = [bytes(c) for c in streams.chunks(self.path, size=4)]
+
+        buffered.assert_not_called()
+        self.assertEqual(DATA, b"".join(chunks))
+        self.assertEqual(4, len(chunks[0]))
+
+    def test_pipe_should_be_read_in_chunks(self) -> None:
+        chunks = [bytes(c) for c in streams.chunks(io.BytesIO(DATA), size=4)]
+
+        self.assertEqual(DATA, b"".join(chunks))
+
+    def test_lines_should_be_split_across_chunks(self) -> None:
+        for source in (self.path, io.BytesIO(DATA)):
+            self.assertListEqual(
+                ["first", "second", "", "third"], [*streams.lines(source, size=3)]
+            )
+
+    def test_records_should_use_separator(self) -> None:
+        records = streams.records(io.BytesIO(b"a\0b\0"), separator=b"\0")
+
+        self.assertListEqual([b"a", b"b"], [*records])
+
+    def test_empty_file_should_have_no_chunks(self) -> None:
+        open(self.path, "wb").close()
+
+        self.assertListEqual([], [*streams.chunks(self.path)])
+
+    def test_gzip_should_be_decompressed(self) -> None:
+        with gzip.open(self.path, "wb") as fh:
+            fh.write(DATA * 1000)
+
+        self.assertEqual(DATA * 1000, b"".join(streams.chunks(self.path, size=7)))
+
+    def test_zstd_should_require_dependency(self) -> None:
+        source = io.BytesIO(b"\x28\xb5\x2f\xfd" + DATA)
+
+        with patch.dict("sys.modules", {"zstandard": None}):
+            with self.assertRaises(ConsoleStreamException):
+                [*streams.chunks(source)]
+
+    def test_input_should_read_input_argument(self) -> None:
+        parser = Mock()
+        parser.scan.return_value = None
+        parser.parse.return_value = ({"input": self.path}, [])
+
+        self.assertEqual("third", [*ConsoleInput(parser, argv=[]).lines()][-1])
+
+
+class TestApplicationInput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "input.txt.gz")
+        with gzip.open(self.path, "wb") as fh:
+            fh.write(DATA)
+
+        self.mock_out = Mock()
+        self.app = Application(
+            stdout=self.mock_out, stderr=Mock(), features=[InputFeature()]
+        )
+
+        @self.app.command("count")
+        def count(stdin: ConsoleInput, stdout: BaseOutput) -> None:
+            stdout.write(str(len([*stdin.lines()])))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_input_parameter_should_be_read(self) -> None:
+        self.assertEqual(SUCCESS, self.app.run(["--input", self.path, "count"]))
+        self.mock_out.write.assert_called_once_with("4")
+
+    def test_input_parameter_should_default_to_stdin(self) -> None:
+        with patch("sys.stdin", Mock(buffer=io.BytesIO(DATA))):
+            self.assertEqual(SUCCESS, self.app.run(["count"]))
+        self.mock_out.write.assert_called_once_with("4")
+
+    def test_input_parameter_should_be_opt_in(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock())
+
+        self.assertEqual(FAILURE, app.run(["--input", self.path]))
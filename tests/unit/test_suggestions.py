@@ -0,0 +1,119 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import unittest
+from unittest.mock import patch
+
+from mediapills.console.abc.parsers import ConsoleArgumentParser
+from mediapills.console.abc.parsers import LazySubParsersAction
+from mediapills.console.arguments import InputCommand
+from mediapills.console.arguments import InputOption
+from mediapills.console.arguments import InputParameter
+from mediapills.console.parsers import InputArgumentsParser
+from mediapills.console.parsers import argument_names
+from mediapills.console.suggestions import BKTree
+from mediapills.console.suggestions import distance
+from mediapills.console.suggestions import explain
+from mediapills.console.suggestions import suggest
+
+
+class TestSuggestions(unittest.TestCase):
+    def test_distance_should_count_edits(self) -> None:
+        self.assertEqual(0, distance("build", "build"))
+        self.assertEqual(1, distance("--verbos", "--verbose"))
+        self.assertEqual(2, distance("biuld", "build"))
+        self.assertEqual(5, distance("", "build"))
+
+    def test_tree_should_find_names_within_radius(self) -> None:
+        tree = BKTree(["build", "built", "guild", "deploy", "build"])
+
+        self.assertEqual(4, len(tree))
+        self.assertEqual(
+            [(0, "build"), (1, "built"), (1, "guild")], tree.search("build", 1)
+        )
+        self.assertEqual([], BKTree().search("build", 2))
+
+    def test_tree_should_match_linear_scan(self) -> None:
+        names = ["--option-{i}".format(i=i) for i in range(500)]
+        tree = BKTree(names)
+
+        expected = sorted(
+            (distance("--option-42x", n), n)
+            for n in names
+            if distance("--option-42x", n) <= 2
+        )
+        self.assertEqual(expected, tree.search("--option-42x", 2))
+
+    def test_suggest_should_keep_options_and_commands_apart(self) -> None:
+        tree = BKTree(["--build", "build"])
+
+        self.assertEqual(["--build"], suggest("--biuld", tree))
+        self.assertEqual(["build"], suggest("biuld", tree))
+
+    def test_suggest_should_ignore_option_value(self) -> None:
+        tree = BKTree(["--jobs"])
+
+        self.assertEqual(["--jobs"], suggest("--job=4", tree))
+
+    def test_suggest_should_skip_distant_names(self) -> None:
+        self.assertEqual([], suggest("-x", BKTree(["--verbose"])))
+
+    def test_explain_should_list_suggestions(self) -> None:
+        self.assertEqual("-x", explain("-x", []))
+        self.assertEqual(
+            "--quite (did you mean --quiet or --quit?)",
+            explain("--quite", ["--quiet", "--quit"]),
+        )
+
+    def test_names_should_include_nested_command_options(self) -> None:
+        arguments = [
+            InputOption("-q", "--quiet"),
+            InputParameter("file"),
+            InputCommand(
+                "build", "b", handler=lambda: 0, arguments=[InputOption("--force")]
+            ),
+        ]
+
+        self.assertEqual(
+            ["-q", "--quiet", "build", "b", "--force"], list(argument_names(arguments))
+        )
+
+    def test_parser_should_not_index_until_suggest(self) -> None:
+        parser = InputArgumentsParser(arguments=[InputOption("--quiet")])
+        parser.parse(["--quiet"])
+
+        self.assertIsNone(parser._names)
+        self.assertEqual(["--quiet"], parser.suggest("--quite"))
+
+    def test_unknown_command_should_suggest_similar(self) -> None:
+        parser = ConsoleArgumentParser(add_help=False)
+        subparsers = parser.add_subparsers(
+            dest="command",
+            action=LazySubParsersAction,
+            parser_class=ConsoleArgumentParser,
+        )
+        subparsers.add_parser("build")
+        subparsers.add_parser("deploy")
+
+        with patch.object(parser, "error", side_effect=ValueError) as error:
+            with self.assertRaises(ValueError):
+                parser.parse_known_args(["biuld"])
+
+        self.assertIn("(did you mean build?)", error.call_args[0][0])
@@ -0,0 +1,87 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import io
+import os
+import unittest
+from unittest.mock import patch
+
+from mediapills.console.outputs import ConsoleRedOutput
+from mediapills.console.terminals import DEFAULT_SIZE
+from mediapills.console.terminals import Terminal
+from mediapills.console.terminals import _terminals
+from mediapills.console.terminals import probe_size
+from mediapills.console.terminals import supports_color
+from mediapills.console.terminals import terminal
+
+
+class TestTerminals(unittest.TestCase):
+    def test_no_color_should_disable_colors(self) -> None:
+        with patch.dict(os.environ, {"NO_COLOR": "1", "TERM": "xterm"}):
+            self.assertFalse(supports_color())
+
+    def test_dumb_term_should_disable_colors(self) -> None:
+        with patch.dict(os.environ, {"TERM": "dumb"}):
+            os.environ.pop("NO_COLOR", None)
+            self.assertFalse(supports_color())
+
+    def test_term_should_enable_colors(self) -> None:
+        with patch.dict(os.environ, {"TERM": "xterm-256color"}):
+            os.environ.pop("NO_COLOR", None)
+            self.assertTrue(supports_color())
+
+    def test_columns_should_override_size(self) -> None:
+        with patch.dict(os.environ, {"COLUMNS": "132", "LINES": "50"}):
+            self.assertEqual((132, 50), probe_size(None))
+
+    def test_invalid_columns_should_fall_back_to_default(self) -> None:
+        with patch.dict(os.environ, {"COLUMNS": "wide", "LINES": ""}):
+            self.assertEqual(DEFAULT_SIZE, probe_size(None))
+
+    def test_size_should_be_probed_again_after_resize(self) -> None:
+        found = Terminal()
+
+        with patch.dict(os.environ, {"COLUMNS": "100", "LINES": "30"}):
+            self.assertEqual(100, found.columns)
+
+        with patch.dict(os.environ, {"COLUMNS": "60", "LINES": "20"}):
+            self.assertEqual(100, found.columns)
+            found.resized()
+            self.assertEqual((60, 20), found.size)
+
+    def test_memory_stream_should_not_be_tty(self) -> None:
+        found = terminal(io.StringIO())
+
+        self.assertFalse(found.isatty)
+        self.assertFalse(found.color)
+
+    def test_descriptor_terminal_should_be_shared(self) -> None:
+        with open(os.devnull, "w") as stream:
+            self.assertIs(terminal(stream), terminal(stream))
+            self.assertFalse(terminal(stream).isatty)
+            _terminals.pop(stream.fileno())
+
+    def test_red_output_should_skip_colors_without_terminal(self) -> None:
+        stream = io.StringIO()
+        output = ConsoleRedOutput(stream=stream)
+
+        output.write("failed")
+
+        self.assertEqual("failed\n", stream.getvalue())
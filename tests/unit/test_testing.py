@@ -0,0 +1,130 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import sys
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console import parameter
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import FAILURE
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.testing import CliRunner
+
+
+class TestCliRunner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = Application(stdout=Mock(), stderr=Mock())
+
+        @self.app.command("greet", arguments=[parameter("--name", default="world")])
+        def greet(stdin: BaseInput, stdout: BaseOutput) -> int:
+            stdout.write("hello {name}".format(name=stdin.get_arg("name")))
+            return SUCCESS
+
+        @self.app.command("echo")
+        def echo(stdin: BaseInput, stdout: BaseOutput) -> int:
+            for line in sys.stdin:
+                stdout.write(line.rstrip("\n").upper())
+            return SUCCESS
+
+        @self.app.command("env")
+        def env(stdin: BaseInput, stdout: BaseOutput) -> int:
+            stdout.write(os.environ.get("RUNNER_TEST", "unset"))
+            return SUCCESS
+
+        @self.app.command("exit")
+        def exit(stdin: BaseInput, stdout: BaseOutput) -> int:
+            sys.exit(3)
+
+        @self.app.command("abort")
+        def abort(stdin: BaseInput, stdout: BaseOutput) -> int:
+            sys.exit("config missing")
+
+        @self.app.command("boom")
+        def boom(stdin: BaseInput, stdout: BaseOutput) -> int:
+            raise RuntimeError("boom")
+
+        self.runner = CliRunner(self.app)
+
+    def test_outputs_should_be_captured(self) -> None:
+        result = self.runner.invoke(["greet", "--name", "team"])
+
+        self.assertEqual(SUCCESS, result.exit_code)
+        self.assertEqual(b"hello team\n", result.stdout_bytes)
+        self.assertEqual("", result.stderr)
+
+    def test_errors_should_be_captured(self) -> None:
+        result = self.runner.invoke(["--quite"])
+
+        self.assertEqual(FAILURE, result.exit_code)
+        self.assertIn("did you mean --quiet?", result.stderr)
+
+    def test_input_should_replace_stdin(self) -> None:
+        result = self.runner.invoke(["echo"], input="a\nb\n")
+
+        self.assertEqual("A\nB\n", result.stdout)
+
+    def test_env_should_be_restored(self) -> None:
+        os.environ.pop("RUNNER_TEST", None)
+
+        self.assertEqual(
+            "on\n", self.runner.invoke(["env"], env={"RUNNER_TEST": "on"}).stdout
+        )
+        self.assertNotIn("RUNNER_TEST", os.environ)
+        self.assertEqual("unset\n", self.runner.invoke(["env"]).stdout)
+
+    def test_system_exit_should_return_code(self) -> None:
+        self.assertEqual(3, self.runner.invoke(["exit"]).exit_code)
+
+    def test_system_exit_message_should_be_written(self) -> None:
+        result = self.runner.invoke(["abort"])
+
+        self.assertEqual(FAILURE, result.exit_code)
+        self.assertEqual("config missing\n", result.stderr)
+
+    def test_exception_should_be_caught(self) -> None:
+        result = self.runner.invoke(["boom"])
+
+        self.assertEqual(FAILURE, result.exit_code)
+        self.assertIsInstance(result.exception, RuntimeError)
+
+        with self.assertRaises(RuntimeError):
+            self.runner.invoke(["boom"], catch_exceptions=False)
+
+    def test_application_should_be_restored(self) -> None:
+        stdout, stdin = self.app.stdout, sys.stdin
+
+        self.runner.invoke(["greet"])
+
+        self.assertIs(stdout, self.app.stdout)
+        self.assertIs(stdin, sys.stdin)
+
+    def test_parser_should_be_reused(self) -> None:
+        self.runner.invoke(["greet"])
+        parser = self.app.parser.parser
+
+        for name in ("a", "b", "c"):
+            result = self.runner.invoke(["greet", "--name", name])
+            self.assertEqual("hello {name}\n".format(name=name), result.stdout)
+
+        self.assertIs(parser, self.app.parser.parser)
@@ -0,0 +1,168 @@
+# Copyright (c) 2021-2021 MediaPills Console Authors.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+from mediapills.console import Application
+from mediapills.console.abc.inputs import BaseInput
+from mediapills.console.abc.outputs import BaseOutput
+from mediapills.console.abc.outputs import SUCCESS
+from mediapills.console.features import TracingFeature
+from mediapills.console.testing import CliRunner
+from mediapills.console.traces import NOOP_SPAN
+from mediapills.console.traces import otlp_value
+from mediapills.console.traces import Tracer
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tracer = Tracer()
+
+    def test_spans_should_nest_per_thread(self) -> None:
+        with self.tracer.span("outer") as outer:
+            with self.tracer.span("inner", size=3) as inner:
+                pass
+
+            thread = threading.Thread(target=self.open_span, args=["other"])
+            thread.start()
+            thread.join()
+
+        self.assertEqual(outer.span_id, inner.parent_id)
+        self.assertEqual(0, outer.parent_id)
+        self.assertEqual({"size": 3}, inner.attributes)
+        self.assertLessEqual(outer.start_ns, inner.start_ns)
+        self.assertLessEqual(inner.end_ns, outer.end_ns)
+        self.assertEqual(
+            ["inner", "other", "outer"], [span.name for span in self.tracer.spans]
+        )
+        self.assertEqual(0, self.tracer.spans[1].parent_id)
+
+    def open_span(self, name: str) -> None:
+        with self.tracer.span(name):
+            pass
+
+    def test_exception_should_be_recorded(self) -> None:
+        with self.assertRaises(KeyError):
+            with self.tracer.span("fail"):
+                raise KeyError()
+
+        self.assertEqual("KeyError", self.tracer.spans[0].attributes["error"])
+        self.assertEqual([], self.tracer.stack())
+
+    def test_full_trace_should_drop_spans(self) -> None:
+        tracer = Tracer(max_spans=1)
+
+        for _ in range(3):
+            with tracer.span("step"):
+                pass
+
+        self.assertEqual((1, 2), (len(tracer.spans), tracer.dropped))
+
+    def test_chrome_should_export_complete_events(self) -> None:
+        with self.tracer.span("parse", argv=["-v"]):
+            pass
+
+        event = self.tracer.chrome()["traceEvents"][0]
+        self.assertEqual(("parse", "X"), (event["name"], event["ph"]))
+        self.assertEqual({"argv": "['-v']"}, event["args"])
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_otlp_should_export_parent_ids_and_wall_clock(self) -> None:
+        with self.tracer.span("outer"):
+            with self.tracer.span("inner"):
+                pass
+
+        data = self.tracer.otlp("app")["resourceSpans"][0]
+        inner, outer = data["scopeSpans"][0]["spans"]
+        self.assertEqual(outer["spanId"], inner["parentSpanId"])
+        self.assertNotIn("parentSpanId", outer)
+        self.assertEqual(32, len(inner["traceId"]))
+        self.assertGreater(int(outer["startTimeUnixNano"]), 1600000000 * 10**9)
+        self.assertEqual(
+            {"key": "service.name", "value": {"stringValue": "app"}},
+            data["resource"]["attributes"][0],
+        )
+
+    def test_otlp_values_should_be_typed(self) -> None:
+        self.assertEqual({"boolValue": True}, otlp_value(True))
+        self.assertEqual({"intValue": "3"}, otlp_value(3))
+        self.assertEqual({"doubleValue": 0.5}, otlp_value(0.5))
+        self.assertEqual({"stringValue": "x"}, otlp_value("x"))
+
+    def test_unknown_format_should_raise(self) -> None:
+        with self.assertRaises(ValueError):
+            self.tracer.write(os.devnull, "xml")
+
+
+class TestApplicationTracing(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = Application(stdout=Mock(), stderr=Mock(), features=[TracingFeature()])
+        app = self.app
+
+        @self.app.command("build")
+        def build(stdin: BaseInput, stdout: BaseOutput) -> int:
+            with app.span("compile", files=2):
+                return SUCCESS
+
+    def test_phases_should_be_traced(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            result = CliRunner(self.app).invoke(["--trace", path, "build"])
+
+            with open(path) as fh:
+                events = json.load(fh)["traceEvents"]
+
+        names = [event["name"] for event in events]
+        self.assertEqual(SUCCESS, result.exit_code)
+        for name in ("parse", "options", "compile", "execute", "total", "flush"):
+            self.assertIn(name, names)
+
+        spans = {span.name: span for span in self.app.tracer.spans}
+        self.assertEqual(spans["execute"].span_id, spans["compile"].parent_id)
+
+    def test_otlp_format_should_be_written(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            CliRunner(self.app).invoke(
+                ["--trace", path, "--trace-format", "otlp", "build"]
+            )
+
+            with open(path) as fh:
+                self.assertIn("resourceSpans", json.load(fh))
+
+    def test_invalid_format_should_fail(self) -> None:
+        result = CliRunner(self.app).invoke(
+            ["--trace", os.devnull, "--trace-format", "xml"]
+        )
+
+        self.assertEqual(1, result.exit_code)
+        self.assertIn("invalid trace format: xml", result.stderr)
+
+    def test_disabled_tracing_should_return_noop_span(self) -> None:
+        app = Application(stdout=Mock(), stderr=Mock())
+        app.run([])
+
+        self.assertIs(NOOP_SPAN, app.span("any"))
+        self.assertIsNone(app._tracer)